@@ -0,0 +1,129 @@
+"""
+\file affiche.py
+\brief Implémentation de l'exportation d'une affiche haute résolution de la Tier List, rendue par bandes à partir des
+       images originales et écrite au fur et à mesure dans un fichier PNG
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from PIL import Image, ImageDraw
+from rendu import RenduTierList
+from cache_miniatures import decoder_reduit
+import struct
+import zlib
+
+# Nom de l'affiche dans le dossier d'une catégorie et taille d'une case de l'affiche en pixels :
+NOM_AFFICHE = 'TierListAffiche.png'
+N_PIXELS_AFFICHE = 600
+
+# Taille maximale des données compressées d'un bloc IDAT du fichier PNG :
+TAILLE_BLOC_PNG = 1 << 18
+
+
+class EcrivainPNG:
+    """Écrit une image PNG (RVB, 8 bits par canal) bande par bande : chaque bande est compressée dès qu'elle est reçue
+    et les données compressées sont écrites dans des blocs IDAT. Seule la bande en cours est gardée en mémoire, quelle
+    que soit la hauteur de l'image.
+
+    Attributes:
+        fichier (file): Le fichier PNG ouvert en écriture.
+        largeur (int): La largeur de l'image en pixels.
+        hauteur (int): La hauteur de l'image en pixels.
+        lignes_ecrites (int): Le nombre de lignes de pixels déjà écrites.
+        compresseur (zlib.Compress): Le flux de compression des lignes de pixels.
+        en_attente (bytearray): Les données compressées pas encore écrites dans un bloc.
+
+    """
+    def __init__(self, chemin, largeur, hauteur):
+        self.fichier = open(chemin, 'wb')
+        self.largeur = largeur
+        self.hauteur = hauteur
+        self.lignes_ecrites = 0
+        self.compresseur = zlib.compressobj(6)
+        self.en_attente = bytearray()
+        self.fichier.write(b'\x89PNG\r\n\x1a\n')
+        # En-tête : largeur, hauteur, 8 bits par canal, couleurs RVB, compression, filtre et entrelacement standards :
+        self.ecrire_bloc(b'IHDR', struct.pack('>IIBBBBB', largeur, hauteur, 8, 2, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        if type_exception is None:
+            self.fermer()
+        else:
+            self.fichier.close()
+
+    def ecrire_bande(self, bande):
+        """Ajoute une bande horizontale sous les lignes déjà écrites.
+
+        Args:
+            bande (Image): La bande (de la largeur de l'image).
+
+        Raises:
+            ValueError: Si la bande n'a pas la largeur de l'image ou dépasse sa hauteur.
+
+        """
+        if bande.width != self.largeur or self.lignes_ecrites + bande.height > self.hauteur:
+            raise ValueError(f"Bande de {bande.width}x{bande.height} incompatible avec l'image")
+        pixels = memoryview(bande.convert('RGB').tobytes())
+        taille_ligne = 3 * self.largeur
+        for debut in range(0, len(pixels), taille_ligne):
+            # Chaque ligne de pixels est précédée de son type de filtre (0 : aucun) :
+            self.en_attente += self.compresseur.compress(b'\x00')
+            self.en_attente += self.compresseur.compress(pixels[debut:debut + taille_ligne])
+            if len(self.en_attente) >= TAILLE_BLOC_PNG:
+                self.ecrire_bloc(b'IDAT', self.en_attente)
+                self.en_attente = bytearray()
+        self.lignes_ecrites += bande.height
+
+    def fermer(self):
+        """Termine le flux compressé et le fichier.
+
+        Raises:
+            ValueError: Si toutes les lignes de l'image n'ont pas été écrites.
+
+        """
+        try:
+            if self.lignes_ecrites != self.hauteur:
+                raise ValueError(f"{self.lignes_ecrites} lignes écrites sur {self.hauteur}")
+            self.en_attente += self.compresseur.flush()
+            self.ecrire_bloc(b'IDAT', self.en_attente)
+            self.ecrire_bloc(b'IEND', b'')
+        finally:
+            self.fichier.close()
+
+    def ecrire_bloc(self, type_bloc, donnees):
+        self.fichier.write(struct.pack('>I', len(donnees)))
+        self.fichier.write(type_bloc)
+        self.fichier.write(donnees)
+        self.fichier.write(struct.pack('>I', zlib.crc32(donnees, zlib.crc32(type_bloc))))
+
+
+class RenduAffiche(RenduTierList):
+    """Rendu de la Tier List à partir des images originales de la catégorie (et non des miniatures du cache), pour une
+    impression en haute résolution. L'affiche est rendue une ligne du tableau à la fois : la mémoire utilisée ne dépend
+    que de la largeur de l'affiche et de la taille des cases, jamais du nombre de lignes.
+
+    """
+    def __init__(self, modele, tier_list, index_images, n_pixels_par_case=N_PIXELS_AFFICHE):
+        super().__init__(modele, tier_list, index_images, n_pixels_par_case=n_pixels_par_case)
+
+    def enregistrer(self, chemin):
+        """Rend l'affiche ligne par ligne et l'écrit au fur et à mesure dans un fichier PNG."""
+        n = self.n_pixels_par_case
+        with EcrivainPNG(chemin, self.largeur, self.hauteur) as ecrivain:
+            for palier in range(self.tier_list.nombre_paliers):
+                for j, ligne in enumerate(self.tier_list.lignes_par_palier[palier]):
+                    bande = Image.new('RGB', (self.largeur, n), 'white')
+                    self.dessiner_ligne(bande, ImageDraw.Draw(bande), palier, j, decalage=ligne * n)
+                    ecrivain.ecrire_bande(bande)
+
+    def miniature(self, chanson_placee):
+        # L'image originale est décodée à la plus petite taille utilisable, puis redimensionnée à la taille d'une case
+        # de l'affiche :
+        taille = (self.n_pixels_par_case, self.n_pixels_par_case)
+        chemin = self.index_images.chemin(chanson_placee.artiste, chanson_placee.chanson)
+        if chemin is None:
+            return Image.new('RGB', taille, '#434343')
+        return decoder_reduit(chemin, taille, 'lanczos').convert('RGBA')
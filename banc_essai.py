@@ -0,0 +1,371 @@
+"""
+\file banc_essai.py
+\brief Banc d'essai des performances sur des catégories synthétiques (lecture de la liste, images, modèle, dessin,
+       sauvegarde et chargement); les résultats sont écrits en JSON afin de comparer les versions
+\author Maksym Valigunda
+\version 1.0
+
+Utilisation : python banc_essai.py [--chansons 24 240 10000] [--taille-images 300] [--taille-decodage 2400]
+              [--format jpg] [--repetitions 3] [--sans-interface] [--sortie banc_essai.json]
+Les mesures de l'interface (dessiner_images, enregistrement_informations, charger_sauvegarde) demandent un affichage;
+sur une machine sans écran, lancer le banc d'essai dans un affichage virtuel (par exemple : xvfb-run python
+banc_essai.py). Sans affichage, ces mesures sont marquées comme ignorées.
+"""
+
+from liste_chansons import lecture_fichier_texte, NOM_LISTE
+from cache_miniatures import CacheMiniatures
+from modele_tier_list import ModeleTierList
+from sauvegarde import creer_sauvegarde, ecrire_sauvegarde, lire_sauvegarde, modele_depuis_sauvegarde
+from journal import NOM_INSTANTANE, NOM_JOURNAL
+from paliers import PALIERS_PAR_MODELE
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+# Modèle utilisé pour les mesures (celui qui a le plus de paliers) et nombre de chansons par artiste synthétique :
+MODELE_BANC = "K-POP 2.0"
+CHANSONS_PAR_ARTISTE = 10
+
+# Nombre et taille par défaut des grandes images synthétiques du banc de décodage (une image de quelques centaines de
+# pixels tient dans la mémoire déjà réservée par l'interpréteur, et la mémoire de pointe ne bougerait pas) :
+NOMBRE_IMAGES_DECODAGE = 8
+TAILLE_IMAGES_DECODAGE = 2400
+
+# Décodage d'images dans un nouvel interpréteur, afin que la mémoire de pointe mesurée ne dépende que du chemin de
+# décodage : complet (décodage à la taille originale, puis redimensionnement) ou réduit (voir
+# cache_miniatures.decoder_reduit). La référence est prise après l'importation de PIL et de ses décodeurs. Sous Linux,
+# ru_maxrss survit à exec (le nouvel interpréteur hériterait de la pointe du banc d'essai) : la pointe est lue dans
+# VmHWM, propre au processus; ailleurs, ru_maxrss est utilisé (sauf sous Windows, où elle n'est pas mesurée) :
+PROGRAMME_DECODAGE = (
+    "import json, sys, time\n"
+    "try:\n"
+    "    import resource\n"
+    "except ImportError:\n"
+    "    resource = None\n"
+    "def memoire():\n"
+    "    try:\n"
+    "        with open('/proc/self/status') as fichier:\n"
+    "            for ligne in fichier:\n"
+    "                if ligne.startswith('VmHWM:'):\n"
+    "                    return int(ligne.split()[1]) * 1024\n"
+    "    except OSError:\n"
+    "        pass\n"
+    "    if resource is None:\n"
+    "        return None\n"
+    "    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)\n"
+    "chemins, taille, reduit = json.load(sys.stdin)\n"
+    "taille = tuple(taille)\n"
+    "from PIL import Image\n"
+    "from cache_miniatures import decoder_reduit\n"
+    "Image.init()\n"
+    "avant = memoire()\n"
+    "debut = time.perf_counter()\n"
+    "for chemin in chemins:\n"
+    "    if reduit:\n"
+    "        decoder_reduit(chemin, taille)\n"
+    "    else:\n"
+    "        Image.open(chemin).resize(taille)\n"
+    "print(time.perf_counter() - debut, memoire() - avant if avant is not None else -1)\n"
+)
+
+
+def mesurer(fonction, repetitions, preparation=None):
+    """Mesure la durée d'une fonction.
+
+    Args:
+        fonction (callable): La fonction mesurée (appelée sans argument, ou avec le résultat de la préparation).
+        repetitions (int): Le nombre de mesures.
+        preparation (callable): Une fonction appelée avant chaque mesure, hors du temps mesuré.
+
+    Returns:
+        dict: Les durées minimale, moyenne et maximale en secondes et le nombre de mesures.
+
+    """
+    durees = []
+    for _ in range(repetitions):
+        arguments = (preparation(),) if preparation is not None else ()
+        debut = time.perf_counter()
+        fonction(*arguments)
+        durees.append(time.perf_counter() - debut)
+    return {'min': min(durees), 'moyenne': sum(durees) / len(durees), 'max': max(durees), 'repetitions': repetitions}
+
+
+def generer_categorie(dossier, nombre_chansons, taille_images, format_images):
+    """Crée une catégorie synthétique : le fichier des artistes et de leurs chansons et une image par chanson.
+
+    Args:
+        dossier (str): Le dossier dans lequel créer la catégorie.
+        nombre_chansons (int): Le nombre de chansons.
+        taille_images (int): La largeur et la hauteur des images, en pixels.
+        format_images (str): Le format des images ("jpg" ou "png").
+
+    Returns:
+        str: Le chemin du dossier de la catégorie.
+
+    """
+    from PIL import Image, ImageDraw
+
+    categorie = os.path.join(dossier, f'Catégorie_Synthèse{nombre_chansons}')
+    os.makedirs(categorie, exist_ok=True)
+    # Une image de base bruitée (décodage réaliste), déclinée en ajoutant un rectangle de couleur différente :
+    base = Image.merge('RGB', [Image.effect_noise((taille_images, taille_images), 40 + 20 * canal)
+                               for canal in range(3)])
+    generateur = random.Random(nombre_chansons)
+    lignes = []
+    for i in range(0, nombre_chansons, CHANSONS_PAR_ARTISTE):
+        artiste = f'Artiste{i // CHANSONS_PAR_ARTISTE}'
+        chansons = [f'Chanson{j}' for j in range(i, min(i + CHANSONS_PAR_ARTISTE, nombre_chansons))]
+        lignes.append(f"{artiste} : {' | '.join(chansons)}\n")
+        for chanson in chansons:
+            image = base.copy()
+            couleur = tuple(generateur.randrange(256) for _ in range(3))
+            ImageDraw.Draw(image).rectangle((0, 0, taille_images // 2, taille_images // 3), fill=couleur)
+            image.save(os.path.join(categorie, f'{artiste}_{chanson}.{format_images}'))
+    with open(os.path.join(categorie, NOM_LISTE), 'w') as fichier:
+        fichier.writelines(lignes)
+    return categorie
+
+
+def banc_sans_interface(categorie, repetitions):
+    """Mesures qui ne demandent pas d'affichage : lecture de la liste, miniatures, modèle et sauvegarde."""
+    from index_images import IndexImages
+
+    resultats = {}
+    resultats['lecture_fichier_texte'] = mesurer(lambda: lecture_fichier_texte(categorie), repetitions)
+    dictionnaire, liste = lecture_fichier_texte(categorie)
+    couples = [(artiste, chanson) for artiste in liste for chanson in dictionnaire[artiste]]
+    index_images = IndexImages(categorie)
+    chemins = [index_images.chemin(artiste, chanson) for artiste, chanson in couples]
+    resultats['index_images'] = mesurer(lambda: IndexImages(categorie), repetitions)
+
+    # Décodage et redimensionnement (cache vide), puis lecture des miniatures déjà en cache :
+    dossier_cache = os.path.join(categorie, '.cache_banc')
+
+    def cache_vide():
+        shutil.rmtree(dossier_cache, ignore_errors=True)
+        return CacheMiniatures(dossier_cache)
+
+    def chargement(cache):
+        for chemin in chemins:
+            cache.obtenir(chemin, (63, 63))
+
+    resultats['miniatures_cache_vide'] = mesurer(chargement, repetitions, cache_vide)
+    resultats['miniatures_cache_plein'] = mesurer(chargement, repetitions, lambda: CacheMiniatures(dossier_cache))
+    shutil.rmtree(dossier_cache, ignore_errors=True)
+
+    # Placement de toutes les chansons (chaque insertion met à jour la disposition), puis déplacements :
+    nombre_paliers = len(PALIERS_PAR_MODELE[MODELE_BANC])
+    generateur = random.Random(0)
+    paliers = [generateur.randrange(nombre_paliers) for _ in couples]
+
+    def placement():
+        tier_list = ModeleTierList(nombre_paliers)
+        for (artiste, chanson), palier in zip(couples, paliers):
+            tier_list.inserer(artiste, chanson, palier)
+        return tier_list
+
+    resultats['placement_modele'] = mesurer(placement, repetitions)
+    tier_list = placement()
+    resultats['disposition_complete'] = mesurer(tier_list.disposition_complete, repetitions)
+
+    def deplacements(tier_list):
+        for chanson, palier in zip(list(tier_list.chansons()), reversed(paliers)):
+            if chanson.palier != palier:
+                tier_list.deplacer(chanson, palier)
+
+    resultats['deplacements_modele'] = mesurer(deplacements, repetitions, placement)
+
+    # Sauvegarde et chargement sans l'interface :
+    chemin = os.path.join(categorie, 'Sauvegarde_banc.json')
+    contenu = creer_sauvegarde(MODELE_BANC, tier_list, dictionnaire, liste, liste)
+    resultats['ecriture_sauvegarde'] = mesurer(lambda: ecrire_sauvegarde(chemin, contenu), repetitions)
+    resultats['lecture_sauvegarde'] = mesurer(lambda: modele_depuis_sauvegarde(lire_sauvegarde(chemin)), repetitions)
+    os.remove(chemin)
+    return resultats
+
+
+def banc_decodage(chemins, taille, repetitions):
+    """Compare le décodage complet des images (puis redimensionnement) et le décodage réduit, chacun dans un nouvel
+    interpréteur.
+
+    Args:
+        chemins (list): Les chemins des images.
+        taille (tuple): La largeur et la hauteur des miniatures, en pixels.
+        repetitions (int): Le nombre de mesures de chaque chemin de décodage.
+
+    Returns:
+        dict: Pour chaque chemin de décodage, les durées (en secondes) et la hausse maximale de la mémoire de pointe du
+            processus (en octets, None si elle ne peut pas être mesurée).
+
+    """
+    resultats = {}
+    for nom, reduit in (('decodage_complet', False), ('decodage_reduit', True)):
+        entree = json.dumps([[os.path.abspath(chemin) for chemin in chemins], taille, reduit])
+        durees = []
+        memoires = []
+        for _ in range(repetitions):
+            sortie = subprocess.run([sys.executable, '-c', PROGRAMME_DECODAGE], input=entree, capture_output=True,
+                                    text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            duree, memoire = sortie.stdout.split()
+            durees.append(float(duree))
+            memoires.append(int(memoire))
+        resultats[nom] = {'min': min(durees), 'moyenne': sum(durees) / len(durees), 'max': max(durees),
+                          'repetitions': repetitions, 'memoire_pointe': max(memoires) if min(memoires) >= 0 else None}
+    return resultats
+
+
+def banc_interface(categorie, repetitions):
+    """Mesures de l'interface : placement des chansons par clics, dessin, sauvegarde et chargement.
+
+    Returns:
+        dict: Les mesures, ou la raison pour laquelle elles sont ignorées.
+
+    """
+    from tkinter import TclError
+    from interface import FenetreTierList
+
+    dossier, nom = os.path.split(categorie)
+    repertoire = os.getcwd()
+    os.chdir(dossier)
+    try:
+        def fenetre():
+            # Nouvelle fenêtre, sans session à récupérer (la question bloquerait le banc d'essai) :
+            for nom_fichier in (NOM_INSTANTANE, NOM_JOURNAL):
+                if os.path.exists(os.path.join(nom, nom_fichier)):
+                    os.remove(os.path.join(nom, nom_fichier))
+            fenetre_banc = FenetreTierList()
+            fenetre_banc.ouvrir_categorie(nom)
+            fenetre_banc.choisir_modele(MODELE_BANC)
+            return fenetre_banc, fenetre_banc.session_courante()
+
+        try:
+            fenetre_banc, tier_list = fenetre()
+        except TclError as erreur:
+            return {'ignoré': f"aucun affichage ({erreur}); utiliser un affichage virtuel (xvfb-run)"}
+
+        resultats = {}
+        try:
+            n = tier_list.canvas_tier_list.n_pixels_par_case
+            generateur = random.Random(0)
+
+            def clic(ligne, colonne):
+                tier_list.selectionner_clic_gauche(types.SimpleNamespace(x=int((colonne + 0.5) * n),
+                                                                         y=int((ligne + 0.5) * n)))
+
+            # Appel de chaque chanson, puis placement sur un palier au hasard (la dernière chanson n'est pas suivie
+            # d'un nouvel appel, qui afficherait le message de fin) :
+            durees = []
+            for _ in range(len(tier_list.file_chansons)):
+                debut = time.perf_counter()
+                tier_list.nouvelle_chanson()
+                clic(tier_list.tier_list.ligne_boutton, 2)
+                palier = generateur.randrange(tier_list.tier_list.nombre_paliers)
+                clic(tier_list.tier_list.lignes_par_palier[palier][0], 3)
+                tier_list.update_idletasks()
+                durees.append(time.perf_counter() - debut)
+            resultats['placement_par_clics'] = {'min': min(durees), 'moyenne': sum(durees) / len(durees),
+                                                'max': max(durees), 'repetitions': len(durees)}
+
+            def dessin_complet():
+                # Toutes les chansons et le tableau sont redessinés :
+                tier_list.canvas_tier_list.delete('image')
+                for items in tier_list.items_chansons.values():
+                    tier_list.images.liberer(items['photo'])
+                tier_list.items_chansons.clear()
+                tier_list.items_libres.clear()
+                tier_list.canvas_tier_list.tableau_dessine = None
+
+            resultats['dessiner_images'] = mesurer(lambda _: tier_list.dessiner_images(), repetitions, dessin_complet)
+            resultats['enregistrement_informations'] = mesurer(tier_list.enregistrement_informations, repetitions)
+            # Statistiques des PhotoImage (pas une mesure de durée) :
+            resultats['statistiques_photos'] = tier_list.images.statistiques()
+            fenetre_banc.destroy()
+
+            durees = []
+            for _ in range(repetitions):
+                fenetre_banc, tier_list = fenetre()
+                debut = time.perf_counter()
+                tier_list.charger_sauvegarde()
+                tier_list.update_idletasks()
+                durees.append(time.perf_counter() - debut)
+                fenetre_banc.destroy()
+            resultats['charger_sauvegarde'] = {'min': min(durees), 'moyenne': sum(durees) / len(durees),
+                                               'max': max(durees), 'repetitions': repetitions}
+        finally:
+            try:
+                fenetre_banc.destroy()
+            except TclError:
+                pass
+        return resultats
+    finally:
+        os.chdir(repertoire)
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Banc d'essai des performances sur des catégories synthétiques.")
+    parser.add_argument('--chansons', type=int, nargs='+', default=[24, 240], help="nombres de chansons à mesurer")
+    parser.add_argument('--taille-images', type=int, default=300, help="taille des images synthétiques en pixels")
+    parser.add_argument('--taille-decodage', type=int, default=TAILLE_IMAGES_DECODAGE,
+                        help="taille des images synthétiques du banc de décodage en pixels")
+    parser.add_argument('--format', choices=('jpg', 'png'), default='jpg', help="format des images synthétiques")
+    parser.add_argument('--repetitions', type=int, default=3, help="nombre de mesures de chaque opération")
+    parser.add_argument('--sans-interface', action='store_true', help="ignorer les mesures de l'interface")
+    parser.add_argument('--sortie', default='banc_essai.json', help="fichier JSON des résultats")
+    options = parser.parse_args(arguments)
+
+    rapport = {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': sys.version.split()[0],
+        'plateforme': platform.platform(),
+        'parametres': {'taille_images': options.taille_images, 'taille_decodage': options.taille_decodage,
+                       'format': options.format,
+                       'repetitions': options.repetitions, 'modele': MODELE_BANC},
+        'resultats': {},
+    }
+    with tempfile.TemporaryDirectory(prefix='banc_essai_') as dossier:
+        # Décodage complet et réduit de quelques grandes images :
+        categorie = generer_categorie(dossier, NOMBRE_IMAGES_DECODAGE, options.taille_decodage, options.format)
+        chemins = [os.path.join(categorie, nom) for nom in sorted(os.listdir(categorie)) if nom != NOM_LISTE]
+        rapport['decodage'] = banc_decodage(chemins, (63, 63), options.repetitions)
+        for nom, mesure in rapport['decodage'].items():
+            memoire = (f" (mémoire de pointe +{mesure['memoire_pointe'] / 2 ** 20:.1f} Mo)"
+                       if mesure['memoire_pointe'] is not None else "")
+            print(f"{nom} ({NOMBRE_IMAGES_DECODAGE} images de {options.taille_decodage} px) : "
+                  f"{mesure['moyenne'] * 1000:.1f} ms{memoire}")
+        for nombre_chansons in options.chansons:
+            debut = time.perf_counter()
+            categorie = generer_categorie(dossier, nombre_chansons, options.taille_images, options.format)
+            print(f"{nombre_chansons} chansons : catégorie générée en {time.perf_counter() - debut:.2f} s")
+            resultats = banc_sans_interface(categorie, options.repetitions)
+            if options.sans_interface:
+                resultats['interface'] = {'ignoré': "option --sans-interface"}
+            else:
+                resultats['interface'] = banc_interface(categorie, options.repetitions)
+            rapport['resultats'][str(nombre_chansons)] = resultats
+            for nom, mesure in resultats.items():
+                if 'moyenne' in mesure:
+                    print(f"    {nom} : {mesure['moyenne'] * 1000:.1f} ms")
+            for nom, mesure in resultats['interface'].items():
+                if not isinstance(mesure, dict):
+                    texte = mesure
+                elif 'moyenne' in mesure:
+                    texte = f"{mesure['moyenne'] * 1000:.1f} ms"
+                else:
+                    texte = ', '.join(f"{cle} {valeur}" for cle, valeur in mesure.items())
+                print(f"    interface.{nom} : {texte}")
+
+    with open(options.sortie, 'w', encoding='utf-8') as fichier:
+        json.dump(rapport, fichier, ensure_ascii=False, indent=2)
+    print(f"Résultats écrits dans {options.sortie}")
+
+
+if __name__ == '__main__':
+    main()
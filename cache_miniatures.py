@@ -0,0 +1,325 @@
+"""
+\file cache_miniatures.py
+\brief Implémentation du cache sur disque des miniatures (images déjà redimensionnées) des catégories
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+# Dossier du cache et budget disque par défaut (en octets) :
+DOSSIER_CACHE = '.cache_miniatures'
+BUDGET_CACHE = 64 * 1024 * 1024
+
+# Taille des blocs lus pour calculer l'empreinte du contenu d'une image :
+TAILLE_BLOC_EMPREINTE = 1 << 20
+
+# Fichier du dossier du cache où les empreintes déjà calculées sont ajoutées (une ligne JSON par image) :
+NOM_EMPREINTES = 'empreintes.jsonl'
+
+# Niveaux de la pyramide des miniatures (côté en pixels, du plus grand au plus petit) : chaque niveau est réduit à
+# partir du précédent et la taille des cases par défaut en est un. Les autres tailles (zoom) sont réduites à partir
+# d'un niveau, sans décoder l'image originale :
+NIVEAUX_PYRAMIDE = (126, 63, 32)
+
+# Filtre de rééchantillonnage des miniatures (nom d'un filtre de PIL : nearest, box, bilinear, hamming, bicubic ou
+# lanczos) :
+FILTRE_REDUCTION = 'bicubic'
+
+# Version de la manière de décoder et de réduire les images (voir decoder_reduit), incluse dans la clé des miniatures :
+# la changer rend obsolètes les miniatures déjà dans le cache.
+VERSION_DECODAGE = 'reduit-1'
+
+# Une image n'est réduite par un facteur entier (Image.reduce) que jusqu'à ce multiple de la taille demandée; le filtre
+# de rééchantillonnage fait le reste, ce qui garde la qualité d'un redimensionnement direct :
+ECART_REDUCTION = 2
+
+
+def niveau_pyramide(taille):
+    """Retourne le niveau de la pyramide le plus proche à partir duquel une miniature est obtenue : le plus petit niveau
+    au moins aussi grand (une image réduite reste nette), ou le plus grand niveau.
+
+    Args:
+        taille (tuple): La largeur et la hauteur de la miniature, en pixels.
+
+    Returns:
+        tuple: La largeur et la hauteur du niveau.
+
+    """
+    cote = max(taille)
+    niveau = min((niveau for niveau in NIVEAUX_PYRAMIDE if niveau >= cote), default=NIVEAUX_PYRAMIDE[0])
+    return niveau, niveau
+
+
+def empreinte_fichier(chemin):
+    """Calcule l'empreinte du contenu d'un fichier : deux copies identiques d'une image (par exemple dans deux
+    catégories) ont la même empreinte.
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+
+    """
+    hachage = hashlib.blake2b(digest_size=16)
+    with open(chemin, 'rb') as fichier:
+        for bloc in iter(lambda: fichier.read(TAILLE_BLOC_EMPREINTE), b''):
+            hachage.update(bloc)
+    return hachage.hexdigest()
+
+
+def filtre_reduction(nom):
+    from PIL import Image
+    return getattr(Image.Resampling, nom.upper())
+
+
+def decoder_reduit(chemin, taille, filtre=FILTRE_REDUCTION):
+    """Décode une image à la plus petite taille utilisable, puis la redimensionne. Un JPEG est décodé directement à
+    une fraction de sa taille (1/2, 1/4 ou 1/8, par la mise à l'échelle de la DCT) qui reste au moins aussi grande que
+    la taille demandée; une autre image est décodée entièrement, puis réduite par un facteur entier (Image.reduce).
+    Une grande image n'occupe donc jamais toute sa taille en mémoire lorsqu'elle est en JPEG.
+
+    Args:
+        chemin (str): Le chemin de l'image.
+        taille (tuple): La largeur et la hauteur voulues, en pixels.
+        filtre (str): Le nom du filtre de rééchantillonnage de PIL utilisé pour le redimensionnement final.
+
+    Returns:
+        Image: L'image redimensionnée (en RVB ou RVBA).
+
+    Raises:
+        FileNotFoundError: Si l'image n'existe pas.
+
+    """
+    from PIL import Image
+    image = Image.open(chemin)
+    if image.format == 'JPEG':
+        image.draft(None, taille)
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+    facteur = min(image.width // (ECART_REDUCTION * taille[0]), image.height // (ECART_REDUCTION * taille[1]))
+    if facteur >= 2:
+        image = image.reduce(facteur)
+    return image.resize(taille, filtre_reduction(filtre))
+
+
+class CacheMiniatures:
+    """Cache persistant des miniatures des images d'une catégorie. Chaque miniature est enregistrée en PNG dans le
+    dossier du cache sous une clé calculée à partir du chemin de l'image originale, de sa date de modification, de sa
+    taille en octets, de la taille demandée, du filtre de rééchantillonnage et de la version du décodage. Une image
+    originale modifiée (ou un autre filtre) produit donc une nouvelle clé et l'ancienne miniature finit par être
+    évincée. Lorsqu'un niveau de la pyramide (NIVEAUX_PYRAMIDE) est demandé, tous les niveaux
+    sont produits à partir d'un seul décodage de l'image originale.
+
+    Lorsque la taille totale du cache dépasse le budget, les miniatures les moins récemment utilisées (LRU) sont
+    supprimées. L'ordre d'utilisation est conservé d'une session à l'autre grâce à la date de modification des
+    fichiers du cache, mise à jour à chaque accès. Le cache peut être utilisé par plusieurs fils d'exécution à la fois
+    (voir prechargement.py); seuls les accès à l'index sont protégés par un verrou, le décodage se faisant en parallèle.
+
+    Le cache conserve aussi les empreintes du contenu des images (voir empreinte), afin qu'une image inchangée ne soit
+    lue et hachée qu'une seule fois, toutes sessions confondues.
+
+    Attributes:
+        dossier (str): Le dossier dans lequel sont enregistrées les miniatures.
+        budget (int): La taille maximale du cache sur le disque, en octets.
+        fichiers (OrderedDict): Les clés des miniatures associées à leur taille en octets, de la moins récemment
+            utilisée à la plus récemment utilisée.
+        taille_totale (int): La taille totale des miniatures du cache, en octets.
+        filtre (str): Le nom du filtre de rééchantillonnage des miniatures.
+        empreintes (dict): Les empreintes déjà calculées, en fonction du chemin absolu, de la date de modification et
+            de la taille de l'image (None tant que le fichier des empreintes n'a pas été lu).
+
+    """
+    def __init__(self, dossier=DOSSIER_CACHE, budget=BUDGET_CACHE, filtre=FILTRE_REDUCTION):
+        self.dossier = dossier
+        self.budget = budget
+        self.filtre = filtre
+        self.fichiers = OrderedDict()
+        self.taille_totale = 0
+        self.empreintes = None
+        self.verrou = threading.Lock()
+        self.indexe = False
+
+    def indexation(self):
+        """Reconstruit l'ordre LRU à partir des fichiers déjà présents. Le dossier du cache n'est parcouru qu'au
+        premier accès (et non à la création du cache, ce qui ralentirait le démarrage). Doit être appelée avec le
+        verrou acquis.
+
+        """
+        self.indexe = True
+        os.makedirs(self.dossier, exist_ok=True)
+        entrees = []
+        for entree in os.scandir(self.dossier):
+            if entree.is_file() and entree.name.endswith('.png'):
+                statistiques = entree.stat()
+                entrees.append((statistiques.st_mtime_ns, entree.name[:-4], statistiques.st_size))
+        for _, cle, taille in sorted(entrees):
+            self.fichiers[cle] = taille
+            self.taille_totale += taille
+        self.eviction()
+
+    def empreinte(self, chemin, statistiques):
+        """Retourne l'empreinte du contenu d'une image (voir empreinte_fichier). Une empreinte calculée est ajoutée au
+        fichier des empreintes du cache; elle n'est plus recalculée tant que l'image garde sa date de modification et
+        sa taille.
+
+        Args:
+            chemin (str): Le chemin de l'image.
+            statistiques (os.stat_result): Les statistiques de l'image.
+
+        Returns:
+            str: L'empreinte.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+
+        """
+        cle = f'{os.path.abspath(chemin)}|{statistiques.st_mtime_ns}|{statistiques.st_size}'
+        with self.verrou:
+            if self.empreintes is None:
+                self.lecture_empreintes()
+            empreinte = self.empreintes.get(cle)
+        if empreinte is not None:
+            return empreinte
+        empreinte = empreinte_fichier(chemin)
+        with self.verrou:
+            self.empreintes[cle] = empreinte
+            try:
+                os.makedirs(self.dossier, exist_ok=True)
+                with open(os.path.join(self.dossier, NOM_EMPREINTES), 'a', encoding='utf-8') as fichier:
+                    fichier.write(json.dumps([cle, empreinte], ensure_ascii=False) + '\n')
+            except OSError:
+                # Cache en lecture seule; l'empreinte sera recalculée à la prochaine session :
+                pass
+        return empreinte
+
+    def lecture_empreintes(self):
+        """Lit le fichier des empreintes (au premier besoin seulement). Doit être appelée avec le verrou acquis."""
+        self.empreintes = {}
+        try:
+            with open(os.path.join(self.dossier, NOM_EMPREINTES), 'r', encoding='utf-8') as fichier:
+                for ligne in fichier:
+                    try:
+                        cle, empreinte = json.loads(ligne)
+                    except ValueError:
+                        # Ligne incomplète (arrêt pendant l'écriture) :
+                        continue
+                    self.empreintes[cle] = empreinte
+        except OSError:
+            pass
+
+    def obtenir(self, chemin, taille):
+        """Retourne la miniature de l'image se trouvant au chemin donné. La miniature est lue dans le cache si elle s'y
+        trouve, sinon l'image originale est décodée, redimensionnée puis ajoutée au cache (avec tous les niveaux de la
+        pyramide s'il s'agit d'un niveau).
+
+        Args:
+            chemin (str): Le chemin de l'image originale.
+            taille (tuple): La largeur et la hauteur de la miniature, en pixels.
+
+        Returns:
+            Image: La miniature chargée en mémoire.
+
+        Raises:
+            FileNotFoundError: Si l'image originale n'existe pas.
+
+        """
+        statistiques = os.stat(chemin)
+        cle = self.cle(chemin, statistiques, taille)
+        chemin_miniature = self.chemin_miniature(cle)
+
+        # Importation différée : PIL n'est chargé qu'à la première miniature demandée :
+        from PIL import Image
+
+        with self.verrou:
+            if not self.indexe:
+                self.indexation()
+            present = cle in self.fichiers
+            if present:
+                self.fichiers.move_to_end(cle)
+        if present:
+            try:
+                miniature = Image.open(chemin_miniature)
+                miniature.load()
+                os.utime(chemin_miniature)
+                return miniature
+            except OSError:
+                # Miniature supprimée ou corrompue; elle sera régénérée :
+                with self.verrou:
+                    self.taille_totale -= self.fichiers.pop(cle, 0)
+
+        if taille not in [(niveau, niveau) for niveau in NIVEAUX_PYRAMIDE]:
+            miniature = decoder_reduit(chemin, taille, self.filtre)
+            self.ajouter(cle, miniature)
+            return miniature
+
+        # Pyramide : le plus grand niveau est décodé à partir de l'image originale, puis chaque niveau est réduit à
+        # partir du précédent; les niveaux absents du cache y sont ajoutés :
+        miniature = None
+        for niveau in NIVEAUX_PYRAMIDE:
+            if miniature is None:
+                miniature = decoder_reduit(chemin, (niveau, niveau), self.filtre)
+            else:
+                miniature = miniature.resize((niveau, niveau), filtre_reduction(self.filtre))
+            cle_niveau = self.cle(chemin, statistiques, (niveau, niveau))
+            with self.verrou:
+                present = cle_niveau in self.fichiers
+            if cle_niveau == cle:
+                resultat = miniature
+            if not present or cle_niveau == cle:
+                self.ajouter(cle_niveau, miniature)
+        return resultat
+
+    def ajouter(self, cle, miniature):
+        """Enregistre une miniature dans le cache. L'écriture passe par un fichier temporaire renommé ensuite, de sorte
+        qu'une miniature partiellement écrite ne soit jamais lue.
+
+        Args:
+            cle (str): La clé de la miniature.
+            miniature (Image): La miniature à enregistrer.
+
+        """
+        with self.verrou:
+            if not self.indexe:
+                self.indexation()
+        chemin_miniature = self.chemin_miniature(cle)
+        chemin_temporaire = f'{chemin_miniature}.{os.getpid()}.{threading.get_ident()}.tmp'
+        try:
+            miniature.save(chemin_temporaire, format='PNG')
+            os.replace(chemin_temporaire, chemin_miniature)
+        except OSError:
+            # Cache en lecture seule ou disque plein; la miniature reste utilisable sans être conservée :
+            return
+        taille = os.path.getsize(chemin_miniature)
+        with self.verrou:
+            self.taille_totale += taille - self.fichiers.pop(cle, 0)
+            self.fichiers[cle] = taille
+            self.eviction()
+
+    def eviction(self):
+        """Supprime les miniatures les moins récemment utilisées jusqu'à ce que le cache respecte son budget. Doit être
+        appelée avec le verrou acquis.
+
+        """
+        while self.taille_totale > self.budget and self.fichiers:
+            cle, taille = self.fichiers.popitem(last=False)
+            self.taille_totale -= taille
+            try:
+                os.remove(self.chemin_miniature(cle))
+            except FileNotFoundError:
+                pass
+
+    def chemin_miniature(self, cle):
+        return os.path.join(self.dossier, f'{cle}.png')
+
+    def cle(self, chemin, statistiques, taille):
+        """Calcule la clé d'une miniature à partir du chemin absolu de l'image originale, de sa date de modification,
+        de sa taille en octets et de la taille de la miniature, ainsi que du filtre et de la version du décodage (une
+        miniature produite autrement n'est jamais réutilisée).
+
+        """
+        description = (f'{os.path.abspath(chemin)}|{statistiques.st_mtime_ns}|{statistiques.st_size}|'
+                       f'{taille[0]}x{taille[1]}|{self.filtre}|{VERSION_DECODAGE}')
+        return hashlib.sha1(description.encode('utf-8')).hexdigest()
@@ -0,0 +1,108 @@
+"""
+\file categories.py
+\brief Découverte des catégories (dossiers "Catégorie_...") du dossier du projet, mise en cache dans un manifeste
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from cache_miniatures import DOSSIER_CACHE
+import json
+import os
+import tempfile
+
+# Préfixe des dossiers des catégories :
+PREFIXE_CATEGORIE = 'Catégorie_'
+
+# Manifeste des catégories découvertes. Il est rangé dans le dossier du cache : l'écrire dans le dossier du projet en
+# modifierait la date de modification, ce qui invaliderait le manifeste à chaque démarrage.
+NOM_MANIFESTE = 'categories.json'
+
+# Budget du démarrage (importation de l'interface, découverte des catégories et création de la fenêtre), en secondes :
+BUDGET_DEMARRAGE = 0.5
+
+
+def nom_categorie(dossier):
+    """Retourne le nom affiché d'une catégorie (le nom de son dossier sans le préfixe "Catégorie_")."""
+    if dossier.startswith(PREFIXE_CATEGORIE):
+        return dossier[len(PREFIXE_CATEGORIE):]
+    return dossier
+
+
+def decouvrir_categories(dossier='.', dossier_cache=DOSSIER_CACHE):
+    """Retourne les dossiers des catégories. La liste est lue dans le manifeste tant que la date de modification du
+    dossier du projet n'a pas changé (l'ajout, le retrait ou le renommage d'une catégorie la modifie); sinon le dossier
+    est parcouru et le manifeste est réécrit.
+
+    Args:
+        dossier (str): Le dossier du projet.
+        dossier_cache (str): Le dossier dans lequel est rangé le manifeste.
+
+    Returns:
+        list: Les noms des dossiers des catégories, triés.
+
+    """
+    date_modification = os.stat(dossier).st_mtime_ns
+    chemin_manifeste = os.path.join(dossier, dossier_cache, NOM_MANIFESTE)
+    try:
+        with open(chemin_manifeste, 'r', encoding='utf-8') as fichier:
+            manifeste = json.load(fichier)
+        if (manifeste.get('dossier') == os.path.abspath(dossier) and
+                manifeste.get('date_modification') == date_modification and
+                isinstance(manifeste.get('categories'), list)):
+            return manifeste['categories']
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    categories = sorted(entree.name for entree in os.scandir(dossier)
+                        if entree.name.startswith(PREFIXE_CATEGORIE) and entree.is_dir())
+    try:
+        dossier_manifeste = os.path.dirname(chemin_manifeste)
+        os.makedirs(dossier_manifeste, exist_ok=True)
+        # La création du dossier du cache a pu modifier la date du dossier du projet :
+        date_modification = os.stat(dossier).st_mtime_ns
+        descripteur, chemin_temporaire = tempfile.mkstemp(suffix='.tmp', dir=dossier_manifeste)
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+            json.dump({'dossier': os.path.abspath(dossier), 'date_modification': date_modification,
+                       'categories': categories}, fichier, ensure_ascii=False)
+        os.replace(chemin_temporaire, chemin_manifeste)
+    except OSError:
+        # Manifeste impossible à écrire; les catégories seront simplement redécouvertes au prochain démarrage :
+        pass
+    return categories
+
+
+if __name__ == "__main__":
+    # Test de régression du démarrage, mesuré dans un nouvel interpréteur (comme au lancement du programme). La
+    # fenêtre n'est créée que si un affichage est disponible.
+    import subprocess
+    import sys
+
+    programme = (
+        "import time\n"
+        "debut = time.perf_counter()\n"
+        "import sys, tkinter\n"
+        "import interface\n"
+        "try:\n"
+        "    fenetre = interface.FenetreTierList()\n"
+        "    fenetre.update_idletasks()\n"
+        "    fenetre.destroy()\n"
+        "    affichage = True\n"
+        "except tkinter.TclError:\n"
+        "    import categories\n"
+        "    categories.decouvrir_categories()\n"
+        "    affichage = False\n"
+        "print(time.perf_counter() - debut, 'PIL' in sys.modules, affichage)\n"
+    )
+    durees = []
+    for _ in range(5):
+        sortie = subprocess.run([sys.executable, '-c', programme], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        duree, pil_importe, affichage = sortie.stdout.split()
+        assert pil_importe == 'False', "PIL ne doit pas être importé au démarrage"
+        durees.append(float(duree))
+    assert min(durees) < BUDGET_DEMARRAGE, f"Démarrage trop lent : {min(durees):.3f} s"
+    print(f"Démarrage : {min(durees) * 1000:.0f} ms (budget {BUDGET_DEMARRAGE * 1000:.0f} ms, "
+          f"{'avec' if affichage == 'True' else 'sans'} fenêtre)")
+
+    assert nom_categorie('Catégorie_GodSpeed') == 'GodSpeed'
+    assert nom_categorie('Catégorie_Catégorie') == 'Catégorie'
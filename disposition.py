@@ -0,0 +1,158 @@
+"""
+\file disposition.py
+\brief Moteur de disposition (indépendant de Tk) d'une Tier List : nombre de lignes de chaque palier, première ligne
+       de chaque palier par somme préfixe et calcul groupé des cases des chansons
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+
+# Nombre de chansons à partir duquel les cases sont calculées avec NumPy (en deçà, le calcul en Python est aussi rapide
+# et NumPy, long à importer, n'est jamais chargé) :
+SEUIL_NUMPY = 2000
+
+
+def importation_numpy():
+    # NumPy est facultatif : sans lui, les cases sont calculées en Python.
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def lignes_necessaires(nombre_chansons, limite_colonnes):
+    # Un palier occupe au moins une ligne, même vide :
+    return max(1, -(-nombre_chansons // limite_colonnes))
+
+
+class DispositionPaliers:
+    """Disposition des paliers d'une Tier List. Seul le nombre de chansons de chaque palier est tenu à jour; le nombre
+    de lignes d'un palier en découle, et la première ligne de chaque palier est la somme préfixe des nombres de lignes
+    des paliers précédents. Un changement ne recalcule que les sommes à partir du premier palier dont le nombre de
+    lignes a changé, et indique exactement les paliers dont les cases ont changé.
+
+    Le palier d'arrivée (numéro nombre_paliers) occupe toujours une seule ligne et ses chansons sont à la colonne 2.
+
+    Attributes:
+        nombre_paliers (int): Le nombre de paliers (sans compter le palier d'arrivée).
+        limite_colonnes (int): Le nombre de chansons par ligne.
+        nombres_chansons (list): Le nombre de chansons de chaque palier.
+        nombres_lignes (list): Le nombre de lignes de chaque palier.
+        debuts (list): La première ligne de chaque palier, suivie du nombre total de lignes.
+
+    """
+    def __init__(self, nombre_paliers, limite_colonnes, nombres_chansons=None, nombres_lignes=None):
+        """
+        Args:
+            nombre_paliers (int): Le nombre de paliers (sans compter le palier d'arrivée).
+            limite_colonnes (int): Le nombre de chansons par ligne.
+            nombres_chansons (list): Le nombre de chansons de chaque palier (aucune par défaut).
+            nombres_lignes (list): Le nombre de lignes enregistré de chaque palier (par exemple dans une sauvegarde);
+                un palier garde ses lignes en trop, mais reçoit les lignes qui lui manquent.
+
+        """
+        self.nombre_paliers = nombre_paliers
+        self.limite_colonnes = limite_colonnes
+        self.nombres_chansons = list(nombres_chansons) if nombres_chansons is not None else [0] * (nombre_paliers + 1)
+        self.nombres_lignes = [self.lignes_palier(palier) for palier in range(nombre_paliers + 1)]
+        if nombres_lignes is not None:
+            self.nombres_lignes = [max(nombre, enregistre) for nombre, enregistre in zip(self.nombres_lignes,
+                                                                                         nombres_lignes)]
+            self.nombres_lignes[nombre_paliers] = 1
+        self.debuts = [0] * (nombre_paliers + 2)
+        self.sommes_prefixes(0)
+
+    @property
+    def nombre_lignes(self):
+        return self.debuts[-1]
+
+    def lignes_palier(self, palier):
+        if palier == self.nombre_paliers:
+            return 1
+        return lignes_necessaires(self.nombres_chansons[palier], self.limite_colonnes)
+
+    def lignes(self, palier):
+        """Retourne les numéros des lignes occupées par un palier."""
+        return range(self.debuts[palier], self.debuts[palier + 1])
+
+    def palier_de_ligne(self, ligne):
+        """Retourne le palier qui occupe une ligne (recherche dichotomique dans les premières lignes des paliers), ou
+        None si la ligne est en dehors du tableau.
+
+        """
+        if not 0 <= ligne < self.debuts[-1]:
+            return None
+        return bisect_right(self.debuts, ligne) - 1
+
+    def sommes_prefixes(self, premier_palier):
+        # Les premières lignes des paliers précédant premier_palier ne changent pas :
+        self.debuts[premier_palier:] = accumulate(self.nombres_lignes[premier_palier:],
+                                                  initial=self.debuts[premier_palier])
+
+    def actualiser(self, nombres_chansons):
+        """Met à jour le nombre de chansons de certains paliers, puis leur nombre de lignes et, au besoin, les premières
+        lignes des paliers suivants.
+
+        Args:
+            nombres_chansons (dict): Le nouveau nombre de chansons de chaque palier modifié.
+
+        Returns:
+            tuple: La liste ordonnée des paliers dont les cases ont changé (les paliers modifiés et tous les paliers
+                décalés) et le premier palier dont le nombre de lignes a changé (None si aucun).
+
+        """
+        premier_palier_decale = None
+        paliers = set()
+        for palier, nombre in nombres_chansons.items():
+            self.nombres_chansons[palier] = nombre
+            paliers.add(palier)
+            nombre_lignes = self.lignes_palier(palier)
+            # Un palier devenu vide garde ses lignes (comme un palier jamais rempli garde la sienne) :
+            if nombre_lignes != self.nombres_lignes[palier] and nombre != 0:
+                self.nombres_lignes[palier] = nombre_lignes
+                if premier_palier_decale is None or palier < premier_palier_decale:
+                    premier_palier_decale = palier
+        if premier_palier_decale is not None:
+            self.sommes_prefixes(premier_palier_decale)
+            paliers.update(range(premier_palier_decale + 1, self.nombre_paliers + 1))
+        return sorted(paliers), premier_palier_decale
+
+    def cases(self, paliers):
+        """Calcule en une seule passe les cases de toutes les chansons de plusieurs paliers (vectorisée avec NumPy
+        lorsqu'il est installé et que les chansons sont nombreuses, voir SEUIL_NUMPY).
+
+        Args:
+            paliers (list): Les paliers, dans l'ordre voulu.
+
+        Returns:
+            tuple: La liste des lignes et la liste des colonnes des chansons, palier par palier puis dans l'ordre de
+                chaque palier.
+
+        """
+        nombres = [self.nombres_chansons[palier] for palier in paliers]
+        debuts = [self.debuts[palier] for palier in paliers]
+        # Les chansons du palier d'arrivée sont toutes à la colonne 2 de sa ligne :
+        limites = [0 if palier == self.nombre_paliers else self.limite_colonnes for palier in paliers]
+        numpy = importation_numpy() if sum(nombres) >= SEUIL_NUMPY else None
+        if numpy is not None:
+            nombres = numpy.array(nombres, dtype=numpy.intp)
+            # Rang de chaque chanson dans son palier : position dans l'ensemble moins le début de son palier.
+            fins = numpy.cumsum(nombres)
+            rangs = numpy.arange(fins[-1] if len(fins) else 0) - numpy.repeat(fins - nombres, nombres)
+            limites = numpy.repeat(numpy.array(limites, dtype=numpy.intp), nombres)
+            rangs = numpy.where(limites == 0, 0, rangs)
+            limites = numpy.maximum(limites, 1)
+            lignes = numpy.repeat(numpy.array(debuts, dtype=numpy.intp), nombres) + rangs // limites
+            colonnes = 2 + rangs % limites
+            return lignes.tolist(), colonnes.tolist()
+        lignes = []
+        colonnes = []
+        for nombre, debut, limite in zip(nombres, debuts, limites):
+            for rang in range(nombre):
+                indice, colonne = divmod(rang, limite) if limite else (0, 0)
+                lignes.append(debut + indice)
+                colonnes.append(2 + colonne)
+        return lignes, colonnes
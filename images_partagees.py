@@ -0,0 +1,345 @@
+"""
+\file images_partagees.py
+\brief Images (miniatures et PhotoImage) partagées par tous les onglets de la fenêtre, sous un budget de mémoire
+       global
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from collections import OrderedDict
+from cache_miniatures import CacheMiniatures, niveau_pyramide, filtre_reduction
+from paquet_miniatures import PaquetMiniatures, chemin_paquet
+from prechargement import PrechargeurMiniatures
+import os
+import threading
+
+# Budget de mémoire global (miniatures décodées gardées en mémoire et PhotoImage résidentes), en octets :
+BUDGET_MEMOIRE = 256 * 1024 * 1024
+
+# Budget des PhotoImage résidentes, en octets (les PhotoImage des chansons affichées ne sont jamais évincées, même
+# au-delà du budget) :
+BUDGET_PHOTOS = 64 * 1024 * 1024
+
+# Nombre d'octets par pixel d'une PhotoImage (Tk garde ses pixels en RVBA) :
+OCTETS_PAR_PIXEL_PHOTO = 4
+
+
+def octets_image(image):
+    # Taille en mémoire des pixels d'une image de PIL :
+    return image.width * image.height * len(image.getbands())
+
+
+def octets_photo(taille):
+    # Taille en mémoire des pixels d'une PhotoImage :
+    return taille[0] * taille[1] * OCTETS_PAR_PIXEL_PHOTO
+
+
+class ImagesPartagees:
+    """Images de toutes les catégories ouvertes dans les onglets de la fenêtre. Les images sont identifiées par
+    l'empreinte de leur contenu et non par leur chemin : une même image copiée dans plusieurs catégories (par exemple
+    dans Catégorie_Aespa et Catégorie_2023) n'est décodée qu'une fois et n'a qu'une PhotoImage, partagée par tous les
+    onglets qui l'affichent. L'empreinte est calculée par les fils du préchargement, avec la miniature : le fil de Tk
+    ne retrouve une PhotoImage résidente que par le chemin de l'image et n'en lit jamais le contenu.
+
+    Les miniatures d'une taille qui n'est pas un niveau de la pyramide (zoom, voir cache_miniatures.py) sont réduites
+    à partir du niveau le plus proche, sans décoder l'image originale.
+
+    Les miniatures décodées sont gardées en mémoire (LRU) tant que leur taille, ajoutée à celle des PhotoImage
+    résidentes, respecte le budget global; les moins récemment utilisées sont oubliées au besoin (elles restent dans le
+    cache sur disque).
+
+    Lorsque le paquet des miniatures d'une catégorie a été compilé (voir paquet_miniatures.py), les miniatures de ses
+    images sont lues directement dans le paquet projeté en mémoire : ni l'image originale ni le cache sur disque ne
+    sont ouverts.
+
+    Une PhotoImage est épinglée tant qu'une chanson visible d'un onglet l'affiche (voir acquerir et liberer). Les
+    PhotoImage qui ne sont plus épinglées restent résidentes tant que le budget des PhotoImage le permet, puis les
+    moins récemment libérées sont évincées; elles seront reconstruites à partir de leur miniature si leur chanson
+    redevient visible.
+
+    Attributes:
+        cache (CacheMiniatures): Le cache sur disque des miniatures, commun à toutes les catégories.
+        prechargeur (PrechargeurMiniatures): Le préchargement en arrière-plan, commun à tous les onglets.
+        budget (int): Le budget de mémoire global, en octets.
+        empreintes (dict): Les empreintes des images en fonction de leur chemin, de leur date de modification et de
+            leur taille.
+        representants (dict): Le chemin de l'image dont les miniatures sont lues dans le cache sur disque, en fonction
+            de l'empreinte (une seule copie des miniatures pour toutes les images de même contenu).
+        miniatures (OrderedDict): Les miniatures en mémoire en fonction de l'empreinte et de la taille, de la moins
+            récemment utilisée à la plus récemment utilisée.
+        octets_miniatures (int): La taille des miniatures en mémoire, en octets.
+        budget_photos (int): Le budget des PhotoImage résidentes, en octets.
+        photos (dict): Les PhotoImage résidentes et leur nombre d'épinglages, en fonction de l'empreinte et de la
+            taille.
+        cles_photos (dict): La clé (empreinte et taille) de la PhotoImage de chaque image, en fonction de son chemin et
+            de la taille.
+        photos_libres (OrderedDict): Les clés des PhotoImage résidentes qui ne sont pas épinglées, de la moins
+            récemment libérée à la plus récemment libérée.
+        octets_photos (int): La taille des PhotoImage résidentes, en octets.
+        paquets (dict): Les paquets de miniatures ouverts, en fonction de leur chemin.
+        images_paquets (dict): Le paquet qui contient chaque miniature, en fonction de l'empreinte et de la taille.
+        cases_vides (dict): Les PhotoImage grises affichées à la place des images introuvables, en fonction de la
+            taille.
+        succes (int): Le nombre de PhotoImage demandées qui étaient résidentes.
+        echecs (int): Le nombre de PhotoImage demandées qui ont dû être construites ou reconstruites.
+        evictions (int): Le nombre de PhotoImage évincées.
+
+    """
+    def __init__(self, cache=None, budget=BUDGET_MEMOIRE, budget_photos=BUDGET_PHOTOS):
+        self.cache = cache if cache is not None else CacheMiniatures()
+        self.prechargeur = PrechargeurMiniatures(self)
+        self.budget = budget
+        self.empreintes = {}
+        self.representants = {}
+        self.miniatures = OrderedDict()
+        self.octets_miniatures = 0
+        self.budget_photos = budget_photos
+        self.photos = {}
+        self.cles_photos = {}
+        self.photos_libres = OrderedDict()
+        self.octets_photos = 0
+        self.paquets = {}
+        self.images_paquets = {}
+        self.cases_vides = {}
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.verrou = threading.Lock()
+
+    def empreinte(self, chemin):
+        """Retourne l'empreinte du contenu d'une image. Elle n'est calculée que si l'image est nouvelle ou a été
+        modifiée; les empreintes déjà calculées sont conservées par le cache sur disque d'une session à l'autre.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+
+        """
+        statistiques = os.stat(chemin)
+        cle = (chemin, statistiques.st_mtime_ns, statistiques.st_size)
+        empreinte = self.empreintes.get(cle)
+        if empreinte is None:
+            empreinte = self.cache.empreinte(chemin, statistiques)
+            self.empreintes[cle] = empreinte
+        return empreinte
+
+    def ouvrir_paquet(self, dossier, n_pixels_par_case):
+        """Ouvre le paquet des miniatures d'une catégorie, s'il existe et n'est pas déjà ouvert (il est rouvert s'il a
+        été recompilé, et l'ancien paquet est alors fermé). Les empreintes des images du paquet sont reprises de son
+        index, sans ouvrir les images; une image modifiée depuis la compilation du paquet a une autre date de
+        modification et son empreinte est alors recalculée.
+
+        Args:
+            dossier (str): Le dossier de la catégorie.
+            n_pixels_par_case (int): La taille d'une case en pixels.
+
+        Returns:
+            PaquetMiniatures: Le paquet, ou None s'il n'existe pas ou est invalide.
+
+        """
+        chemin = chemin_paquet(dossier, n_pixels_par_case)
+        ancien_paquet = self.paquets.get(chemin)
+        try:
+            if ancien_paquet is not None and os.stat(chemin).st_mtime_ns == ancien_paquet.date_modification:
+                return ancien_paquet
+            paquet = PaquetMiniatures(chemin)
+        except (OSError, ValueError):
+            paquet = None
+        if ancien_paquet is not None:
+            # Paquet recompilé ou supprimé : l'ancienne projection est fermée et ses miniatures sont oubliées.
+            del self.paquets[chemin]
+            with self.verrou:
+                self.images_paquets = {cle: paquet_image for cle, paquet_image in self.images_paquets.items()
+                                       if paquet_image is not ancien_paquet}
+            ancien_paquet.fermer()
+        if paquet is None:
+            return None
+        self.paquets[chemin] = paquet
+        for entree in paquet.entrees.values():
+            cle = (os.path.join(dossier, entree['fichier']), entree['date_modification'], entree['taille_fichier'])
+            self.empreintes[cle] = entree['empreinte']
+        with self.verrou:
+            for empreinte in paquet.decalages:
+                self.images_paquets[(empreinte, paquet.taille)] = paquet
+        return paquet
+
+    def obtenir(self, chemin, taille):
+        """Retourne la miniature d'une image : gardée en mémoire, lue dans un paquet, réduite à partir d'un niveau de la
+        pyramide, lue dans le cache sur disque ou décodée. Peut être appelée par les fils d'exécution du préchargement.
+
+        Args:
+            chemin (str): Le chemin de l'image originale.
+            taille (tuple): La largeur et la hauteur de la miniature, en pixels.
+
+        Returns:
+            Image: La miniature.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+
+        """
+        return self.preparer(chemin, taille)[1]
+
+    def preparer(self, chemin, taille):
+        """Retourne l'empreinte et la miniature d'une image (voir obtenir). Appelée par les fils d'exécution du
+        préchargement, afin que le fil de Tk n'ait pas à calculer l'empreinte.
+
+        Args:
+            chemin (str): Le chemin de l'image originale.
+            taille (tuple): La largeur et la hauteur de la miniature, en pixels.
+
+        Returns:
+            tuple: L'empreinte et la miniature.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+
+        """
+        empreinte = self.empreinte(chemin)
+        cle = (empreinte, taille)
+        with self.verrou:
+            miniature = self.miniatures.get(cle)
+            if miniature is not None:
+                self.miniatures.move_to_end(cle)
+                return empreinte, miniature
+            paquet = self.images_paquets.get(cle)
+        if paquet is not None:
+            # Les pixels restent dans le paquet projeté en mémoire (le système les garde en cache au besoin) : la
+            # miniature n'est pas comptée dans le budget.
+            return empreinte, paquet.miniature(empreinte)
+        niveau = niveau_pyramide(taille)
+        if niveau != taille:
+            # Taille de zoom : réduction du niveau le plus proche (gardé en mémoire, dans un paquet ou sur disque) :
+            miniature = self.obtenir(chemin, niveau).resize(taille, filtre_reduction(self.cache.filtre))
+        else:
+            # Les images de même contenu partagent les miniatures (et la pyramide) de leur représentant :
+            representant = self.representants.setdefault(empreinte, chemin)
+            try:
+                miniature = self.cache.obtenir(representant, taille)
+            except OSError:
+                if representant == chemin:
+                    raise
+                # Représentant supprimé ou illisible; l'image le remplace :
+                self.representants[empreinte] = chemin
+                miniature = self.cache.obtenir(chemin, taille)
+        with self.verrou:
+            if cle not in self.miniatures:
+                self.miniatures[cle] = miniature
+                self.octets_miniatures += octets_image(miniature)
+            self.eviction()
+        return empreinte, miniature
+
+    def prevoir(self, chemins, taille):
+        # Préparation en arrière-plan des miniatures des prochaines chansons d'un onglet :
+        self.prechargeur.prevoir(chemins, taille)
+
+    def oublier(self, cles):
+        # Les préparations d'un onglet qui ne seront plus attendues sont annulées ou libérées :
+        self.prechargeur.oublier(cles)
+
+    def acquerir(self, chemin, taille):
+        """Épingle et retourne la PhotoImage d'une image, partagée avec les autres onglets qui l'affichent. Elle est
+        construite à partir de la miniature si elle n'est pas résidente. Doit être appelée dans le fil principal
+        (celui de Tk), et chaque appel doit être suivi d'un appel à liberer lorsque l'image n'est plus affichée.
+
+        Args:
+            chemin (str): Le chemin de l'image originale, ou None si l'image est introuvable (une case grise est
+                alors retournée).
+            taille (tuple): La largeur et la hauteur de l'image affichée, en pixels.
+
+        Returns:
+            tuple: La clé de la PhotoImage (à donner à liberer) et la PhotoImage.
+
+        """
+        if chemin is None:
+            return None, self.case_vide(taille)
+        cle = self.cles_photos.get((chemin, taille))
+        photo_epinglee = self.photos.get(cle)
+        if photo_epinglee is not None:
+            # Une miniature préparée pour cette image ne sera plus demandée (sa PhotoImage est résidente) :
+            self.prechargeur.oublier([(chemin, taille)])
+        else:
+            try:
+                empreinte, miniature = self.prechargeur.obtenir(chemin, taille)
+            except OSError:
+                # Image supprimée ou illisible depuis l'ouverture de la catégorie :
+                return None, self.case_vide(taille)
+            cle = (empreinte, taille)
+            self.cles_photos[(chemin, taille)] = cle
+            # Une image de même contenu (dans une autre catégorie) peut déjà avoir sa PhotoImage :
+            photo_epinglee = self.photos.get(cle)
+        if photo_epinglee is not None:
+            self.succes += 1
+            if photo_epinglee[1] == 0:
+                del self.photos_libres[cle]
+            photo_epinglee[1] += 1
+            return cle, photo_epinglee[0]
+
+        self.echecs += 1
+        # Importation différée de PIL (le démarrage n'en a pas besoin) :
+        from PIL import ImageTk
+        photo = ImageTk.PhotoImage(miniature)
+        self.photos[cle] = [photo, 1]
+        with self.verrou:
+            self.octets_photos += octets_photo(taille)
+            self.eviction()
+        self.eviction_photos()
+        return cle, photo
+
+    def liberer(self, cle):
+        """Retire un épinglage d'une PhotoImage. Une PhotoImage qui n'est plus épinglée reste résidente, mais peut être
+        évincée pour respecter le budget des PhotoImage.
+
+        Args:
+            cle (tuple): La clé retournée par acquerir (None pour une case grise).
+
+        """
+        photo_epinglee = self.photos.get(cle)
+        if photo_epinglee is None:
+            return
+        photo_epinglee[1] -= 1
+        if photo_epinglee[1] == 0:
+            self.photos_libres[cle] = None
+            self.eviction_photos()
+
+    def eviction_photos(self):
+        # Les PhotoImage non épinglées les moins récemment libérées sont évincées jusqu'à ce que le budget soit
+        # respecté (la PhotoImage et ses pixels côté Tk sont détruits avec la dernière référence) :
+        while self.octets_photos > self.budget_photos and self.photos_libres:
+            cle, _ = self.photos_libres.popitem(last=False)
+            del self.photos[cle]
+            self.evictions += 1
+            with self.verrou:
+                self.octets_photos -= octets_photo(cle[1])
+
+    def case_vide(self, taille):
+        # Une seule case grise par taille, jamais évincée :
+        if taille not in self.cases_vides:
+            from PIL import ImageTk, Image
+            self.cases_vides[taille] = ImageTk.PhotoImage(Image.new('RGB', taille, '#434343'))
+        return self.cases_vides[taille]
+
+    def statistiques(self):
+        """Retourne les statistiques des PhotoImage et des miniatures en mémoire.
+
+        Returns:
+            dict: Les succès, les échecs et les évictions des PhotoImage, le nombre de PhotoImage résidentes et
+                épinglées, et la taille en octets des PhotoImage et des miniatures en mémoire.
+
+        """
+        return {'succes': self.succes, 'echecs': self.echecs, 'evictions': self.evictions,
+                'photos_residentes': len(self.photos), 'photos_epinglees': len(self.photos) - len(self.photos_libres),
+                'octets_photos': self.octets_photos, 'octets_miniatures': self.octets_miniatures}
+
+    def eviction(self):
+        """Oublie les miniatures les moins récemment utilisées jusqu'à ce que le budget global soit respecté. Doit être
+        appelée avec le verrou acquis.
+
+        """
+        while self.octets_miniatures + self.octets_photos > self.budget and self.miniatures:
+            _, miniature = self.miniatures.popitem(last=False)
+            self.octets_miniatures -= octets_image(miniature)
+
+    def fermer(self):
+        self.prechargeur.fermer()
+        for paquet in self.paquets.values():
+            paquet.fermer()
@@ -0,0 +1,138 @@
+"""
+\file index_images.py
+\brief Implémentation de l'index des images d'une catégorie en fonction de l'artiste et de la chanson
+\author Maksym Valigunda
+\version 1.0
+"""
+
+import os
+import warnings
+
+# Extensions des images reconnues (comparées sans égard à la casse) :
+EXTENSIONS_IMAGES = ('.jpg', '.png')
+
+# Caractères qui ne peuvent pas figurer dans un nom de fichier et qui y sont remplacés par "_" :
+CARACTERES_REMPLACES = str.maketrans({caractere: '_' for caractere in "'&<>:\"/\\|?*"})
+
+
+def normaliser(nom):
+    """Normalise le nom d'une image (sans l'extension) de façon à ce que le nom "(ARTISTE)_(CHANSON)" tiré du fichier
+    texte de la catégorie corresponde au nom du fichier : les caractères interdits dans un nom de fichier (par exemple
+    l'apostrophe de "Don'tBlink", enregistrée "Don_tBlink") sont remplacés par "_" et la casse est ignorée, comme sur
+    le système de fichiers de Windows.
+
+    Args:
+        nom (str): Le nom à normaliser.
+
+    Returns:
+        str: Le nom normalisé.
+
+    """
+    return nom.translate(CARACTERES_REMPLACES).casefold()
+
+
+class IndexImages:
+    """Index des images d'une catégorie construit en un seul parcours du dossier. Chaque image "(ARTISTE)_(CHANSON)"
+    est associée à son chemin, de sorte que la recherche d'une image se fasse en temps constant, sans accès au disque ni
+    exception. Lorsque la même chanson existe en .jpg et en .png, l'image .jpg a priorité.
+
+    Une image dont le nom est exactement celui de la chanson a priorité sur le nom normalisé. Deux images de noms
+    différents qui ont le même nom normalisé (par exemple "A&B" et "A_B", ou deux noms qui ne diffèrent que par la
+    casse) sont signalées par un avertissement : une chanson sans image à son nom exact reçoit la première dans l'ordre
+    alphabétique.
+
+    Attributes:
+        dossier (str): Le dossier de la catégorie.
+        chemins (dict): Les chemins des images en fonction de leur nom normalisé.
+        chemins_exacts (dict): Les chemins des images en fonction de leur nom exact (sans l'extension).
+        collisions (dict): Les chemins des images de noms différents en fonction du nom normalisé qu'elles partagent.
+
+    """
+    def __init__(self, dossier):
+        self.dossier = dossier
+        self.chemins = {}
+        self.chemins_exacts = {}
+        self.collisions = {}
+        try:
+            entrees = sorted(os.scandir(dossier), key=lambda entree: (os.path.splitext(entree.name)[1].lower(),
+                                                                      entree.name))
+        except FileNotFoundError:
+            entrees = []
+        for entree in entrees:
+            nom, extension = os.path.splitext(entree.name)
+            if extension.lower() in EXTENSIONS_IMAGES and entree.is_file():
+                self.chemins_exacts.setdefault(nom, entree.path)
+                cle = normaliser(nom)
+                chemin = self.chemins.setdefault(cle, entree.path)
+                if os.path.splitext(os.path.basename(chemin))[0] != nom:
+                    self.collisions.setdefault(cle, [chemin]).append(entree.path)
+        for chemins in self.collisions.values():
+            noms = ', '.join(os.path.basename(chemin) for chemin in chemins)
+            warnings.warn(f"Images confondues dans {dossier} : {noms} (une chanson sans image à son nom exact reçoit "
+                          f"{os.path.basename(chemins[0])})", stacklevel=2)
+
+    def chemin(self, artiste, chanson):
+        """Retourne le chemin de l'image d'une chanson.
+
+        Args:
+            artiste (str): L'artiste de la chanson.
+            chanson (str): Le titre de la chanson.
+
+        Returns:
+            str: Le chemin de l'image, ou None si la chanson n'a pas d'image.
+
+        """
+        nom = f'{artiste}_{chanson}'
+        chemin = self.chemins_exacts.get(nom)
+        if chemin is None:
+            chemin = self.chemins.get(normaliser(nom))
+        return chemin
+
+    def resolution_artistes(self, chansons_placees, artistes):
+        """Retrouve l'artiste des chansons placées dont l'image est introuvable (artiste inconnu dans une ancienne
+        sauvegarde) en cherchant l'image de la chanson parmi les artistes donnés, dans l'ordre.
+
+        Args:
+            chansons_placees (iterable): Les chansons placées à vérifier.
+            artistes (list): Les artistes candidats.
+
+        """
+        for chanson in chansons_placees:
+            if self.chemin(chanson.artiste, chanson.chanson) is None:
+                for artiste in artistes:
+                    if self.chemin(artiste, chanson.chanson) is not None:
+                        chanson.artiste = artiste
+                        break
+
+    def __len__(self):
+        return len(self.chemins)
+
+
+if __name__ == '__main__':
+    import tempfile
+    print('Test unitaires de la classe "IndexImages"...')
+
+    with tempfile.TemporaryDirectory() as dossier_test:
+        for nom_fichier in ('Artiste_A&B.jpg', 'Artiste_A_B.jpg', 'Artiste_Don_tBlink.png', 'Artiste_Salty.jpg',
+                            'Artiste_SALTY.jpg'):
+            open(os.path.join(dossier_test, nom_fichier), 'w').close()
+        casse_distincte = len(os.listdir(dossier_test)) == 5
+        with warnings.catch_warnings(record=True) as avertissements:
+            warnings.simplefilter('always')
+            index_test = IndexImages(dossier_test)
+        # Tests unitaires >>> nom exact prioritaire sur le nom normalisé
+        assert os.path.basename(index_test.chemin('Artiste', 'A&B')) == 'Artiste_A&B.jpg'
+        assert os.path.basename(index_test.chemin('Artiste', 'A_B')) == 'Artiste_A_B.jpg'
+        assert os.path.basename(index_test.chemin('Artiste', "Don'tBlink")) == 'Artiste_Don_tBlink.png'
+        assert index_test.chemin('Artiste', 'Inconnue') is None
+        # Tests unitaires >>> collisions signalées
+        assert normaliser('Artiste_A&B') in index_test.collisions
+        if casse_distincte:
+            # Système de fichiers sensible à la casse : les deux images restent distinctes.
+            assert os.path.basename(index_test.chemin('Artiste', 'Salty')) == 'Artiste_Salty.jpg'
+            assert os.path.basename(index_test.chemin('Artiste', 'SALTY')) == 'Artiste_SALTY.jpg'
+            assert os.path.basename(index_test.chemin('Artiste', 'salty')) == 'Artiste_SALTY.jpg'
+            assert normaliser('Artiste_Salty') in index_test.collisions
+        assert len(avertissements) == len(index_test.collisions)
+
+    print("Test unitaires passés avec succès!")
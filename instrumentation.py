@@ -0,0 +1,162 @@
+"""
+\file instrumentation.py
+\brief Instrumentation (activable) des chemins critiques : durée et nombre d'appels de chaque intervalle mesuré, coût
+       de la dernière trame et exportation d'une trace au format de Chrome (chrome://tracing, Perfetto)
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from collections import deque
+from functools import wraps
+import json
+import os
+import threading
+import time
+
+# Nombre maximal d'intervalles conservés pour l'exportation (les plus anciens sont oubliés) :
+CAPACITE_TRACE = 100000
+
+# Nom du fichier de la trace exportée et variable d'environnement qui active l'instrumentation au démarrage :
+NOM_TRACE = 'trace_tier_list.json'
+VARIABLE_ACTIVATION = 'TIER_LIST_INSTRUMENTATION'
+
+
+class Instrumentation:
+    """Enregistre les intervalles mesurés (nom, début, durée, fil d'exécution) et en tient les statistiques. Lorsque
+    l'instrumentation est désactivée, une fonction instrumentée ne coûte qu'un test de booléen de plus.
+
+    Une trame regroupe un intervalle de premier niveau du fil principal (par exemple un clic) et tous les intervalles
+    mesurés pendant celui-ci. À la fin de chaque trame, les abonnés (par exemple l'affichage du coût de la dernière
+    trame dans la fenêtre) sont appelés avec la liste des intervalles de la trame.
+
+    Attributes:
+        active (bool): Vrai si l'instrumentation est activée.
+        intervalles (deque): Les derniers intervalles mesurés (nom, début en ns, durée en ns, fil d'exécution).
+        statistiques (dict): Le nombre d'appels et la durée totale (en ns) de chaque intervalle.
+        compteurs (dict): Les compteurs d'événements.
+        derniere_trame (list): Les intervalles (nom, durée en ns) de la dernière trame du fil principal.
+        abonnes (list): Les fonctions appelées à la fin de chaque trame du fil principal.
+
+    """
+    def __init__(self):
+        self.active = os.environ.get(VARIABLE_ACTIVATION) == '1'
+        self.intervalles = deque(maxlen=CAPACITE_TRACE)
+        self.statistiques = {}
+        self.compteurs = {}
+        self.derniere_trame = []
+        self.abonnes = []
+        self.local = threading.local()
+        self.verrou = threading.Lock()
+        self.origine = time.perf_counter_ns()
+
+    def intervalle(self, nom):
+        """Retourne un gestionnaire de contexte qui mesure le bloc qu'il entoure (sans effet si désactivée)."""
+        return Intervalle(self, nom) if self.active else INTERVALLE_INACTIF
+
+    def compter(self, nom, nombre=1):
+        if self.active:
+            with self.verrou:
+                self.compteurs[nom] = self.compteurs.get(nom, 0) + nombre
+
+    def debut_intervalle(self):
+        profondeur = getattr(self.local, 'profondeur', 0)
+        if profondeur == 0:
+            self.local.trame = []
+        self.local.profondeur = profondeur + 1
+        return time.perf_counter_ns()
+
+    def fin_intervalle(self, nom, debut):
+        duree = time.perf_counter_ns() - debut
+        with self.verrou:
+            self.intervalles.append((nom, debut, duree, threading.get_ident()))
+            statistique = self.statistiques.setdefault(nom, [0, 0])
+            statistique[0] += 1
+            statistique[1] += duree
+        self.local.profondeur -= 1
+        self.local.trame.append((nom, duree))
+        if self.local.profondeur == 0 and threading.current_thread() is threading.main_thread():
+            # Fin d'une trame du fil principal (les intervalles sont dans l'ordre où ils se sont terminés; le dernier
+            # est celui de premier niveau) :
+            self.derniere_trame = self.local.trame
+            for abonne in self.abonnes:
+                abonne(self.derniere_trame)
+
+    def reinitialiser(self):
+        with self.verrou:
+            self.intervalles.clear()
+            self.statistiques.clear()
+            self.compteurs.clear()
+            self.derniere_trame = []
+
+    def exporter(self, chemin=NOM_TRACE):
+        """Écrit les intervalles mesurés au format de trace de Chrome (événements complets "X", en microsecondes). Les
+        statistiques et les compteurs sont ajoutés dans "otherData".
+
+        Args:
+            chemin (str): Le chemin du fichier de la trace.
+
+        """
+        with self.verrou:
+            intervalles = list(self.intervalles)
+            statistiques = {nom: {'appels': nombre, 'duree_totale_ms': duree / 1e6}
+                            for nom, (nombre, duree) in self.statistiques.items()}
+            compteurs = dict(self.compteurs)
+        processus = os.getpid()
+        evenements = [{'name': nom, 'ph': 'X', 'ts': (debut - self.origine) / 1000, 'dur': duree / 1000,
+                       'pid': processus, 'tid': fil} for nom, debut, duree, fil in intervalles]
+        with open(chemin, 'w', encoding='utf-8') as fichier:
+            json.dump({'traceEvents': evenements, 'displayTimeUnit': 'ms',
+                       'otherData': {'statistiques': statistiques, 'compteurs': compteurs}},
+                      fichier, ensure_ascii=False)
+
+
+class Intervalle:
+    def __init__(self, instrumentation, nom):
+        self.instrumentation = instrumentation
+        self.nom = nom
+        self.debut = None
+
+    def __enter__(self):
+        self.debut = self.instrumentation.debut_intervalle()
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        self.instrumentation.fin_intervalle(self.nom, self.debut)
+        return False
+
+
+class IntervalleInactif:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type_exception, exception, trace):
+        return False
+
+
+# Instrumentation unique du programme et intervalle sans effet partagé (aucun objet créé lorsque désactivée) :
+INSTRUMENTATION = Instrumentation()
+INTERVALLE_INACTIF = IntervalleInactif()
+
+
+def instrumenter(fonction):
+    """Décorateur qui mesure chaque appel d'une fonction sous son nom qualifié (par exemple
+    "FenetreTierList.nouvelle_chanson") lorsque l'instrumentation est activée.
+
+    """
+    nom = fonction.__qualname__
+
+    @wraps(fonction)
+    def enveloppe(*args, **kwargs):
+        if not INSTRUMENTATION.active:
+            return fonction(*args, **kwargs)
+        with Intervalle(INSTRUMENTATION, nom):
+            return fonction(*args, **kwargs)
+    return enveloppe
+
+
+def intervalle(nom):
+    return INSTRUMENTATION.intervalle(nom)
+
+
+def compter(nom, nombre=1):
+    INSTRUMENTATION.compter(nom, nombre)
@@ -5,34 +5,51 @@
 \version 1.0
 """
 
-from tkinter import Tk, Label, NSEW, Button, messagebox, Menu, Scrollbar, Frame, Canvas
+from tkinter import Tk, Label, NSEW, Button, messagebox, Menu, Scrollbar, Frame, Canvas, BooleanVar, IntVar, TclError
+from tkinter import ttk
 import tkinter.font as tkfont
-from canvas import CanvasTierList
+from canvas import CanvasTierList, NIVEAUX_ZOOM, N_PIXELS_PAR_CASE
 from position import Position
-from PIL import ImageTk, Image, ImageGrab
+from modele_tier_list import ModeleTierList
+from sauvegarde import (creer_sauvegarde, modele_depuis_sauvegarde, ecrire_sauvegarde, lire_sauvegarde_categorie,
+                        NOM_SAUVEGARDE)
+from prechargement import PROFONDEUR_PRECHARGEMENT
+from images_partagees import ImagesPartagees
+from cache_miniatures import NIVEAUX_PYRAMIDE
+from index_images import IndexImages
+from liste_chansons import lecture_fichier_texte, FileChansons
+from categories import decouvrir_categories, nom_categorie
+from journal import JournalTierList, recuperation, INTERVALLE_COMPACTION
+from instrumentation import INSTRUMENTATION, instrumenter, intervalle, compter, NOM_TRACE
+from itertools import islice
 import os
-import ast
+import threading
 
+# Nombre de lignes dessinées au-dessus et au-dessous de la zone affichée par la barre de défilement :
+MARGE_LIGNES_VISIBLES = 2
 
-class FenetreTierList(Tk):
-    """L'objet FenetreTierList qui représente le concept d'interface graphique d'une liste de palliers (Tier List)
-    affichée sous forme de fenêtre comprenant un canvas qui affiche la grille et les images, le menu d'options, les
-    divers boutons représentant les manipulations possibles et la scrollbar.
+# Hauteur des onglets au-dessus du tableau, en pixels :
+HAUTEUR_ONGLETS = 26
 
+# Durée d'une trame en millisecondes : la chanson glissée suit le pointeur au plus une fois par trame (60 Hz) :
+DUREE_TRAME = 16
 
-    Le principe de ce programme est le suivant. À son exécution, l'utilisateur a le choix de sélectionner une catégorie
-    de classement ainsi que le format de classement souhaité. Par la suite, la grille vide apparaît et l'utilisateur a la
-    possibilité de faire charger une première image représentant l'objet à classer. À l'aide de la souris, l'utilisateur
-    choisit la ligne représentant le palier du dit objet. Une fois que celui-ci est classé, l'utilisateur n'a qu'à faire
-    charger le prochain objet à classer. Lorsque tous les objets de la catégorie sont classés, l'utilisateur a le choix
-    de prendre une capture d'écran de sa liste completée ou de sauvegarder son travail afin de pouvoir le modifier
-    ultérieurement. Les images d'une catégorie doivent se trouver dans un dossier de fichiers nommé
-    "Catégorie_(NOM DE LA CATÉGORIE)" se trouvant dans le dossier du projet et chacune des images doit être nommée
-    "(ARTISTE ou AUTEUR)_(NOM)".
+# Déplacement du pointeur, en pixels, au-delà duquel un clic sur une chanson devient un glissement :
+SEUIL_GLISSEMENT = 4
+
+
+class SessionTierList(Frame):
+    """Un onglet de la fenêtre : la session de classement d'une catégorie, avec son propre tableau (canvas, barre de
+    défilement et boutons), son modèle, sa file de chansons et son journal. Les images sont partagées avec les autres
+    onglets (voir images_partagees.py).
 
     """
-    def __init__(self):
-        super().__init__()
+    def __init__(self, fenetre):
+        super().__init__(fenetre.onglets)
+
+        # Fenêtre (menus et onglets) et images partagées par tous ses onglets :
+        self.fenetre = fenetre
+        self.images = fenetre.images
 
         # Scrollbar :
         self.main_frame = Frame(self)
@@ -40,7 +57,8 @@ class FenetreTierList(Tk):
         self.my_canvas = Canvas(self.main_frame)
         self.my_canvas.pack(side='left', fill='both', expand=1)
         self.my_scrollbar = Scrollbar(self.main_frame, orient='vertical', command=self.my_canvas.yview)
-        self.my_canvas.configure(yscrollcommand=self.my_scrollbar.set)
+        self.my_canvas.configure(yscrollcommand=self.defilement)
+        self.defilement_prevu = None
         self.second_frame = Frame(self.my_canvas)
         self.my_canvas.create_window((0, 0), window=self.second_frame, anchor='nw')
 
@@ -50,77 +68,59 @@ class FenetreTierList(Tk):
         # self.canvas_tier_list.pack(side='left', fill='both', expand=1)
         self.canvas_tier_list.bind('<Button-1>', self.selectionner_clic_gauche)
         self.canvas_tier_list.bind('<Button-3>', self.selectionner_clic_droit)
+        self.canvas_tier_list.bind('<B1-Motion>', self.glisser)
+        self.canvas_tier_list.bind('<ButtonRelease-1>', self.fin_glissement)
 
-        # Fenêtre centrée sur l'écran :
-        self.eval('tk::PlaceWindow . center')
+        # Zone défilante de la taille du canvas :
         largeur = self.canvas_tier_list.winfo_width()
         hauteur = self.canvas_tier_list.winfo_height()
         self.my_canvas.configure(width=largeur, height=hauteur)
         self.my_canvas.configure(scrollregion=(0, 0, largeur, hauteur))
 
-        # Titre :
-        self.title("Tier List")
-
-        # Positions/paliers source/cible :
+        # Chanson, position et palier source :
+        self.chanson_source = None
         self.position_source = None
-        self.position_cible = None
         self.palier_source = None
-        self.palier_cible = None
 
-        # Catégorie de la Tier List (nom du dossier) :
+        # Glissement en cours d'une chanson (chanson glissée, positions du pointeur et mise à jour prévue) :
+        self.glissement = None
+
+        # Catégorie de la Tier List (nom du dossier) et index de ses images :
         self.categorie = None
+        self.index_images = None
 
         # Modèle de la Tier List :
         self.modele = None
 
-        # Menu :
-        self.menubar = Menu(self)
-
-        # Menu pour sauvegarder le progrès :
-        self.sauvegarde_menu = Menu(self.menubar, tearoff=0)
-        self.sauvegarde_menu.add_command(label="Sauvegarder", command=self.sauvegarder)
-        self.sauvegarde_menu.add_command(label="Dernière sauvegarde", command=self.charger_sauvegarde)
-        self.menubar.add_cascade(label='Fichier', menu=self.sauvegarde_menu)
-
-        # Menu pour changer de catégorie :
-        self.categorie_menu = Menu(self.menubar, tearoff=0)
-        self.files = [f for f in os.listdir() if os.path.isdir(f)]
-        self.liste_categories = []
-        for nom in self.files:
-            if "Catégorie_" in nom:
-                categorie_raccourcie = nom.lstrip("Catégorie_")
-                self.liste_categories.append(categorie_raccourcie)
-                self.categorie_menu.add_radiobutton(label=categorie_raccourcie,
-                                                    command=lambda t=nom: self.choisir_categorie(t))
-        self.menubar.add_cascade(label='Catégorie', menu=self.categorie_menu)
-
-        # Menu pour choisir le modèle de la Tier List :
-        self.modele_menu = Menu(self.menubar, tearoff=0)
-        liste_modeles = ["K-POP", "K-POP 2.0", "Classique", "Autre"]
-        for modele in liste_modeles:
-            self.modele_menu.add_radiobutton(label=modele, command=lambda t=modele: self.choisir_modele(t))
-        self.menubar.add_cascade(label='Modèle', menu=self.modele_menu)
-
-        self.config(menu=self.menubar)
+        # Catégorie et modèle figés dès que la première chanson est appelée :
+        self.commencee = False
 
-        # Dictionnaire des artistes et de leurs chansons :
-        self.dictionnaire_artistes_chansons = self.lecture_fichier_texte()[0]
+        # Taille souhaitée de la fenêtre lorsque l'onglet est affiché (largeur, hauteur et position) :
+        self.dimensions = None
 
-        # Liste des artistes :
-        self.liste_artistes = self.lecture_fichier_texte()[1]
+        # File des chansons restant à appeler (lue au choix de la catégorie) :
+        self.file_chansons = FileChansons()
         self.artistes_utilises = []
 
-        # Dictionnaire des images en fonction de leurs positions :
-        self.dictionnaire_images = {}
+        # Modèle (indépendant de Tk) des paliers, des lignes et des chansons placées :
+        self.tier_list = None
+
+        # Chemins des images en fonction des chansons placées (None si l'image est introuvable). Les PhotoImage ne
+        # sont demandées aux images partagées que pour les chansons visibles :
+        self.chemins_chansons = {}
 
-        # Dictionnaire des titres des chansons en fonction de leurs positions :
-        self.dictionnaire_chansons = {}
+        # Polices en fonction de leur taille, titres raccourcis et longueurs des titres déjà mesurées :
+        self.polices = {}
+        self.titres_raccourcis = {}
+        self.longueurs_titres = {}
 
-        # Dictionnaire du nombre de chansons par palier :
-        self.nombre_chansons_par_palier = {}
+        # Identifiants des éléments du canvas (image, rectangle et titre) de chaque chanson affichée et éléments
+        # masqués, prêts à être réutilisés pour d'autres chansons :
+        self.items_chansons = {}
+        self.items_libres = []
 
-        # Dictionnaire des numéros de lignees occupées par chaque palier :
-        self.dictionnaire_positions_par_palier = {}
+        # Préparations de miniatures demandées par l'onglet (chemin de l'image et taille) :
+        self.prechargements = set()
 
         # Boutton pour placer une nouvelle chanson :
         self.boutton = Button(self.second_frame, text='Prochaine chanson', command=self.nouvelle_chanson, bg='#57a83e',
@@ -131,7 +131,6 @@ class FenetreTierList(Tk):
                               bd=3, font=f'Arial {self.canvas_tier_list.taille+1} bold', anchor='center')
 
         # Compteur de chansons restantes :
-        self.compteur = 0
         self.label_compteur = Label(self.second_frame, font=f'Arial {self.canvas_tier_list.taille+1} bold',
                                     anchor='center', bg='white')
 
@@ -147,159 +146,175 @@ class FenetreTierList(Tk):
 
         self.changement = False
 
+        # Coût de la dernière trame (affiché seulement lorsque l'instrumentation est activée) :
+        self.label_instrumentation = Label(self.second_frame, font='Courier 8', anchor='nw', justify='left',
+                                           bg='black', fg='#57e03e')
+
+        # Journal des opérations (sauvegarde automatique en arrière-plan) et nombre d'opérations depuis l'instantané :
+        self.journal = None
+        self.operations_journalisees = 0
+
+    @instrumenter
     def selectionner_clic_gauche(self, event):
         if self.modele is not None:
             ligne = event.y // self.canvas_tier_list.n_pixels_par_case
             colonne = event.x // self.canvas_tier_list.n_pixels_par_case
             position = Position(ligne, colonne)
             # print(f"Position : {position}")
-            # print(f"Dictionnaire images : {self.dictionnaire_images}")
             if self.position_source is None:
-                # Aucune image choisie; choix de position source
-                palier = None
-                for i in self.dictionnaire_positions_par_palier:
-                    if position.ligne in self.dictionnaire_positions_par_palier[i]:
-                        palier = i
-                # print(f"Palier : {palier}")
-                palier_non_vide = self.dictionnaire_images[palier] != []
-                position_non_vide = False
-                for sequence in self.dictionnaire_images[palier]:
-                    if type(sequence[1]) is tuple:
-                        if position.ligne in sequence[1] and position.colonne in sequence[1]:
-                            position_non_vide = True
-                            break
-                    else:
-                        if position == sequence[1]:
-                            position_non_vide = True
-                            break
-                position_dans_tableau = position.colonne >= 2
-
-                if palier_non_vide and position_non_vide and position_dans_tableau:
+                # Aucune image choisie; choix de la chanson source (recherche en temps constant dans le modèle) :
+                chanson = self.tier_list.chanson_a(position)
+                if chanson is not None:
                     # Choix d'une des images qui sont sur l'écran
-                    self.position_source = position
-                    # Choix palier source :
-                    for i in self.dictionnaire_positions_par_palier:
-                        if self.position_source.ligne in self.dictionnaire_positions_par_palier[i]:
-                            self.palier_source = i
+                    self.chanson_source = chanson
+                    self.position_source = chanson.position
+                    self.palier_source = chanson.palier
                     # print(f"Position source : {self.position_source}")
                     # print(f"Palier source : {self.palier_source}")
                     # Marque l'image sélectionnée en rouge
                     self.canvas_tier_list.selectionner_chanson(self.position_source)
-                    chanson = ''
-                    for sequence in self.dictionnaire_chansons[self.palier_source]:
-                        if type(sequence[1]) is tuple:
-                            if (self.position_source.ligne in sequence[1] and
-                                    self.position_source.colonne in sequence[1]):
-                                chanson = sequence[0]
-                                break
-                        else:
-                            if sequence[1] == self.position_source:
-                                chanson = sequence[0]
-                                break
-                    self.affichage_titre_chanson_au_complet(chanson, self.position_source)
-
-            elif position.ligne != self.canvas_tier_list.ligne_boutton:
-                # Une image déjà choisie; choix de position cible
-                if position.ligne not in self.dictionnaire_positions_par_palier[self.palier_source]:
-                    # Position cible valide :
-                    self.position_cible = position
-                    # Choix palier cible :
-                    for i in self.dictionnaire_positions_par_palier:
-                        if self.position_cible.ligne in self.dictionnaire_positions_par_palier[i]:
-                            self.palier_cible = i
-                    # print(f"Position cible : {self.position_cible}")
-                    # print(f"Palier cible : {self.palier_cible}")
-                    self.canvas_tier_list.delete('contour')
-                    self.canvas_tier_list.delete('nom_complet')
-                    if self.palier_source == self.canvas_tier_list.nombre_paliers:
-                        # Stockage en mémoire de l'image en position source :
-                        image = self.dictionnaire_images[self.palier_source][0][0]
-                        chanson = self.dictionnaire_chansons[self.palier_source][0][0]
-                        # Ajout de cette image et de la colonne de la position cible dans la liste correspondante à la
-                        # ligne de la position cible dans le dictionnaire d'images :
-                        self.dictionnaire_images[self.palier_cible].append([image, self.position_cible])
-                        self.dictionnaire_chansons[self.palier_cible].append([chanson, self.position_cible])
-                        # Initialisation de la liste correpondante à la ligne de la position source à une liste vide:
-                        self.dictionnaire_images[self.palier_source] = []
-                        self.dictionnaire_chansons[self.palier_source] = []
-                        # print(f"Dictionnaire d'images : {self.dictionnaire_images}")
-                        # Ajout d'une chanson sur le palier correspondant à la ligne de la position cible :
-                        self.nombre_chansons_par_palier[self.palier_cible] += 1
-                        # print(f"Nombre de chansons par palier : {self.nombre_chansons_par_palier}")
-                    else:
-                        for sequence in self.dictionnaire_images[self.palier_source]:
-                            if sequence[1] == self.position_source:
-                                # print(f"Séquence : {sequence}")
-                                # Stockage en mémoire de l'image en position source :
-                                image = sequence[0]
-                                chanson = ""
-                                couple_a_enlever = []
-                                for couple in self.dictionnaire_chansons[self.palier_source]:
-                                    if couple[1] == self.position_source:
-                                        chanson = couple[0]
-                                        couple_a_enlever = couple
-                                # Ajout de cette image et de la colonne de la position cible dans la liste
-                                # correspondante à la ligne de la position cible dans le dictionnaire d'images :
-                                self.dictionnaire_images[self.palier_cible].append(
-                                    [image, self.position_cible])
-                                self.dictionnaire_chansons[self.palier_cible].append(
-                                    [chanson, self.position_cible])
-
-                                # Réinitialisation de la liste correpondante à la ligne de la position source :
-                                self.dictionnaire_images[self.palier_source].remove(sequence)
-                                self.dictionnaire_chansons[self.palier_source].remove(couple_a_enlever)
-                                # Suppression d'une chanson sur le palier correspondant à la ligne de la position
-                                # source :
-                                self.nombre_chansons_par_palier[self.palier_source] -= 1
-                                # Ajout d'une chanson sur le palier correspondant à la ligne de la position cible :
-                                self.nombre_chansons_par_palier[self.palier_cible] += 1
-                                # print(f"Nombre de chansons par palier : {self.nombre_chansons_par_palier}")
-                    # Correction du nombre de lignes par palier :
-                    self.correction_paliers()
-                    # Mise à jour de l'affichage du canvas :
-                    self.actualiser_images()
-                    # print(f"Dictionnaire d'images : {self.dictionnaire_images}")
-                    # print(f"Dictionnaire de chansons : {self.dictionnaire_chansons}")
-                    # Réinitialisation des positions source et cible :
-                    self.position_source = None
-                    self.position_cible = None
-                    self.palier_source = None
-                    self.palier_cible = None
-
-            elif position.colonne == self.canvas_tier_list.nombre_colonnes-1:
-                self.position_cible = position
-                # Choix palier cible :
-                for i in self.dictionnaire_positions_par_palier:
-                    if self.position_cible.ligne in self.dictionnaire_positions_par_palier[i]:
-                        self.palier_cible = i
-                # print(f"Position cible : {self.position_cible}")
-                # print(f"Palier cible : {self.palier_cible}")
-                self.canvas_tier_list.delete('contour')
-                self.canvas_tier_list.delete('nom_complet')
-                for sequence in self.dictionnaire_images[self.palier_source]:
-                    if sequence[1] == self.position_source:
-                        # print(f"Séquence : {sequence}")
-                        # Stockage en mémoire de l'image en position source :
-                        couple_a_enlever = []
-                        for couple in self.dictionnaire_chansons[self.palier_source]:
-                            if couple[1] == self.position_source:
-                                couple_a_enlever = couple
-
-                        # Réinitialisation de la liste correpondante à la ligne de la position source :
-                        self.dictionnaire_images[self.palier_source].remove(sequence)
-                        self.dictionnaire_chansons[self.palier_source].remove(couple_a_enlever)
-                        # Suppression d'une chanson sur le palier correspondant à la ligne de la position source :
-                        self.nombre_chansons_par_palier[self.palier_source] -= 1
-                        # print(f"Nombre de chansons par palier : {self.nombre_chansons_par_palier}")
-                # Correction du nombre de lignes par palier :
-                self.correction_paliers()
-                # Mise à jour de l'affichage du canvas :
-                self.actualiser_images()
-                # Réinitialisation des positions source et cible :
-                self.position_source = None
-                self.position_cible = None
-                self.palier_source = None
-                self.palier_cible = None
+                    self.affichage_titre_chanson_au_complet(chanson.chanson, self.position_source)
+                    # La chanson peut aussi être glissée jusqu'à sa cible :
+                    self.debut_glissement(event)
+
+            elif (not self.deposer_chanson(position) and
+                  self.tier_list.chanson_a(position) is self.chanson_source):
+                # Une image déjà choisie; choix du palier cible ou de la corbeille, ou glissement de l'image choisie :
+                self.debut_glissement(event)
+
+    def deposer_chanson(self, position):
+        """Dépose la chanson sélectionnée sur une case : la chanson est déplacée à la fin du palier de la case, ou
+        retirée du tableau si la case est la corbeille. Le modèle et l'affichage ne sont mis à jour qu'une fois.
+
+        Args:
+            position (Position): La case sur laquelle la chanson est déposée.
+
+        Returns:
+            bool: Vrai si la chanson a été déplacée ou retirée, faux si la case n'est pas une cible valide.
+
+        """
+        if position.ligne != self.tier_list.ligne_boutton:
+            palier_cible = self.tier_list.palier_de_ligne(position.ligne)
+            if palier_cible is None or palier_cible == self.palier_source:
+                return False
+            # Position cible valide :
+            # print(f"Palier cible : {palier_cible}")
+            self.canvas_tier_list.delete('contour')
+            self.canvas_tier_list.delete('nom_complet')
+            operation = {'operation': 'deplacement', 'palier': self.palier_source,
+                         'indice': self.indice_chanson_source(), 'palier_cible': palier_cible}
+            # Déplacement de la chanson à la fin du palier cible (le nombre de lignes par palier est corrigé par le
+            # modèle) :
+            if self.tier_list.deplacer(self.chanson_source, palier_cible):
+                self.changement = True
+            self.journalisation(operation)
+
+        elif position.colonne == self.canvas_tier_list.nombre_colonnes-1:
+            # Corbeille
+            self.canvas_tier_list.delete('contour')
+            self.canvas_tier_list.delete('nom_complet')
+            operation = {'operation': 'suppression', 'palier': self.palier_source,
+                         'indice': self.indice_chanson_source()}
+            if self.tier_list.retirer(self.chanson_source):
+                self.changement = True
+            self.journalisation(operation)
+            self.chemins_chansons.pop(self.chanson_source, None)
+
+        else:
+            return False
+
+        # Mise à jour de l'affichage du canvas :
+        self.actualiser_images()
+        # Réinitialisation de la sélection :
+        self.reinitialisation_selection()
+        return True
+
+    def debut_glissement(self, event):
+        # Une chanson vient d'être choisie sous le pointeur; elle suivra le pointeur s'il se déplace avant d'être
+        # relâché :
+        if self.chanson_source is not None:
+            self.glissement = {'chanson': self.chanson_source, 'depart': (event.x, event.y),
+                               'pointeur': (event.x, event.y), 'affiche': (event.x, event.y), 'actif': False,
+                               'prevu': None}
+
+    def glisser(self, event):
+        """Suit le pointeur pendant le glissement d'une chanson. Les événements de mouvement ne font que mémoriser la
+        position du pointeur; les éléments de la chanson glissée (les seuls à bouger) sont déplacés au plus une fois
+        par trame (voir suivi_glissement).
+
+        """
+        glissement = self.glissement
+        if glissement is None:
+            return
+        glissement['pointeur'] = (event.x, event.y)
+        if not glissement['actif']:
+            # Le glissement ne commence qu'au-delà d'un petit seuil, afin qu'un simple clic reste une sélection :
+            depart_x, depart_y = glissement['depart']
+            if max(abs(event.x - depart_x), abs(event.y - depart_y)) < SEUIL_GLISSEMENT:
+                return
+            glissement['actif'] = True
+            self.canvas_tier_list.delete('contour')
+            self.canvas_tier_list.delete('nom_complet')
+            items = self.items_chansons.get(glissement['chanson'])
+            if items is not None:
+                # La chanson glissée passe au-dessus des autres :
+                for identifiant in items['identifiants']:
+                    self.canvas_tier_list.tag_raise(identifiant)
+        if glissement['prevu'] is None:
+            glissement['prevu'] = self.after(DUREE_TRAME, self.suivi_glissement)
+
+    @instrumenter
+    def suivi_glissement(self):
+        # Déplacement des éléments de la chanson glissée jusqu'à la dernière position connue du pointeur :
+        glissement = self.glissement
+        if glissement is None:
+            return
+        glissement['prevu'] = None
+        items = self.items_chansons.get(glissement['chanson'])
+        if items is None:
+            # Chanson sortie de la zone dessinée (ses éléments ont pu être réutilisés) :
+            return
+        pointeur_x, pointeur_y = glissement['pointeur']
+        affiche_x, affiche_y = glissement['affiche']
+        for identifiant in items['identifiants']:
+            self.canvas_tier_list.move(identifiant, pointeur_x - affiche_x, pointeur_y - affiche_y)
+        glissement['affiche'] = glissement['pointeur']
+
+    @instrumenter
+    def fin_glissement(self, event):
+        """Dépose la chanson glissée sur la case où le pointeur est relâché (voir deposer_chanson). Si la case n'est pas
+        une cible valide, la chanson reprend sa place et la sélection est annulée. Sans mouvement du pointeur, le clic
+        reste une simple sélection.
+
+        """
+        glissement = self.glissement
+        self.glissement = None
+        if glissement is None or not glissement['actif']:
+            return
+        if glissement['prevu'] is not None:
+            self.after_cancel(glissement['prevu'])
+        chanson = glissement['chanson']
+        position = Position(event.y // self.canvas_tier_list.n_pixels_par_case,
+                            event.x // self.canvas_tier_list.n_pixels_par_case)
+        if chanson is self.chanson_source and self.deposer_chanson(position):
+            return
+        # Retour de la chanson à sa case :
+        items = self.items_chansons.get(chanson)
+        if items is not None:
+            coordonnees = self.coordonnees_chanson(items['position'], items['longueur'])
+            for identifiant, coordonnees_item in zip(items['identifiants'], coordonnees):
+                self.canvas_tier_list.coords(identifiant, *coordonnees_item)
+        if chanson is self.chanson_source:
+            self.reinitialisation_selection()
+
+    def indice_chanson_source(self):
+        # Rang de la chanson sélectionnée dans son palier (identifie la chanson dans le journal) :
+        return self.tier_list.chansons_par_palier[self.palier_source].index(self.chanson_source)
+
+    def reinitialisation_selection(self):
+        self.chanson_source = None
+        self.position_source = None
+        self.palier_source = None
 
     def selectionner_clic_droit(self, event):
         if self.modele is not None:
@@ -309,12 +324,12 @@ class FenetreTierList(Tk):
 
             if self.position_source is not None:
                 if position == self.position_source:
-                    self.position_source = None
-                    self.palier_source = None
+                    self.reinitialisation_selection()
                     self.canvas_tier_list.delete('contour')
                     self.canvas_tier_list.delete('nom_complet')
 
-    def dessiner_images(self):
+    @instrumenter
+    def dessiner_images(self, paliers=None):
         self.canvas_tier_list.actualiser(self.modele)
 
         if self.changement:
@@ -325,108 +340,208 @@ class FenetreTierList(Tk):
             self.my_canvas.configure(scrollregion=(0, 0, largeur, hauteur))
             if hauteur >= 981:
                 hauteur = 981
-            self.geometry(f"{largeur + 23}x{hauteur + 6}+0+0")
+            self.fenetre.dimensionner(self, largeur + 23, hauteur + 6, '+0+0')
         self.changement = False
 
-        # Parcourt les lignes sur lesquelles sont déjà placées les images :
-        for palier in self.dictionnaire_images:
-            if not self.dictionnaire_images[palier] == []:
-                if palier == self.canvas_tier_list.nombre_paliers:
-                    # Image vient d'apparaître
-                    # Stockage en mémoire de l'image de et de la chanson :
-                    album = self.dictionnaire_images[palier][0][0]
-                    chanson = self.dictionnaire_chansons[palier][0][0]
-                    # Dessin de l'image :
-                    self.canvas_tier_list.create_image(2 * self.canvas_tier_list.n_pixels_par_case,
-                                                       self.canvas_tier_list.ligne_boutton *
-                                                       self.canvas_tier_list.n_pixels_par_case,
-                                                       image=album, tags='image', anchor='nw')
-
-                    # Affichage du titre de la chanson :
-                    chanson_raccourcie = self.raccourcissement_chanson(chanson)
-                    longueur_chanson = self.calibrage_longueur_rectangle(chanson_raccourcie)
-
-                    centre_x = 2.5 * self.canvas_tier_list.n_pixels_par_case
-                    centre_y = (self.canvas_tier_list.ligne_boutton+0.85) * self.canvas_tier_list.n_pixels_par_case
-
-                    hgx_rectangle = centre_x - (longueur_chanson / 2)
-                    hgy_rectangle = (self.canvas_tier_list.ligne_boutton+0.77) * self.canvas_tier_list.n_pixels_par_case
-                    bdx_rectangle = centre_x + (longueur_chanson / 2)
-                    bdy_rectangle = (self.canvas_tier_list.ligne_boutton+0.95) * self.canvas_tier_list.n_pixels_par_case
-
-                    self.canvas_tier_list.create_rectangle(hgx_rectangle, hgy_rectangle, bdx_rectangle, bdy_rectangle,
-                                                           fill='yellow', width=0, tags='image')
-
-                    self.canvas_tier_list.create_text(centre_x, centre_y,
-                                                      text=f'{chanson_raccourcie}', fill='black', tags='image',
-                                                      font=f'Arial {self.canvas_tier_list.taille} bold')
+        self.dessiner_chansons_visibles(paliers)
+
+    @instrumenter
+    def dessiner_chansons_visibles(self, paliers=None):
+        """Dessine les chansons des lignes visibles (et de la marge), les seules à avoir des éléments sur le canvas.
+        Seules les différences avec l'affichage précédent sont appliquées : les chansons déplacées sont bougées avec
+        coords(), les chansons qui apparaissent reçoivent des éléments (réutilisés si possible) et les éléments des
+        chansons qui disparaissent sont masqués.
+
+        Args:
+            paliers (list): Les seuls paliers à redessiner, ceux dont les cases ont changé (tous si None). Les
+                chansons des autres paliers gardent leurs éléments; la zone visible ne doit donc pas avoir changé.
+
+        """
+        self.defilement_prevu = None
+        premiere_ligne, derniere_ligne = self.lignes_visibles()
+        derniere_ligne = min(derniere_ligne, self.tier_list.nombre_lignes - 1)
+        if paliers is None:
+            lignes = range(premiere_ligne, derniere_ligne + 1)
+        else:
+            paliers = set(paliers)
+            lignes = [ligne for palier in sorted(paliers) for ligne in self.tier_list.disposition.lignes(palier)
+                      if premiere_ligne <= ligne <= derniere_ligne]
+        chansons_affichees = set()
+
+        # Parcourt les chansons placées sur les lignes à dessiner (le modèle a déjà calculé leurs cases) :
+        for ligne in lignes:
+            for chanson in self.tier_list.chansons_de_ligne(ligne):
+                self.placer_chanson(chanson)
+                chansons_affichees.add(chanson)
+
+        # Libération des éléments et des PhotoImage des chansons qui ne sont plus visibles ou plus sur le tableau :
+        for chanson in list(self.items_chansons):
+            if chanson not in chansons_affichees and (paliers is None or chanson.palier is None or
+                                                      chanson.palier in paliers):
+                items = self.items_chansons.pop(chanson)
+                for identifiant in items['identifiants']:
+                    self.canvas_tier_list.itemconfigure(identifiant, state='hidden')
+                self.items_libres.append(items['identifiants'])
+                self.images.liberer(items['photo'])
+        # Les éléments libres en surplus (plus nombreux que les éléments affichés) sont supprimés :
+        while len(self.items_libres) > len(self.items_chansons):
+            self.canvas_tier_list.delete(*self.items_libres.pop())
+
+    def lignes_visibles(self):
+        # Première et dernière lignes du tableau qui touchent la zone affichée, marge comprise :
+        n_pixels = self.canvas_tier_list.n_pixels_par_case
+        hauteur = self.my_canvas.winfo_height()
+        if hauteur <= 1:
+            # Fenêtre pas encore affichée; la hauteur demandée est utilisée :
+            hauteur = int(float(self.my_canvas['height']))
+        haut = self.my_canvas.canvasy(0)
+        return (max(0, int(haut // n_pixels) - MARGE_LIGNES_VISIBLES),
+                int((haut + hauteur) // n_pixels) + MARGE_LIGNES_VISIBLES)
+
+    def defilement(self, debut, fin):
+        # Mise à jour de la barre de défilement; les chansons visibles sont redessinées une seule fois par cycle :
+        self.my_scrollbar.set(debut, fin)
+        if self.defilement_prevu is None and self.tier_list is not None:
+            self.defilement_prevu = self.after_idle(self.dessiner_chansons_visibles)
+
+    @instrumenter
+    def zoomer(self, n_pixels_par_case):
+        """Change la taille des cases de l'onglet. Le tableau est redessiné à la nouvelle taille, et les miniatures des
+        chansons visibles sont réduites à partir de la pyramide des miniatures (voir cache_miniatures.py), sans décoder
+        les images originales.
+
+        Args:
+            n_pixels_par_case (int): La nouvelle taille d'une case, en pixels.
+
+        """
+        if n_pixels_par_case == self.canvas_tier_list.n_pixels_par_case:
+            return
+        # Les éléments des chansons sont recréés à la nouvelle taille (image et police) :
+        for items in self.items_chansons.values():
+            self.canvas_tier_list.delete(*items['identifiants'])
+            self.images.liberer(items['photo'])
+        for identifiants in self.items_libres:
+            self.canvas_tier_list.delete(*identifiants)
+        self.items_chansons = {}
+        self.items_libres = []
+        self.canvas_tier_list.delete('contour')
+        self.canvas_tier_list.delete('nom_complet')
+
+        self.canvas_tier_list.zoomer(n_pixels_par_case)
+        police = f'Arial {self.canvas_tier_list.taille+1} bold'
+        for widget in (self.boutton, self.capture, self.label_compteur):
+            widget['font'] = police
+        if self.tier_list is None:
+            # Aucun modèle choisi; le tableau sera dessiné à la nouvelle taille :
+            return
+
+        # Même position relative de la zone affichée :
+        debut = self.my_canvas.yview()[0]
+        self.oubli_prechargements()
+        self.prechargement_visibles()
+        self.prechargement()
+        self.positionnement_widgets()
+        self.changement = True
+        self.dessiner_images()
+        self.my_canvas.yview_moveto(debut)
+        if self.position_source is not None:
+            self.canvas_tier_list.selectionner_chanson(self.position_source)
+            self.affichage_titre_chanson_au_complet(self.chanson_source.chanson, self.position_source)
+
+    def placer_chanson(self, chanson_placee):
+        """Dessine l'image et le titre d'une chanson à sa position. Si la chanson est déjà sur le canvas, ses éléments
+        sont simplement déplacés (et seulement si sa position a changé).
+
+        Args:
+            chanson_placee (ChansonPlacee): La chanson placée à dessiner.
+
+        """
+        position = chanson_placee.position
+        items = self.items_chansons.get(chanson_placee)
+        if items is not None:
+            if items['position'] != position:
+                coordonnees = self.coordonnees_chanson(position, items['longueur'])
+                for identifiant, coordonnees_item in zip(items['identifiants'], coordonnees):
+                    self.canvas_tier_list.coords(identifiant, *coordonnees_item)
+                items['position'] = position
+            return
+
+        # PhotoImage épinglée tant que la chanson est visible (reconstruite à partir de sa miniature si elle a été
+        # évincée) :
+        taille = (self.canvas_tier_list.n_pixels_par_case, self.canvas_tier_list.n_pixels_par_case)
+        cle_photo, photo = self.images.acquerir(self.chemins_chansons.get(chanson_placee), taille)
+
+        # Affichage du titre de la chanson :
+        chanson_raccourcie = self.raccourcissement_chanson(chanson_placee.chanson)
+        longueur_chanson = self.calibrage_longueur_rectangle(chanson_raccourcie)
+        coordonnees_image, coordonnees_rectangle, coordonnees_texte = self.coordonnees_chanson(position,
+                                                                                               longueur_chanson)
+        if self.items_libres:
+            # Réutilisation des éléments d'une chanson qui n'est plus visible :
+            compter('items_reutilises')
+            id_image, id_rectangle, id_texte = self.items_libres.pop()
+            self.canvas_tier_list.coords(id_image, *coordonnees_image)
+            self.canvas_tier_list.itemconfigure(id_image, image=photo, state='normal')
+            self.canvas_tier_list.coords(id_rectangle, *coordonnees_rectangle)
+            self.canvas_tier_list.itemconfigure(id_rectangle, state='normal')
+            self.canvas_tier_list.coords(id_texte, *coordonnees_texte)
+            self.canvas_tier_list.itemconfigure(id_texte, text=f'{chanson_raccourcie}', state='normal')
+        else:
+            compter('items_crees')
+            # Dessin de l'image :
+            id_image = self.canvas_tier_list.create_image(*coordonnees_image, image=photo, tags='image', anchor='nw')
+            id_rectangle = self.canvas_tier_list.create_rectangle(*coordonnees_rectangle, fill='yellow', width=0,
+                                                                  tags='image')
+            id_texte = self.canvas_tier_list.create_text(*coordonnees_texte, text=f'{chanson_raccourcie}',
+                                                         fill='black', tags='image',
+                                                         font=f'Arial {self.canvas_tier_list.taille} bold')
+        self.items_chansons[chanson_placee] = {'identifiants': (id_image, id_rectangle, id_texte), 'position': position,
+                                          'longueur': longueur_chanson, 'photo': cle_photo}
+
+    def coordonnees_chanson(self, position, longueur_chanson):
+        n_pixels = self.canvas_tier_list.n_pixels_par_case
+        centre_x = (position.colonne + 0.5) * n_pixels
+        centre_y = (position.ligne + 0.85) * n_pixels
+
+        hgx_rectangle = centre_x - (longueur_chanson / 2)
+        hgy_rectangle = (position.ligne + 0.77) * n_pixels
+        bdx_rectangle = centre_x + (longueur_chanson / 2)
+        bdy_rectangle = (position.ligne + 0.95) * n_pixels
 
-                else:
+        return ((position.colonne * n_pixels, position.ligne * n_pixels),
+                (hgx_rectangle, hgy_rectangle, bdx_rectangle, bdy_rectangle),
+                (centre_x, centre_y))
 
-                    # Images sur le tableau
-                    limite = (self.canvas_tier_list.nombre_colonnes - 2)
-
-                    # Parcourt les listes contenant l'image et le numéro de colonne correspondant au numéro de la ligne:
-                    for i in range(self.nombre_chansons_par_palier[palier]):
-                        indice = i//limite
-
-                        # Stockage en mémoire de l'image de et de la chanson :
-                        album = self.dictionnaire_images[palier][i][0]
-                        chanson = self.dictionnaire_chansons[palier][i][0]
-
-                        # Dessin de l'image :
-                        self.canvas_tier_list.create_image(((2+i)-(limite * indice)) *
-                                                           self.canvas_tier_list.n_pixels_par_case,
-                                                           self.dictionnaire_positions_par_palier[palier][indice] *
-                                                           self.canvas_tier_list.n_pixels_par_case,
-                                                           image=album, tags='image', anchor='nw')
-
-                        # Affichage du titre de la chanson :
-                        chanson_raccourcie = self.raccourcissement_chanson(chanson)
-                        longueur_chanson = self.calibrage_longueur_rectangle(chanson_raccourcie)
-
-                        centre_x = ((2.5 + i)-(limite * indice)) * self.canvas_tier_list.n_pixels_par_case
-                        centre_y = ((self.dictionnaire_positions_par_palier[palier][indice] + 0.85) *
-                                    self.canvas_tier_list.n_pixels_par_case)
-
-                        hgx_rectangle = centre_x - (longueur_chanson / 2)
-                        hgy_rectangle = ((self.dictionnaire_positions_par_palier[palier][indice] + 0.77) *
-                                         self.canvas_tier_list.n_pixels_par_case)
-                        bdx_rectangle = centre_x + (longueur_chanson / 2)
-                        bdy_rectangle = ((self.dictionnaire_positions_par_palier[palier][indice] + 0.95) *
-                                         self.canvas_tier_list.n_pixels_par_case)
-
-                        self.canvas_tier_list.create_rectangle(hgx_rectangle, hgy_rectangle, bdx_rectangle,
-                                                               bdy_rectangle, fill='yellow', width=0, tags='image')
-
-                        self.canvas_tier_list.create_text(centre_x, centre_y,
-                                                          text=f'{chanson_raccourcie}', fill='black', tags='image',
-                                                          font=f'Arial {self.canvas_tier_list.taille} bold')
-
-                        nouvelle_ligne = self.dictionnaire_positions_par_palier[palier][indice]
-                        nouvelle_colonne = ((2+i)-(limite * indice))
-                        nouvelle_position = Position(nouvelle_ligne, nouvelle_colonne)
-                        # print(f"Nouvelle position : {nouvelle_position}")
-                        # Mise à jour du nouveau numéro de colonne de l'image :
-                        self.dictionnaire_images[palier][i][1] = nouvelle_position
-                        # print(self.dictionnaire_images[palier])
-
-                        # Mise à jour du numéro de colonne de la chanson correspondante :
-                        self.dictionnaire_chansons[palier][i][1] = nouvelle_position
-                        # print(self.dictionnaire_chansons[palier])
+    def police(self, taille):
+        # Une seule police Tk par taille, créée au premier besoin :
+        if taille not in self.polices:
+            self.polices[taille] = tkfont.Font(family="Arial", size=taille, weight="bold")
+        return self.polices[taille]
 
     def raccourcissement_chanson(self, chanson):
-        font = tkfont.Font(family="Arial", size=self.canvas_tier_list.taille, weight="bold")
-        longueur_chanson = font.measure(chanson) + 5
-        while longueur_chanson > self.canvas_tier_list.n_pixels_par_case:
-            chanson = chanson[:-1]
-            longueur_chanson = font.measure(chanson) + 5
-        return chanson
+        taille = self.canvas_tier_list.taille
+        largeur_maximale = self.canvas_tier_list.n_pixels_par_case
+        cle = (chanson, taille, largeur_maximale)
+        if cle not in self.titres_raccourcis:
+            # Recherche dichotomique du plus long début du titre qui tient dans une case :
+            minimum = 0
+            maximum = len(chanson)
+            while minimum < maximum:
+                milieu = (minimum + maximum + 1) // 2
+                if self.calibrage_longueur_rectangle(chanson[:milieu]) > largeur_maximale:
+                    maximum = milieu - 1
+                else:
+                    minimum = milieu
+            self.titres_raccourcis[cle] = chanson[:minimum]
+        return self.titres_raccourcis[cle]
 
     def calibrage_longueur_rectangle(self, chanson):
-        font = tkfont.Font(family="Arial", size=self.canvas_tier_list.taille, weight="bold")
-        longueur_chanson = font.measure(chanson) + 5
-        return longueur_chanson
+        cle = (chanson, self.canvas_tier_list.taille)
+        if cle not in self.longueurs_titres:
+            font = self.police(self.canvas_tier_list.taille)
+            with intervalle('mesure_texte'):
+                self.longueurs_titres[cle] = font.measure(chanson) + 5
+        return self.longueurs_titres[cle]
 
     def affichage_titre_chanson_au_complet(self, chanson, position):
         longueur_chanson = self.calibrage_longueur_rectangle(chanson)
@@ -445,187 +560,195 @@ class FenetreTierList(Tk):
         self.canvas_tier_list.create_text(centre_x, centre_y, text=f'{chanson}', fill='black',
                                           tags='nom_complet', font=f'Arial {self.canvas_tier_list.taille} bold')
 
+    @instrumenter
     def nouvelle_chanson(self):
-        if self.menubar.index(3) is not None and self.menubar.index(2) is not None and self.categorie is not None:
+        if self.categorie is not None:
             # Catégorie choisie; impossible de changer une fois la première chanson est appelée :
-            self.modele_menu.destroy()
-            self.menubar.delete(3)
-            self.categorie_menu.destroy()
-            self.menubar.delete(2)
-        while (len(self.liste_artistes) != 0 and self.dictionnaire_images[self.canvas_tier_list.nombre_paliers] == []
-               and self.position_source is None):
-            # Liste des artistes est non vide
-            # Choix du premier artiste :
-            artiste = self.liste_artistes[0]
+            self.commencee = True
+        # Toutes les chansons avaient-elles déjà été appelées?
+        file_vide = len(self.file_chansons) == 0
+        while (len(self.file_chansons) != 0 and self.tier_list is not None and
+               self.tier_list.chanson_en_attente() is None and self.position_source is None):
+            # File des chansons non vide
+            # Choix de la première chanson du premier artiste :
+            artiste, chanson = self.file_chansons.premiere()
+            # Image correspondante à la chanson (sa miniature est habituellement déjà préparée) :
+            chemin = self.index_images.chemin(artiste, chanson)
+            if chemin is None:
+                messagebox.showerror(title="Image introuvable!", message="Ajoutez des images manquantes!")
+                break
+            # Supression de la chanson choisie de la file (et de l'artiste avec sa dernière chanson) :
+            self.file_chansons.avancer()
             if artiste not in self.artistes_utilises:
                 self.artistes_utilises.append(artiste)
-            if len(self.dictionnaire_artistes_chansons[artiste]) == 0:
-                # Aucune chanson de l'artiste restante à classer
-                # Supression de l'artiste :
-                self.liste_artistes = self.liste_artistes[1:]
-                try:
-                    # Choix prochain artiste :
-                    artiste = self.liste_artistes[0]
-                except IndexError:
-                    self.compteur = 0
-                    break
-            # Choix première chanson de l'artiste :
-            chanson = self.dictionnaire_artistes_chansons[artiste][0]
-            self.compteur -= 1
-            # Ouverture image correspondante à la chanson :
-            try:
-                image = Image.open(f"{self.categorie}/{artiste}_{chanson}.jpg")
-            except FileNotFoundError:
-                try:
-                    image = Image.open(f"{self.categorie}/{artiste}_{chanson}.png")
-                except FileNotFoundError:
-                    messagebox.showerror(title="Image introuvable!", message="Ajoutez des images manquantes!")
-                    break
-            # Supression de la chanson choisie de la liste :
-            self.dictionnaire_artistes_chansons[artiste].pop(0)
-            image = image.resize((self.canvas_tier_list.n_pixels_par_case, self.canvas_tier_list.n_pixels_par_case))
-            image_tk = ImageTk.PhotoImage(image)
-            position_arrivee = Position((self.canvas_tier_list.nombre_lignes - 1), 2)
-            # Ajout image dans le dictionnaire d'images à la dernière ligne :
-            self.dictionnaire_images[self.canvas_tier_list.nombre_paliers].append([image_tk, position_arrivee])
-            # Ajout chanson dans le dictionnaire d'images à la dernière ligne :
-            self.dictionnaire_chansons[self.canvas_tier_list.nombre_paliers].append([chanson, position_arrivee])
+            # Ajout de la chanson au palier d'arrivée (ligne des boutons) :
+            chanson_placee, _ = self.tier_list.inserer(artiste, chanson, self.tier_list.palier_arrivee)
+            self.chemins_chansons[chanson_placee] = chemin
+            self.journalisation({'operation': 'appel', 'artiste': artiste, 'chanson': chanson})
             # Mise à jour de l'affichage du canvas :
             self.actualiser_images()
-            # print(f"Dictionnaires des artistes et de leurs chansons : {self.dictionnaire_artistes_chansons}")
+            # Préparation en arrière-plan des prochaines chansons :
+            self.prechargement()
             break
-        if len(self.liste_artistes) == 0:
-            # Listes des artistes est vide
-            if len(self.dictionnaire_artistes_chansons) == 0:
-                # Dictionnaire des artistes et des chansons est vide (aucune catégorie choisie)
+        if file_vide:
+            # File des chansons vide
+            if self.categorie is None:
+                # Aucune catégorie choisie
                 messagebox.showerror(title="ERREUR", message="Veillez sélectionner une catégorie!")
             else:
-                # Dictionnaire des artistes et des chansons n'est pas vide (toutes les chansons de la catégorie ont été
-                # classées)
+                # Toutes les chansons de la catégorie ont été classées
                 messagebox.showinfo(title="Félicitations!", message="Toutes les chansons ont été classées avec succès!")
 
+    def prechargement_visibles(self):
+        # Préparation en parallèle des miniatures des chansons des lignes visibles :
+        premiere_ligne, derniere_ligne = self.lignes_visibles()
+        chemins = [self.chemins_chansons.get(chanson)
+                   for ligne in range(premiere_ligne, min(derniere_ligne, self.tier_list.nombre_lignes - 1) + 1)
+                   for chanson in self.tier_list.chansons_de_ligne(ligne)]
+        taille = (self.canvas_tier_list.n_pixels_par_case, self.canvas_tier_list.n_pixels_par_case)
+        self.prevoir([chemin for chemin in chemins if chemin is not None], taille)
+
+    def prechargement(self):
+        taille = (self.canvas_tier_list.n_pixels_par_case, self.canvas_tier_list.n_pixels_par_case)
+        prochaines_chansons = islice(self.file_chansons, PROFONDEUR_PRECHARGEMENT)
+        chemins = [self.index_images.chemin(artiste, chanson) for artiste, chanson in prochaines_chansons]
+        self.prevoir([chemin for chemin in chemins if chemin is not None], taille)
+
+    def prevoir(self, chemins, taille):
+        # Les préparations demandées par l'onglet sont retenues, afin d'être oubliées si elles ne sont plus attendues :
+        self.images.prevoir(chemins, taille)
+        self.prechargements.update((chemin, taille) for chemin in chemins)
+
+    def oubli_prechargements(self):
+        # Changement de catégorie ou de taille des cases, ou onglet fermé : les préparations en attente ne seront plus
+        # demandées; leurs miniatures, hors du budget de mémoire, sont libérées.
+        self.images.oublier(self.prechargements)
+        self.prechargements = set()
+
+    def demarrage_journal(self):
+        # Nouveau journal pour la session, qui commence par un instantané de l'état actuel :
+        if self.journal is not None:
+            self.journal.fermer()
+        self.journal = JournalTierList(self.categorie)
+        self.compaction()
+
+    def journalisation(self, operation):
+        # L'opération (déjà appliquée au modèle) est confiée au fil du journal; un nouvel instantané est demandé
+        # périodiquement, ou aussitôt si les fichiers de récupération ont été effacés (sauvegarde) :
+        if self.journal is not None:
+            self.journal.ajouter(operation)
+            self.operations_journalisees += 1
+            if self.operations_journalisees >= INTERVALLE_COMPACTION or self.journal.efface:
+                self.compaction()
+
+    def compaction(self):
+        dictionnaire_artistes_chansons, liste_artistes = self.file_chansons.artistes_chansons()
+        self.journal.instantane(creer_sauvegarde(self.modele, self.tier_list, dictionnaire_artistes_chansons,
+                                                 liste_artistes, self.artistes_utilises))
+        self.operations_journalisees = 0
+
+    @instrumenter
     def actualiser_images(self):
+        # Mise à jour des dimensions du canvas selon le modèle :
+        self.synchronisation_canvas()
         # Mise à jour de la position des widgets :
         self.positionnement_widgets()
-        # Mise à jour des images :
-        self.canvas_tier_list.delete('image')
-        self.dessiner_images()
-
-    def remplissage_fichier_texte(self):
-        arret = False
-        print(f"Veuillez choisir une catégorie parmi : {self.liste_categories}")
-        categorie = input("Catégorie : ")
-        while categorie not in self.liste_categories:
-            if categorie == "x":
-                exit()
-            else:
-                print(f"Veuillez choisir une catégorie parmi : {self.liste_categories}")
-                categorie = input("Catégorie : ")
-        fichier_texte = open(f'Catégorie_{categorie}/Liste_artistes-chansons.txt', 'w')
-        while not arret:
-            artiste = input("Artiste : ")
-            if artiste == 'x':
-                break
-            fichier_texte.write(f"{artiste} : ")
-            chanson = input("Chanson : ")
-            if chanson != 'x':
-                fichier_texte.write(f"{chanson}")
-            while chanson != 'x':
-                chanson = input("Chanson : ")
-                if chanson != 'x':
-                    fichier_texte.write(" | ")
-                    fichier_texte.write(f"{chanson}")
-                else:
-                    fichier_texte.write(f"\n")
-        fichier_texte.close()
+        # Mise à jour des images des seuls paliers qui ont changé (tous si le nombre de lignes a changé, ce qui peut
+        # changer la zone visible) :
+        self.dessiner_images(None if self.changement else self.tier_list.paliers_modifies)
 
     def lecture_fichier_texte(self):
-        dictionnaire = {}
-        liste = []
-        try:
-            fichier_texte = open(f"{self.categorie}/Liste_artistes-chansons.txt", "r")
-            ligne_artiste = fichier_texte.readline()
-            while ligne_artiste != "":
-                ligne_artiste = ligne_artiste.rstrip("\n")
-                artiste = ""
-                for caractere in ligne_artiste:
-                    if caractere == " ":
-                        ligne_artiste = ligne_artiste.lstrip(f"{artiste} : ")
-                        if "_" in ligne_artiste:
-                            ligne_artiste = ligne_artiste.lstrip("_")
-                        break
-                    artiste += caractere
-                dictionnaire[artiste] = []
-                liste.append(artiste)
-
-                ligne_artiste = ligne_artiste.split(" | ")
-                for chanson in ligne_artiste:
-                    dictionnaire[artiste].append(chanson)
-
-                ligne_artiste = fichier_texte.readline()
-            fichier_texte.close()
-            return dictionnaire, liste
-        except FileNotFoundError:
-            return dictionnaire, liste
+        return lecture_fichier_texte(self.categorie)
 
+    @instrumenter
     def screenshot(self):
-        box = (self.canvas_tier_list.winfo_rootx()+1, self.canvas_tier_list.winfo_rooty()+1,
-               self.canvas_tier_list.winfo_rootx() + self.canvas_tier_list.winfo_width()-2,
-               self.canvas_tier_list.winfo_rooty() + self.canvas_tier_list.winfo_height() -
-               self.canvas_tier_list.n_pixels_par_case-2)
-        grab = ImageGrab.grab(bbox=box)
-        grab.save(f'{self.categorie}/TierListCompletée.png')
-
-    def correction_paliers(self):
-        for palier in range(self.canvas_tier_list.nombre_paliers):
-            if palier != self.canvas_tier_list.nombre_paliers and self.dictionnaire_images[palier] != []:
-                limite_colonnes = self.canvas_tier_list.nombre_colonnes - 2
-                nombre_colonnes = self.nombre_chansons_par_palier[palier]
-                lignes_par_palier = self.canvas_tier_list.dictionnaire_lignes_par_palier[palier]
-
-                indice_longueur = 0
-                for numero in self.dictionnaire_positions_par_palier:
-                    if numero == (palier + 1):
-                        break
-                    if len(self.dictionnaire_positions_par_palier[numero]) > 1:
-                        indice_longueur += (len(self.dictionnaire_positions_par_palier[numero])-1)
-
-                if nombre_colonnes > (limite_colonnes * lignes_par_palier):
-                    self.canvas_tier_list.nombre_lignes += 1
-                    self.canvas_tier_list.dictionnaire_lignes_par_palier[palier] += 1
-                    self.dictionnaire_positions_par_palier[palier].append(palier+indice_longueur+1)
-                    for i in range(palier+1, self.canvas_tier_list.nombre_paliers+1):
-                        for j in range(len(self.dictionnaire_positions_par_palier[i])):
-                            self.dictionnaire_positions_par_palier[i][j] += 1
-                    self.changement = True
-
-                elif (limite_colonnes * lignes_par_palier) - nombre_colonnes >= limite_colonnes:
-                    self.canvas_tier_list.nombre_lignes -= 1
-                    self.canvas_tier_list.dictionnaire_lignes_par_palier[palier] -= 1
-                    dernier_indice = (len(self.dictionnaire_positions_par_palier[palier]) - 1)
-                    self.dictionnaire_positions_par_palier[palier].pop(dernier_indice)
-                    for i in range(palier+1, self.canvas_tier_list.nombre_paliers+1):
-                        for j in range(len(self.dictionnaire_positions_par_palier[i])):
-                            self.dictionnaire_positions_par_palier[i][j] -= 1
-                    self.changement = True
-
-        # Mise à jour de la ligne du boutton :
-        self.canvas_tier_list.ligne_boutton = self.canvas_tier_list.nombre_lignes - 1
-        # print(f"Nombre lignes : {self.canvas_tier_list.nombre_lignes}")
-        # print(f"Dictionnaire lignes par palier : {self.canvas_tier_list.dictionnaire_lignes_par_palier}")
-        # print(f"Dictionnaire positions par palier : {self.dictionnaire_positions_par_palier}")
-        # print(f"Ligne boutton : {self.canvas_tier_list.ligne_boutton}")
+        if self.tier_list is not None:
+            from rendu import RenduTierList, NOM_IMAGE_EXPORTEE
+            # Rendu hors écran de tout le tableau à partir du modèle (indépendant de la fenêtre et du défilement) :
+            rendu = RenduTierList(self.modele, self.tier_list, self.index_images, self.images,
+                                  self.canvas_tier_list.n_pixels_par_case)
+            rendu.enregistrer(os.path.join(self.categorie, NOM_IMAGE_EXPORTEE))
+
+    def exporter_affiche(self):
+        if self.fenetre.exportation_en_cours:
+            return
+        if self.tier_list is not None:
+            # L'affiche est rendue en arrière-plan à partir d'une copie du modèle (la Tier List reste modifiable) :
+            from affiche import RenduAffiche, NOM_AFFICHE
+            copie = modele_depuis_sauvegarde(creer_sauvegarde(self.modele, self.tier_list, {}, [], []))
+            rendu = RenduAffiche(self.modele, copie, self.index_images)
+            chemin = os.path.join(self.categorie, NOM_AFFICHE)
+            # Une seule exportation à la fois; la fin est rapportée dans le fil de Tk :
+            self.fenetre.debut_exportation()
+            threading.Thread(target=self.exportation, args=(rendu, chemin), daemon=True).start()
+        else:
+            messagebox.showerror(title="ERREUR", message="Veillez sélectionner une catégorie et un modèle!")
+
+    def exportation(self, rendu, chemin):
+        # Fil de l'exportation : le succès ou l'erreur est confié au fil de Tk, seul à pouvoir afficher un message.
+        try:
+            rendu.enregistrer(chemin)
+        except Exception as erreur:
+            resultat = erreur
+        else:
+            resultat = None
+        try:
+            self.fenetre.after(0, self.fenetre.fin_exportation, chemin, resultat)
+        except (RuntimeError, TclError):
+            # Fenêtre fermée pendant l'exportation :
+            pass
+
+    def affichage_instrumentation(self, trame):
+        # Coût de la trame (intervalle de premier niveau) et de ses intervalles les plus coûteux :
+        nom, duree = trame[-1]
+        lignes = [f"{nom.split('.')[-1]} : {duree / 1e6:.1f} ms"]
+        for nom, duree in sorted(trame[:-1], key=lambda intervalle_mesure: -intervalle_mesure[1])[:4]:
+            lignes.append(f"  {nom.split('.')[-1]} : {duree / 1e6:.1f} ms")
+        # PhotoImage résidentes (toutes catégories confondues) :
+        statistiques = self.images.statistiques()
+        lignes.append(f"photos : {statistiques['photos_residentes']} ({statistiques['octets_photos'] / 2 ** 20:.1f} Mo)"
+                      f", {statistiques['succes']} succès, {statistiques['echecs']} échecs")
+        self.label_instrumentation['text'] = '\n'.join(lignes)
+        self.label_instrumentation.place(x=self.canvas_tier_list.n_pixels_par_case * 2 + 4, y=4, anchor='nw')
+        self.label_instrumentation.lift()
+
+    def synchronisation_canvas(self):
+        # Le canvas dessine le tableau selon la disposition des lignes du modèle :
+        self.canvas_tier_list.nombre_colonnes = self.tier_list.nombre_colonnes
+        self.canvas_tier_list.nombre_paliers = self.tier_list.nombre_paliers
+        self.canvas_tier_list.nombre_lignes = self.tier_list.nombre_lignes
+        self.canvas_tier_list.ligne_boutton = self.tier_list.ligne_boutton
+        self.canvas_tier_list.dictionnaire_lignes_par_palier = {
+            palier: len(self.tier_list.lignes_par_palier[palier]) for palier in range(self.tier_list.nombre_paliers)}
 
     def choisir_categorie(self, categorie):
+        if self.journal is not None:
+            # Onglet pas encore commencé : la session abandonnée de l'ancienne catégorie n'a rien à récupérer.
+            self.journal.effacer()
+            self.journal.fermer()
+            self.journal = None
+        self.oubli_prechargements()
         self.categorie = categorie
-        self.dictionnaire_artistes_chansons = self.lecture_fichier_texte()[0]
-        # print(self.dictionnaire_artistes_chansons)
-        self.liste_artistes = self.lecture_fichier_texte()[1]
-        categorie_raccourcie = categorie.lstrip("Catégorie_")
-        self.title(f"Tier List {categorie_raccourcie}")
-        for artiste in self.dictionnaire_artistes_chansons:
-            liste_chansons = self.dictionnaire_artistes_chansons[artiste]
-            self.compteur += len(liste_chansons)
+        # Parcours unique du dossier de la catégorie :
+        self.index_images = IndexImages(categorie)
+        # Lecture unique du fichier des artistes et de leurs chansons :
+        self.file_chansons = FileChansons.depuis_fichier(categorie)
+        self.fenetre.actualisation_onglet(self)
+        # Paquets des miniatures de la catégorie (un par niveau de la pyramide), s'ils ont été compilés (une seule
+        # projection en mémoire chacun) :
+        for niveau in NIVEAUX_PYRAMIDE:
+            self.images.ouvrir_paquet(categorie, niveau)
+        # Préparation en arrière-plan des premières chansons :
+        self.prechargement()
+        # Récupération d'une session interrompue (instantané et journal de la catégorie) :
+        contenu = recuperation(categorie)
+        if contenu is not None and messagebox.askyesno(title="Session récupérée",
+                                                       message="Une session non sauvegardée a été trouvée. "
+                                                               "Reprendre cette session?"):
+            self.application_sauvegarde(contenu)
+        elif self.modele is not None:
+            # Modèle choisi avant la catégorie; la session est journalisée dès maintenant :
+            self.demarrage_journal()
 
     def choisir_modele(self, modele):
         self.canvas_tier_list['bg'] = 'white'
@@ -637,15 +760,11 @@ class FenetreTierList(Tk):
         self.canvas_tier_list.actualiser(self.modele)
         # Positionnement des widgets :
         self.positionnement_widgets()
-        # Initialisation des dictionnaires :
-        for i in range(self.canvas_tier_list.nombre_paliers + 1):
-            self.dictionnaire_images[i] = []
-        for i in range(self.canvas_tier_list.nombre_paliers + 1):
-            self.dictionnaire_chansons[i] = []
-        for i in range(self.canvas_tier_list.nombre_paliers + 1):
-            self.nombre_chansons_par_palier[i] = 0
-        for i in range(self.canvas_tier_list.nombre_paliers + 1):
-            self.dictionnaire_positions_par_palier[i] = [i]
+        # Initialisation du modèle :
+        self.tier_list = ModeleTierList(self.canvas_tier_list.nombre_paliers, self.canvas_tier_list.nombre_colonnes)
+        self.chemins_chansons = {}
+        if self.categorie is not None:
+            self.demarrage_journal()
         # Détermination de la taille et de la position de la fenêtre sur l'écran :
         largeur = int(self.canvas_tier_list['width']) + 1
         hauteur = int(self.canvas_tier_list['height'])
@@ -654,7 +773,7 @@ class FenetreTierList(Tk):
         self.my_canvas.configure(scrollregion=(0, 0, largeur, hauteur))
         if hauteur >= 981:
             hauteur = 981
-        self.geometry(f"{largeur + 23}x{hauteur + 6}+0+0")
+        self.fenetre.dimensionner(self, largeur + 23, hauteur + 6, '+0+0')
 
     def sauvegarder(self):
         if self.categorie is not None and self.modele is not None:
@@ -664,131 +783,89 @@ class FenetreTierList(Tk):
         else:
             messagebox.showerror(title="ERREUR", message="Veillez sélectionner une catégorie et un modèle!")
 
+    @instrumenter
     def enregistrement_informations(self):
-        fichier_texte = open(f'{self.categorie}/Dernière_sauvegarde.txt', 'w')
-        fichier_texte.write(f"Dictionnaire_artistes_chansons : {self.dictionnaire_artistes_chansons}\n")
-        fichier_texte.write(f"Liste des artistes : {self.liste_artistes}\n")
-        fichier_texte.write(f"Liste des artistes utilisés : {self.artistes_utilises}\n")
-        fichier_texte.write(f"Dictionnaire de chansons : {self.dictionnaire_chansons}\n")
-        fichier_texte.write(f"Dictionnaire du nombre de chansons par palier : {self.nombre_chansons_par_palier}\n")
-        fichier_texte.write(
-            f"Dictionnaire des numéros de lignes occupées par chaque palier : "
-            f"{self.dictionnaire_positions_par_palier}\n")
-        fichier_texte.write(
-            f"Dictionnaire des lignes par palier : {self.canvas_tier_list.dictionnaire_lignes_par_palier}\n")
-        fichier_texte.write(f"Nombre de lignes : {self.canvas_tier_list.nombre_lignes}\n")
-        fichier_texte.write(f"Nombre de colonnes : {self.canvas_tier_list.nombre_colonnes}\n")
-        fichier_texte.write(f"Nombre de paliers : {self.canvas_tier_list.nombre_paliers}\n")
-        fichier_texte.write(f"Lignes des bouttons : {self.canvas_tier_list.ligne_boutton}\n")
-        fichier_texte.write(f"Modèle : {self.modele}\n")
-        fichier_texte.close()
-
+        # Écriture atomique de la sauvegarde (format JSON versionné, voir sauvegarde.py) :
+        dictionnaire_artistes_chansons, liste_artistes = self.file_chansons.artistes_chansons()
+        contenu = creer_sauvegarde(self.modele, self.tier_list, dictionnaire_artistes_chansons, liste_artistes,
+                                   self.artistes_utilises)
+        ecrire_sauvegarde(os.path.join(self.categorie, NOM_SAUVEGARDE), contenu)
+        # Le progrès est sauvegardé; la récupération n'a plus lieu d'être jusqu'à la prochaine opération :
+        if self.journal is not None:
+            self.journal.effacer()
+
+    @instrumenter
     def charger_sauvegarde(self):
         if self.categorie is not None:
             try:
-                self.geometry(f"{50}x{50}+0+0")
-                self.canvas_tier_list['bg'] = 'white'
-                self.message_bienvenue.destroy()
-
-                fichier_texte = open(f'{self.categorie}/Dernière_sauvegarde.txt', 'r')
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.dictionnaire_artistes_chansons = (
-                    ast.literal_eval(ligne.lstrip("Dictionnaire_artistes_chansons : ")))
-                # print(self.dictionnaire_artistes_chansons)
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.liste_artistes = ast.literal_eval(ligne.lstrip("Liste des artistes : "))
-                # print(self.liste_artistes)
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.artistes_utilises = ast.literal_eval(ligne.lstrip("Liste des artistes utilisés : "))
-                # print(self.artistes_utilises)
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.dictionnaire_chansons = ast.literal_eval(ligne.lstrip("Dictionnaire de chansons : "))
-                # print(self.dictionnaire_chansons)
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.nombre_chansons_par_palier = ast.literal_eval(ligne.lstrip
-                                                                   ("Dictionnaire du nombre de chansons par palier : "))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.dictionnaire_positions_par_palier = (
-                    ast.literal_eval(ligne.lstrip("Dictionnaire des numéros de lignees occupées par chaque palier : ")))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.canvas_tier_list.dictionnaire_lignes_par_palier = (
-                    ast.literal_eval(ligne.lstrip("Dictionnaire des lignes par palier : ")))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.canvas_tier_list.nombre_lignes = int(ligne.lstrip("Nombre de lignes : "))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.canvas_tier_list.nombre_colonnes = int(ligne.lstrip("Nombre de colonnes : "))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.canvas_tier_list.nombre_paliers = int(ligne.lstrip("Nombre de paliers : "))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.canvas_tier_list.ligne_boutton = int(ligne.lstrip("Lignes des bouttons : "))
-
-                ligne = fichier_texte.readline().rstrip("\n")
-                self.modele = ligne.lstrip("Modèle : ")
-
-                fichier_texte.close()
-
-                for i in range(self.canvas_tier_list.nombre_paliers + 1):
-                    self.dictionnaire_images[i] = []
-                image = None
-                for numero in self.dictionnaire_chansons:
-                    if not self.dictionnaire_chansons[numero] == []:
-                        for sequence in self.dictionnaire_chansons[numero]:
-                            chanson = sequence[0]
-                            for artiste in self.artistes_utilises:
-                                try:
-                                    image = Image.open(f"{self.categorie}/{artiste}_{chanson}.jpg")
-                                    break
-                                except FileNotFoundError:
-                                    try:
-                                        image = Image.open(f"{self.categorie}/{artiste}_{chanson}.png")
-                                        break
-                                    except FileNotFoundError:
-                                        continue
-                            image = image.resize((self.canvas_tier_list.n_pixels_par_case,
-                                                  self.canvas_tier_list.n_pixels_par_case))
-                            image_tk = ImageTk.PhotoImage(image)
-                            self.dictionnaire_images[numero].append([image_tk, sequence[1]])
-                # print(self.dictionnaire_images)
-                # print(self.canvas_tier_list.dictionnaire_lignes_par_palier)
-                # print(self.dictionnaire_images)
-                self.compteur = 0
-                for artiste in self.liste_artistes:
-                    liste_chansons = self.dictionnaire_artistes_chansons[artiste]
-                    self.compteur += len(liste_chansons)
-
-                # Mise à jour du tableau :
-                self.canvas_tier_list.dessiner_tableau(self.modele)
-                # Positionnement des widgets :
-                self.positionnement_widgets()
-                # Ajout d'images :
-                self.dessiner_images()
-                # Supression des options de catégorie et de modèle :
-                self.modele_menu.destroy()
-                self.menubar.delete(3)
-                self.categorie_menu.destroy()
-                self.menubar.delete(2)
-                # Détermination de la taille et de la position de la fenêtre sur l'écran :
-                largeur = int(self.canvas_tier_list['width'])
-                hauteur = int(self.canvas_tier_list['height']) + 1
-                self.my_canvas.configure(width=largeur - 15, height=hauteur)
-                self.my_scrollbar.pack(side='right', fill='y')
-                self.my_canvas.configure(scrollregion=(0, 0, largeur, hauteur))
-                if hauteur >= 981:
-                    hauteur = 981
-                self.geometry(f"{largeur + 23}x{hauteur + 6}")
+                contenu = lire_sauvegarde_categorie(self.categorie)
             except FileNotFoundError:
-                categorie = self.categorie.lstrip("Catégorie_")
+                categorie = nom_categorie(self.categorie)
                 messagebox.showerror(title="ERREUR", message=f"Aucune sauvegarde pour la catégorie "
                                                              f"{categorie}!")
+            except ValueError as erreur:
+                messagebox.showerror(title="ERREUR", message=f"{erreur}")
+            else:
+                self.application_sauvegarde(contenu)
         else:
             messagebox.showerror(title="ERREUR", message="Veillez sélectionner une catégorie!")
 
+    @instrumenter
+    def application_sauvegarde(self, contenu):
+        self.fenetre.dimensionner(self, 50, 50, '+0+0')
+        self.canvas_tier_list['bg'] = 'white'
+        self.message_bienvenue.destroy()
+
+        self.file_chansons = FileChansons(contenu['artistes_chansons'], contenu['liste_artistes'])
+        self.artistes_utilises = contenu['artistes_utilises']
+        self.modele = contenu['modele']
+
+        # Reconstruction du modèle :
+        self.tier_list = modele_depuis_sauvegarde(contenu)
+        self.index_images.resolution_artistes(self.tier_list.chansons(), self.artistes_utilises)
+        self.synchronisation_canvas()
+        self.reinitialisation_selection()
+
+        # Recherche des images dans l'index; seules les miniatures des lignes visibles sont décodées (en parallèle),
+        # les PhotoImage étant créées au dessin des chansons visibles :
+        self.chemins_chansons = {chanson: self.index_images.chemin(chanson.artiste, chanson.chanson)
+                                 for chanson in self.tier_list.chansons()}
+        self.prechargement_visibles()
+        self.prechargement()
+        self.demarrage_journal()
+
+        # Positionnement des widgets :
+        self.positionnement_widgets()
+        # Ajout d'images :
+        self.dessiner_images()
+        # Catégorie et modèle figés :
+        self.commencee = True
+        # Détermination de la taille et de la position de la fenêtre sur l'écran :
+        largeur = int(self.canvas_tier_list['width'])
+        hauteur = int(self.canvas_tier_list['height']) + 1
+        self.my_canvas.configure(width=largeur - 15, height=hauteur)
+        self.my_scrollbar.pack(side='right', fill='y')
+        self.my_canvas.configure(scrollregion=(0, 0, largeur, hauteur))
+        if hauteur >= 981:
+            hauteur = 981
+        self.fenetre.dimensionner(self, largeur + 23, hauteur + 6)
+
+    def destroy(self):
+        # Écriture des dernières opérations du journal, libération des PhotoImage des chansons affichées et des
+        # miniatures préparées pour l'onglet :
+        for items in self.items_chansons.values():
+            self.images.liberer(items['photo'])
+        self.items_chansons = {}
+        self.items_libres = []
+        self.oubli_prechargements()
+        if self.defilement_prevu is not None:
+            self.after_cancel(self.defilement_prevu)
+            self.defilement_prevu = None
+        if self.journal is not None:
+            self.journal.fermer()
+            self.journal = None
+        super().destroy()
+
     def positionnement_widgets(self):
         self.boutton.place(x=self.canvas_tier_list.n_pixels_par_case,
                            y=self.canvas_tier_list.ligne_boutton * self.canvas_tier_list.n_pixels_par_case + 15,
@@ -796,17 +873,251 @@ class FenetreTierList(Tk):
         self.capture.place(x=self.canvas_tier_list.n_pixels_par_case,
                            y=(self.canvas_tier_list.ligne_boutton + 1) * self.canvas_tier_list.n_pixels_par_case - 15,
                            anchor='center')
-        self.label_compteur['text'] = f"{self.compteur} chansons restantes"
+        self.label_compteur['text'] = f"{len(self.file_chansons)} chansons restantes"
         self.label_compteur.place(x=self.canvas_tier_list.n_pixels_par_case * 3 + 20,
                                   y=(self.canvas_tier_list.ligne_boutton + 1) *
                                   self.canvas_tier_list.n_pixels_par_case -
                                   self.canvas_tier_list.n_pixels_par_case // 2 - 5)
 
 
+class FenetreTierList(Tk):
+    """L'objet FenetreTierList qui représente le concept d'interface graphique d'une liste de palliers (Tier List)
+    affichée sous forme de fenêtre comprenant le menu d'options et un onglet par catégorie ouverte; chaque onglet
+    (SessionTierList) comprend un canvas qui affiche la grille et les images, les divers boutons représentant les
+    manipulations possibles et la scrollbar.
+
+
+    Le principe de ce programme est le suivant. À son exécution, l'utilisateur a le choix de sélectionner une catégorie
+    de classement ainsi que le format de classement souhaité. Par la suite, la grille vide apparaît et l'utilisateur a la
+    possibilité de faire charger une première image représentant l'objet à classer. À l'aide de la souris, l'utilisateur
+    choisit la ligne représentant le palier du dit objet. Une fois que celui-ci est classé, l'utilisateur n'a qu'à faire
+    charger le prochain objet à classer. Lorsque tous les objets de la catégorie sont classés, l'utilisateur a le choix
+    de prendre une capture d'écran de sa liste completée ou de sauvegarder son travail afin de pouvoir le modifier
+    ultérieurement. Les images d'une catégorie doivent se trouver dans un dossier de fichiers nommé
+    "Catégorie_(NOM DE LA CATÉGORIE)" se trouvant dans le dossier du projet et chacune des images doit être nommée
+    "(ARTISTE ou AUTEUR)_(NOM)".
+
+    """
+    def __init__(self):
+        super().__init__()
+
+        # Titre :
+        self.title("Tier List")
+
+        # Images partagées par tous les onglets (miniatures, PhotoImage et préchargement) :
+        self.images = ImagesPartagees()
+
+        # Menu :
+        self.menubar = Menu(self)
+
+        # Menu pour sauvegarder le progrès :
+        self.sauvegarde_menu = Menu(self.menubar, tearoff=0)
+        self.sauvegarde_menu.add_command(label="Sauvegarder", command=lambda: self.session_courante().sauvegarder())
+        self.sauvegarde_menu.add_command(label="Dernière sauvegarde",
+                                         command=lambda: self.session_courante().charger_sauvegarde())
+        self.sauvegarde_menu.add_command(label="Exporter l'affiche",
+                                         command=lambda: self.session_courante().exporter_affiche())
+        self.exportation_en_cours = False
+        self.sauvegarde_menu.add_command(label="Fermer l'onglet", command=self.fermer_onglet)
+        self.sauvegarde_menu.add_separator()
+        # Instrumentation des chemins critiques (coût de la dernière trame affiché et trace exportable) :
+        self.instrumentation_active = BooleanVar(self, value=INSTRUMENTATION.active)
+        self.sauvegarde_menu.add_checkbutton(label="Instrumentation", variable=self.instrumentation_active,
+                                             command=self.basculer_instrumentation)
+        self.sauvegarde_menu.add_command(label="Exporter la trace", command=self.exporter_trace)
+        self.menubar.add_cascade(label='Fichier', menu=self.sauvegarde_menu)
+
+        # Menu pour changer de catégorie (une catégorie déjà commencée reste dans son onglet et la nouvelle est ouverte
+        # dans un nouvel onglet) :
+        self.categorie_menu = Menu(self.menubar, tearoff=0)
+        # (catégories lues dans le manifeste tant que le dossier du projet n'a pas changé, voir categories.py)
+        self.files = decouvrir_categories()
+        self.liste_categories = []
+        for nom in self.files:
+            categorie_raccourcie = nom_categorie(nom)
+            self.liste_categories.append(categorie_raccourcie)
+            self.categorie_menu.add_command(label=categorie_raccourcie,
+                                             command=lambda t=nom: self.ouvrir_categorie(t))
+        self.menubar.add_cascade(label='Catégorie', menu=self.categorie_menu)
+
+        # Menu pour choisir le modèle de la Tier List :
+        self.modele_menu = Menu(self.menubar, tearoff=0)
+        liste_modeles = ["K-POP", "K-POP 2.0", "Classique", "Autre"]
+        for modele in liste_modeles:
+            self.modele_menu.add_radiobutton(label=modele, command=lambda t=modele: self.choisir_modele(t))
+        self.menubar.add_cascade(label='Modèle', menu=self.modele_menu)
+
+        # Menu pour changer la taille des cases de l'onglet affiché (zoom) :
+        self.zoom = IntVar(self, value=N_PIXELS_PAR_CASE)
+        self.zoom_menu = Menu(self.menubar, tearoff=0)
+        self.zoom_menu.add_command(label="Zoom avant", accelerator="Ctrl++", command=lambda: self.zoom_relatif(1))
+        self.zoom_menu.add_command(label="Zoom arrière", accelerator="Ctrl+-", command=lambda: self.zoom_relatif(-1))
+        self.zoom_menu.add_separator()
+        for n_pixels in NIVEAUX_ZOOM:
+            self.zoom_menu.add_radiobutton(label=f"{n_pixels} pixels", variable=self.zoom, value=n_pixels,
+                                           command=lambda: self.zoomer(self.zoom.get()))
+        self.menubar.add_cascade(label='Zoom', menu=self.zoom_menu)
+        self.bind('<Control-plus>', lambda event: self.zoom_relatif(1))
+        self.bind('<Control-equal>', lambda event: self.zoom_relatif(1))
+        self.bind('<Control-minus>', lambda event: self.zoom_relatif(-1))
+
+        self.config(menu=self.menubar)
+
+        # Onglets (un par catégorie ouverte) :
+        self.onglets = ttk.Notebook(self)
+        self.onglets.pack(fill='both', expand=1)
+        self.onglets.bind('<<NotebookTabChanged>>', self.changement_onglet)
+        self.sessions = []
+        self.nouvel_onglet()
+
+        # Fenêtre centrée sur l'écran :
+        self.eval('tk::PlaceWindow . center')
+
+        # Coût de la dernière trame affiché dans l'onglet courant (seulement lorsque l'instrumentation est activée) :
+        INSTRUMENTATION.abonnes.append(self.affichage_instrumentation)
+
+    def session_courante(self):
+        return self.nametowidget(self.onglets.select())
+
+    def nouvel_onglet(self):
+        session = SessionTierList(self)
+        self.sessions.append(session)
+        self.onglets.add(session, text="Nouvel onglet")
+        self.onglets.select(session)
+        return session
+
+    def ouvrir_categorie(self, categorie):
+        for session in self.sessions:
+            if session.categorie == categorie:
+                # Catégorie déjà ouverte (un seul onglet par catégorie, puisque chacun a son journal) :
+                self.onglets.select(session)
+                return
+        session = self.session_courante()
+        if session.commencee:
+            session = self.nouvel_onglet()
+        session.choisir_categorie(categorie)
+
+    def choisir_modele(self, modele):
+        session = self.session_courante()
+        if session.commencee:
+            messagebox.showerror(title="ERREUR", message="Le modèle de cet onglet ne peut plus être changé!")
+        else:
+            session.choisir_modele(modele)
+
+    def zoomer(self, n_pixels_par_case):
+        self.zoom.set(n_pixels_par_case)
+        self.session_courante().zoomer(n_pixels_par_case)
+
+    def zoom_relatif(self, pas):
+        # Niveau de zoom suivant ou précédent de l'onglet affiché :
+        n_pixels = self.session_courante().canvas_tier_list.n_pixels_par_case
+        niveaux = sorted(set(NIVEAUX_ZOOM) | {n_pixels})
+        indice = min(max(niveaux.index(n_pixels) + pas, 0), len(niveaux) - 1)
+        self.zoomer(niveaux[indice])
+
+    def fermer_onglet(self):
+        # Le journal de la session est fermé; elle pourra être récupérée en rouvrant la catégorie :
+        session = self.session_courante()
+        self.sessions.remove(session)
+        self.onglets.forget(session)
+        session.destroy()
+        if len(self.sessions) == 0:
+            self.nouvel_onglet()
+
+    def actualisation_onglet(self, session):
+        # Nom de l'onglet et titre de la fenêtre selon la catégorie de la session :
+        if session.categorie is not None:
+            self.onglets.tab(session, text=nom_categorie(session.categorie))
+        if session is self.session_courante():
+            categorie = '' if session.categorie is None else f" {nom_categorie(session.categorie)}"
+            self.title(f"Tier List{categorie}")
+
+    def dimensionner(self, session, largeur, hauteur, position=''):
+        # Taille souhaitée par chaque onglet; la fenêtre prend celle de l'onglet affiché :
+        session.dimensions = (largeur, hauteur, position)
+        if session is self.session_courante():
+            self.geometry(f"{largeur}x{hauteur + HAUTEUR_ONGLETS}{position}")
+
+    def changement_onglet(self, event=None):
+        session = self.session_courante()
+        self.actualisation_onglet(session)
+        self.zoom.set(session.canvas_tier_list.n_pixels_par_case)
+        if session.dimensions is not None:
+            largeur, hauteur, _ = session.dimensions
+            self.geometry(f"{largeur}x{hauteur + HAUTEUR_ONGLETS}")
+
+    def debut_exportation(self):
+        # L'entrée du menu reste désactivée jusqu'à la fin de l'exportation (deux exportations écriraient la même
+        # affiche) :
+        self.exportation_en_cours = True
+        self.sauvegarde_menu.entryconfigure("Exporter l'affiche", state='disabled')
+
+    def fin_exportation(self, chemin, erreur):
+        self.exportation_en_cours = False
+        self.sauvegarde_menu.entryconfigure("Exporter l'affiche", state='normal')
+        if erreur is None:
+            messagebox.showinfo(title="Affiche exportée",
+                                message=f"Affiche enregistrée dans {os.path.abspath(chemin)}.")
+        else:
+            messagebox.showerror(title="ERREUR", message=f"L'affiche n'a pas pu être exportée : {erreur}")
+
+    def basculer_instrumentation(self):
+        INSTRUMENTATION.active = self.instrumentation_active.get()
+        if INSTRUMENTATION.active:
+            INSTRUMENTATION.reinitialiser()
+        else:
+            for session in self.sessions:
+                session.label_instrumentation.place_forget()
+
+    def affichage_instrumentation(self, trame):
+        self.session_courante().affichage_instrumentation(trame)
+
+    def exporter_trace(self):
+        INSTRUMENTATION.exporter(NOM_TRACE)
+        messagebox.showinfo(title="Trace exportée", message=f"Trace enregistrée dans {os.path.abspath(NOM_TRACE)} "
+                                                             f"(à ouvrir avec chrome://tracing ou Perfetto).")
+
+    def remplissage_fichier_texte(self):
+        arret = False
+        print(f"Veuillez choisir une catégorie parmi : {self.liste_categories}")
+        categorie = input("Catégorie : ")
+        while categorie not in self.liste_categories:
+            if categorie == "x":
+                exit()
+            else:
+                print(f"Veuillez choisir une catégorie parmi : {self.liste_categories}")
+                categorie = input("Catégorie : ")
+        fichier_texte = open(f'Catégorie_{categorie}/Liste_artistes-chansons.txt', 'w')
+        while not arret:
+            artiste = input("Artiste : ")
+            if artiste == 'x':
+                break
+            fichier_texte.write(f"{artiste} : ")
+            chanson = input("Chanson : ")
+            if chanson != 'x':
+                fichier_texte.write(f"{chanson}")
+            while chanson != 'x':
+                chanson = input("Chanson : ")
+                if chanson != 'x':
+                    fichier_texte.write(" | ")
+                    fichier_texte.write(f"{chanson}")
+                else:
+                    fichier_texte.write(f"\n")
+        fichier_texte.close()
+
+    def destroy(self):
+        # Fermeture des journaux de tous les onglets et arrêt des fils d'exécution du préchargement :
+        for session in self.sessions:
+            session.destroy()
+        self.images.fermer()
+        if self.affichage_instrumentation in INSTRUMENTATION.abonnes:
+            INSTRUMENTATION.abonnes.remove(self.affichage_instrumentation)
+        super().destroy()
+
+
 if __name__ == "__main__":
     TierList = FenetreTierList()
     TierList.remplissage_fichier_texte()
-    # print(TierList.canvas_tier_list.dictionnaire_lignes_par_palier)
-    # print(TierList.dictionnaire_artistes_chansons)
-    # print(TierList.liste_artistes)
+    # print(TierList.session_courante().canvas_tier_list.dictionnaire_lignes_par_palier)
+    # print(TierList.session_courante().file_chansons.artistes_chansons())
     # print(TierList.files)
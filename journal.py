@@ -0,0 +1,207 @@
+"""
+\file journal.py
+\brief Implémentation du journal des opérations (sauvegarde automatique en arrière-plan) et de la récupération d'une
+       session interrompue
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from sauvegarde import creer_sauvegarde, modele_depuis_sauvegarde, ecrire_sauvegarde, lire_sauvegarde
+from liste_chansons import FileChansons
+import copy
+import json
+import os
+import queue
+import threading
+import uuid
+
+# Noms des fichiers de récupération dans le dossier d'une catégorie :
+NOM_INSTANTANE = 'Récupération.json'
+NOM_JOURNAL = 'Récupération.journal'
+
+# Nombre d'opérations journalisées entre deux compactions (nouvel instantané complet) :
+INTERVALLE_COMPACTION = 50
+
+
+class JournalTierList:
+    """Journal en ajout seul des opérations d'une session. Chaque opération (appel d'une nouvelle chanson, déplacement
+    ou suppression d'une chanson) est écrite sur une ligne JSON par un fil d'exécution dédié : le fil de Tk ne fait que
+    déposer l'opération dans une file et n'attend jamais le disque.
+
+    Périodiquement, un instantané complet de la Tier List (au format de sauvegarde.py) remplace le précédent et le
+    journal est vidé. Les opérations et les instantanés sont numérotés : un instantané contient le numéro de la dernière
+    opération qu'il inclut, de sorte qu'un journal qui n'aurait pas été vidé (arrêt brutal entre les deux écritures)
+    ne soit pas rejoué deux fois. La numérotation recommence à chaque journal; les opérations et les instantanés
+    portent donc aussi l'identifiant de la session, et les opérations d'une autre session ne sont jamais rejouées.
+
+    Après une sauvegarde, les fichiers de récupération sont effacés : il n'y a plus rien à récupérer tant que la Tier
+    List n'est pas modifiée, et la prochaine opération est suivie d'un nouvel instantané.
+
+    Attributes:
+        chemin_instantane (str): Le chemin de l'instantané.
+        chemin_journal (str): Le chemin du journal.
+        session (str): L'identifiant de la session.
+        numero (int): Le numéro de la dernière opération journalisée.
+        efface (bool): Vrai si les fichiers de récupération ont été effacés depuis le dernier instantané.
+        file (Queue): Les écritures en attente.
+        fil (Thread): Le fil d'exécution qui écrit sur le disque.
+
+    """
+    def __init__(self, dossier):
+        self.chemin_instantane = os.path.join(dossier, NOM_INSTANTANE)
+        self.chemin_journal = os.path.join(dossier, NOM_JOURNAL)
+        self.session = uuid.uuid4().hex
+        self.numero = 0
+        self.efface = False
+        self.file = queue.Queue()
+        self.fil = threading.Thread(target=self.ecriture, name='journal', daemon=True)
+        self.fil.start()
+
+    def ajouter(self, operation):
+        """Journalise une opération (dictionnaire sérialisable en JSON).
+
+        Args:
+            operation (dict): L'opération; la clé "operation" en donne le type.
+
+        """
+        self.numero += 1
+        self.file.put(('operation', dict(operation, session=self.session, numero=self.numero)))
+
+    def instantane(self, contenu):
+        """Remplace l'instantané par le contenu donné et vide le journal. Le contenu est copié, car il est écrit plus
+        tard par le fil du journal alors que la Tier List continue d'être modifiée.
+
+        Args:
+            contenu (dict): Le contenu complet de la Tier List (voir creer_sauvegarde).
+
+        """
+        contenu = copy.deepcopy(contenu)
+        contenu['session'] = self.session
+        contenu['numero_operation'] = self.numero
+        self.efface = False
+        self.file.put(('instantane', contenu))
+
+    def effacer(self):
+        """Efface l'instantané et le journal (la Tier List vient d'être sauvegardée, ou la session est abandonnée) : une
+        session effacée n'est pas proposée à la récupération.
+
+        """
+        self.efface = True
+        self.file.put(('effacement', None))
+
+    def fermer(self):
+        """Termine les écritures en attente, puis arrête le fil du journal."""
+        self.file.put(('fin', None))
+        self.fil.join(timeout=5)
+
+    def ecriture(self):
+        fichier = open(self.chemin_journal, 'a', encoding='utf-8')
+        try:
+            while True:
+                # Les écritures en attente sont traitées par lot, avec une seule synchronisation du disque :
+                lot = [self.file.get()]
+                while True:
+                    try:
+                        lot.append(self.file.get_nowait())
+                    except queue.Empty:
+                        break
+                for type_ecriture, valeur in lot:
+                    try:
+                        if type_ecriture == 'operation':
+                            fichier.write(json.dumps(valeur, ensure_ascii=False) + '\n')
+                        elif type_ecriture == 'instantane':
+                            ecrire_sauvegarde(self.chemin_instantane, valeur)
+                            fichier.close()
+                            fichier = open(self.chemin_journal, 'w', encoding='utf-8')
+                        elif type_ecriture == 'effacement':
+                            fichier.close()
+                            if os.path.exists(self.chemin_instantane):
+                                os.remove(self.chemin_instantane)
+                            fichier = open(self.chemin_journal, 'w', encoding='utf-8')
+                    except (OSError, ValueError):
+                        # Une écriture ratée ne doit pas arrêter la sauvegarde automatique :
+                        continue
+                try:
+                    fichier.flush()
+                    os.fsync(fichier.fileno())
+                except OSError:
+                    pass
+                if lot[-1][0] == 'fin':
+                    return
+        finally:
+            fichier.close()
+
+
+def recuperation(dossier):
+    """Reconstruit l'état d'une session interrompue à partir de l'instantané et du journal d'une catégorie.
+
+    Args:
+        dossier (str): Le dossier de la catégorie.
+
+    Returns:
+        dict: Le contenu de la Tier List récupérée (voir creer_sauvegarde), ou None s'il n'y a rien à récupérer.
+
+    """
+    try:
+        contenu = lire_sauvegarde(os.path.join(dossier, NOM_INSTANTANE))
+    except (FileNotFoundError, ValueError):
+        return None
+    operations = []
+    try:
+        with open(os.path.join(dossier, NOM_JOURNAL), 'r', encoding='utf-8') as fichier:
+            for ligne in fichier:
+                try:
+                    operations.append(json.loads(ligne))
+                except json.JSONDecodeError:
+                    # Dernière ligne incomplète (arrêt pendant l'écriture) :
+                    break
+    except FileNotFoundError:
+        pass
+    try:
+        return rejouer(contenu, operations)
+    except (KeyError, IndexError, ValueError):
+        # Journal incohérent avec l'instantané; seul l'instantané est récupéré :
+        return contenu
+
+
+def rejouer(contenu, operations):
+    """Applique au contenu d'une Tier List les opérations journalisées qui ne s'y trouvent pas encore.
+
+    Args:
+        contenu (dict): Le contenu de départ (instantané).
+        operations (list): Les opérations journalisées, dans l'ordre.
+
+    Returns:
+        dict: Le contenu après les opérations.
+
+    """
+    tier_list = modele_depuis_sauvegarde(contenu)
+    file_chansons = FileChansons(contenu['artistes_chansons'], contenu['liste_artistes'])
+    artistes_utilises = contenu['artistes_utilises']
+    session = contenu.get('session')
+    numero = contenu.get('numero_operation', 0)
+    for operation in operations:
+        if operation['session'] != session:
+            # Journal d'une session précédente, que l'arrêt a empêché de vider après l'instantané :
+            continue
+        if operation['numero'] <= numero:
+            continue
+        if operation['operation'] == 'appel':
+            # Mêmes étapes que FenetreTierList.nouvelle_chanson :
+            if file_chansons.premiere() != (operation['artiste'], operation['chanson']):
+                raise ValueError(f"Appel inattendu : {operation['artiste']} - {operation['chanson']}")
+            file_chansons.avancer()
+            if operation['artiste'] not in artistes_utilises:
+                artistes_utilises.append(operation['artiste'])
+            tier_list.inserer(operation['artiste'], operation['chanson'], tier_list.palier_arrivee)
+        elif operation['operation'] == 'deplacement':
+            chanson = tier_list.chansons_par_palier[operation['palier']][operation['indice']]
+            tier_list.deplacer(chanson, operation['palier_cible'])
+        elif operation['operation'] == 'suppression':
+            tier_list.retirer(tier_list.chansons_par_palier[operation['palier']][operation['indice']])
+        numero = operation['numero']
+    dictionnaire_artistes_chansons, liste_artistes = file_chansons.artistes_chansons()
+    resultat = creer_sauvegarde(contenu['modele'], tier_list, dictionnaire_artistes_chansons, liste_artistes,
+                                artistes_utilises)
+    resultat['numero_operation'] = numero
+    return resultat
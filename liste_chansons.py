@@ -0,0 +1,152 @@
+"""
+\file liste_chansons.py
+\brief Lecture (indépendante de Tk) du fichier des artistes et de leurs chansons d'une catégorie et file des chansons
+       restant à appeler
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from collections import deque
+import os
+
+# Nom du fichier des artistes et de leurs chansons dans le dossier d'une catégorie :
+NOM_LISTE = 'Liste_artistes-chansons.txt'
+
+# Séparateurs d'une ligne "Artiste : Chanson1 | Chanson2" :
+SEPARATEUR_ARTISTE = ' : '
+SEPARATEUR_CHANSONS = ' | '
+
+
+def lecture_artistes(dossier):
+    """Parcourt le fichier des artistes et de leurs chansons d'une catégorie en une seule passe, une ligne à la fois :
+    la mémoire utilisée ne dépend que de la plus longue ligne, quelle que soit la taille du fichier.
+
+    Les lignes vides et les lignes sans chanson sont ignorées. Un "_" au début de la première chanson d'une ligne
+    (par exemple "Sunmi : _Stranger") est retiré : les anciennes versions du programme en avaient besoin pour ne pas
+    perdre les premières lettres de la chanson.
+
+    Args:
+        dossier (str): Le dossier de la catégorie.
+
+    Yields:
+        tuple: L'artiste et la liste de ses chansons, dans l'ordre du fichier.
+
+    Raises:
+        FileNotFoundError: Si le fichier n'existe pas.
+
+    """
+    with open(os.path.join(f"{dossier}", NOM_LISTE), "r") as fichier_texte:
+        for ligne in fichier_texte:
+            artiste, _, chansons = ligne.rstrip("\r\n").partition(SEPARATEUR_ARTISTE)
+            artiste = artiste.strip()
+            if chansons.startswith("_"):
+                chansons = chansons[1:]
+            chansons = [chanson for chanson in chansons.split(SEPARATEUR_CHANSONS) if chanson != ""]
+            if artiste != "" and len(chansons) != 0:
+                yield artiste, chansons
+
+
+def lecture_fichier_texte(dossier):
+    """Lit le fichier des artistes et de leurs chansons d'une catégorie (une ligne "Artiste : Chanson1 | Chanson2" par
+    artiste). Les chansons d'un artiste présent sur plusieurs lignes sont regroupées.
+
+    Args:
+        dossier (str): Le dossier de la catégorie.
+
+    Returns:
+        tuple: Le dictionnaire des chansons de chaque artiste et la liste des artistes, dans l'ordre du fichier (vides
+            si le fichier n'existe pas).
+
+    """
+    dictionnaire = {}
+    liste = []
+    try:
+        for artiste, chansons in lecture_artistes(dossier):
+            if artiste not in dictionnaire:
+                dictionnaire[artiste] = []
+                liste.append(artiste)
+            dictionnaire[artiste].extend(chansons)
+    except FileNotFoundError:
+        pass
+    return dictionnaire, liste
+
+
+class FileChansons:
+    """File des chansons restant à appeler : les artistes dans l'ordre, puis les chansons de chaque artiste dans
+    l'ordre. Chaque appel retire la première chanson en temps constant et le nombre de chansons restantes est tenu à
+    jour (au lieu d'être recompté).
+
+    Attributes:
+        artistes (deque): Les artistes ayant encore au moins une chanson à appeler, dans l'ordre.
+        chansons (dict): Les chansons restant à appeler de chaque artiste de la file (deque).
+        restantes (int): Le nombre total de chansons restant à appeler.
+
+    """
+    def __init__(self, dictionnaire_artistes_chansons=None, liste_artistes=()):
+        self.artistes = deque()
+        self.chansons = {}
+        self.restantes = 0
+        for artiste in liste_artistes:
+            self.ajouter(artiste, dictionnaire_artistes_chansons.get(artiste, ()))
+
+    def __len__(self):
+        return self.restantes
+
+    def __iter__(self):
+        # Parcourt les prochaines chansons dans l'ordre où elles seront appelées :
+        for artiste in self.artistes:
+            for chanson in self.chansons[artiste]:
+                yield artiste, chanson
+
+    def ajouter(self, artiste, chansons):
+        """Ajoute des chansons d'un artiste à la file (à la suite de ses chansons si l'artiste y est déjà)."""
+        chansons = deque(chansons)
+        if len(chansons) == 0:
+            return
+        if artiste in self.chansons:
+            self.chansons[artiste].extend(chansons)
+        else:
+            self.artistes.append(artiste)
+            self.chansons[artiste] = chansons
+        self.restantes += len(chansons)
+
+    def premiere(self):
+        """Retourne la prochaine chanson à appeler (artiste, chanson) sans la retirer, ou None si la file est vide."""
+        if len(self.artistes) == 0:
+            return None
+        artiste = self.artistes[0]
+        return artiste, self.chansons[artiste][0]
+
+    def avancer(self):
+        """Retire la prochaine chanson de la file; l'artiste est retiré avec sa dernière chanson.
+
+        Returns:
+            tuple: La chanson retirée (artiste, chanson).
+
+        Raises:
+            IndexError: Si la file est vide.
+
+        """
+        artiste = self.artistes[0]
+        chansons = self.chansons[artiste]
+        chanson = chansons.popleft()
+        if len(chansons) == 0:
+            self.artistes.popleft()
+            del self.chansons[artiste]
+        self.restantes -= 1
+        return artiste, chanson
+
+    def artistes_chansons(self):
+        # Dictionnaire et liste des artistes restants, au format de la sauvegarde :
+        return {artiste: list(self.chansons[artiste]) for artiste in self.artistes}, list(self.artistes)
+
+    @classmethod
+    def depuis_fichier(cls, dossier):
+        """Construit la file directement à partir du fichier d'une catégorie (vide si le fichier n'existe pas)."""
+        file_chansons = cls()
+        try:
+            for artiste, chansons in lecture_artistes(dossier):
+                file_chansons.ajouter(artiste, chansons)
+        except FileNotFoundError:
+            pass
+        return file_chansons
@@ -0,0 +1,209 @@
+"""
+\file modele_tier_list.py
+\brief Implémentation du modèle (indépendant de Tk) d'une Tier List : paliers, lignes et chansons placées
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from position import Position
+from disposition import DispositionPaliers
+from instrumentation import instrumenter
+
+
+class ChansonPlacee:
+    """Une chanson placée sur la Tier List. Deux chansons de même titre restent des éléments distincts; une chanson
+    placée peut donc servir de clé de dictionnaire (par exemple pour associer son image dans l'interface).
+
+    Attributes:
+        artiste (str): L'artiste de la chanson (None si inconnu).
+        chanson (str): Le titre de la chanson.
+        palier (int): Le palier sur lequel se trouve la chanson.
+        position (Position): La case occupée par la chanson.
+
+    """
+    def __init__(self, artiste, chanson):
+        self.artiste = artiste
+        self.chanson = chanson
+        self.palier = None
+        self.position = None
+
+    def __repr__(self):
+        return f'ChansonPlacee({self.artiste!r}, {self.chanson!r}, {self.position})'
+
+
+class ModeleTierList:
+    """Le modèle d'une Tier List, sans aucune dépendance à Tk. Il contient les paliers, les lignes occupées par chaque
+    palier et les chansons placées, et tient à jour l'index des chansons en fonction de leur case (ligne, colonne). La
+    disposition des paliers (voir disposition.py) donne le palier d'une ligne par recherche dichotomique. Trouver la
+    chanson ou le palier sous un clic ne dépend donc pas du nombre de chansons.
+
+    Les paliers sont numérotés de 0 à nombre_paliers - 1, du meilleur au pire. Le palier numéro nombre_paliers est le
+    palier d'arrivée : il occupe la ligne des boutons et contient la chanson qui vient d'être appelée, à la colonne 2.
+    Les deux premières colonnes de chaque ligne sont réservées au nom du palier.
+
+    Attributes:
+        nombre_paliers (int): Le nombre de paliers (sans compter le palier d'arrivée).
+        nombre_colonnes (int): Le nombre de colonnes du tableau.
+        chansons_par_palier (dict): La liste ordonnée des chansons de chaque palier.
+        disposition (DispositionPaliers): Le nombre de lignes et la première ligne de chaque palier.
+        lignes_par_palier (dict): La liste des numéros de lignes occupées par chaque palier (tirée de la disposition).
+        chanson_par_case (dict): L'index des chansons en fonction de leur case (ligne, colonne).
+        paliers_modifies (list): Les paliers dont les cases ont changé lors de la dernière modification (seuls ceux-ci
+            sont à redessiner).
+
+    """
+    def __init__(self, nombre_paliers, nombre_colonnes=20):
+        self.nombre_paliers = nombre_paliers
+        self.nombre_colonnes = nombre_colonnes
+        self.chansons_par_palier = {palier: [] for palier in range(nombre_paliers + 1)}
+        self.disposition = DispositionPaliers(nombre_paliers, self.limite_colonnes)
+        self.lignes_par_palier = {palier: list(self.disposition.lignes(palier)) for palier in range(nombre_paliers + 1)}
+        self.chanson_par_case = {}
+        self.paliers_modifies = []
+
+    @classmethod
+    def depuis_dictionnaires(cls, nombre_paliers, nombre_colonnes, chansons_par_palier, lignes_par_palier):
+        """Construit un modèle à partir de l'état enregistré d'une Tier List.
+
+        Args:
+            nombre_paliers (int): Le nombre de paliers.
+            nombre_colonnes (int): Le nombre de colonnes du tableau.
+            chansons_par_palier (dict): Les couples (artiste, chanson) de chaque palier, dans l'ordre.
+            lignes_par_palier (dict): Les numéros de lignes occupées par chaque palier.
+
+        Returns:
+            ModeleTierList: Le modèle reconstruit.
+
+        """
+        modele = cls(nombre_paliers, nombre_colonnes)
+        for palier in range(nombre_paliers + 1):
+            for artiste, chanson in chansons_par_palier.get(palier, []):
+                chanson_placee = ChansonPlacee(artiste, chanson)
+                chanson_placee.palier = palier
+                modele.chansons_par_palier[palier].append(chanson_placee)
+        modele.disposition = DispositionPaliers(
+            nombre_paliers, modele.limite_colonnes,
+            [len(modele.chansons_par_palier[palier]) for palier in range(nombre_paliers + 1)],
+            [len(lignes_par_palier[palier]) for palier in range(nombre_paliers + 1)])
+        modele.lignes_par_palier = {palier: list(modele.disposition.lignes(palier))
+                                    for palier in range(nombre_paliers + 1)}
+        modele.disposition_complete()
+        return modele
+
+    @property
+    def palier_arrivee(self):
+        return self.nombre_paliers
+
+    @property
+    def nombre_lignes(self):
+        return self.disposition.nombre_lignes
+
+    @property
+    def ligne_boutton(self):
+        return self.lignes_par_palier[self.palier_arrivee][0]
+
+    @property
+    def limite_colonnes(self):
+        return self.nombre_colonnes - 2
+
+    def chanson_a(self, position):
+        """Retourne la chanson se trouvant à une case, ou None si la case est vide."""
+        return self.chanson_par_case.get((position.ligne, position.colonne))
+
+    def palier_de_ligne(self, ligne):
+        """Retourne le palier qui occupe une ligne, ou None si la ligne est en dehors du tableau."""
+        return self.disposition.palier_de_ligne(ligne)
+
+    def chansons_de_ligne(self, ligne):
+        """Retourne les chansons placées sur une ligne (liste vide si la ligne est en dehors du tableau)."""
+        palier = self.disposition.palier_de_ligne(ligne)
+        if palier is None:
+            return []
+        j = ligne - self.disposition.debuts[palier]
+        return self.chansons_par_palier[palier][j * self.limite_colonnes:(j + 1) * self.limite_colonnes]
+
+    def chanson_en_attente(self):
+        """Retourne la chanson du palier d'arrivée, ou None s'il est vide."""
+        chansons = self.chansons_par_palier[self.palier_arrivee]
+        return chansons[0] if chansons else None
+
+    def chansons(self):
+        """Parcourt toutes les chansons placées, palier par palier."""
+        for palier in self.chansons_par_palier:
+            yield from self.chansons_par_palier[palier]
+
+    def nombre_chansons(self, palier):
+        return len(self.chansons_par_palier[palier])
+
+    def inserer(self, artiste, chanson, palier):
+        """Ajoute une nouvelle chanson à la fin d'un palier.
+
+        Returns:
+            tuple: La chanson placée et un booléen indiquant si le nombre de lignes du tableau a changé.
+
+        """
+        chanson_placee = ChansonPlacee(artiste, chanson)
+        chanson_placee.palier = palier
+        self.chansons_par_palier[palier].append(chanson_placee)
+        return chanson_placee, self.mise_a_jour([palier])
+
+    def retirer(self, chanson_placee):
+        """Retire une chanson du tableau (corbeille).
+
+        Returns:
+            bool: Vrai si le nombre de lignes du tableau a changé.
+
+        """
+        palier = chanson_placee.palier
+        self.chansons_par_palier[palier].remove(chanson_placee)
+        self.desindexation(chanson_placee)
+        chanson_placee.palier = None
+        chanson_placee.position = None
+        return self.mise_a_jour([palier])
+
+    def deplacer(self, chanson_placee, palier_cible):
+        """Déplace une chanson à la fin d'un autre palier.
+
+        Returns:
+            bool: Vrai si le nombre de lignes du tableau a changé.
+
+        """
+        palier_source = chanson_placee.palier
+        self.chansons_par_palier[palier_source].remove(chanson_placee)
+        self.desindexation(chanson_placee)
+        self.chansons_par_palier[palier_cible].append(chanson_placee)
+        chanson_placee.palier = palier_cible
+        return self.mise_a_jour([palier_source, palier_cible])
+
+    def mise_a_jour(self, paliers_modifies):
+        # Mise à jour de la disposition, puis des cases et de l'index des seuls paliers dont les cases ont changé :
+        paliers, premier_palier_decale = self.disposition.actualiser(
+            {palier: len(self.chansons_par_palier[palier]) for palier in paliers_modifies})
+        if premier_palier_decale is not None:
+            for palier in range(premier_palier_decale, self.nombre_paliers + 1):
+                self.lignes_par_palier[palier] = list(self.disposition.lignes(palier))
+        self.disposition_paliers(paliers)
+        self.paliers_modifies = paliers
+        return premier_palier_decale is not None
+
+    @instrumenter
+    def disposition_paliers(self, paliers):
+        # Calcul groupé des cases des chansons des paliers et mise à jour de l'index des cases :
+        lignes, colonnes = self.disposition.cases(paliers)
+        chansons = (chanson_placee for palier in paliers for chanson_placee in self.chansons_par_palier[palier])
+        for chanson_placee, ligne, colonne in zip(chansons, lignes, colonnes):
+            position = chanson_placee.position
+            if position is None or position.ligne != ligne or position.colonne != colonne:
+                self.desindexation(chanson_placee)
+                chanson_placee.position = Position(ligne, colonne)
+            self.chanson_par_case[(ligne, colonne)] = chanson_placee
+
+    def disposition_complete(self):
+        # Calcul des cases de toutes les chansons (chargement d'une sauvegarde) :
+        self.disposition_paliers(range(self.nombre_paliers + 1))
+
+    def desindexation(self, chanson_placee):
+        if chanson_placee.position is not None:
+            case = (chanson_placee.position.ligne, chanson_placee.position.colonne)
+            if self.chanson_par_case.get(case) is chanson_placee:
+                del self.chanson_par_case[case]
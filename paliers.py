@@ -0,0 +1,78 @@
+"""
+\file paliers.py
+\brief Description des paliers (couleur, cote et nom) de chacun des modèles de Tier List
+\author Maksym Valigunda
+\version 1.0
+"""
+
+# Liste des paliers de chaque modèle, du meilleur au pire. Chaque palier est décrit par sa couleur, sa cote (vide si le
+# modèle n'affiche pas de cote) et son nom :
+PALIERS_PAR_MODELE = {
+    "K-POP": [
+        ('#DC6384', '10', 'LÉGENDAIRE'),
+        ('#e06666', '9,5', 'PARFAIT'),
+        ('#e69138', '9', 'ÉMOTIONNEL'),
+        ('#ffd966', '8,5', 'EXCELLENT'),
+        ('#93c47d', '8', 'STANDARD'),
+        ('#6aa84f', '7,5', 'DE QUALITÉ'),
+        ('#76a5af', '7', 'AGRÉABLE'),
+        ('#3d85c6', '6,5', 'BIEN'),
+        ('#8e7cc3', '6', 'LIMITE'),
+    ],
+    "K-POP 2.0": [
+        ('#f04357', '10', 'LÉGENDAIRE'),
+        ('#f04377', '9,75', 'PARFAIT'),
+        ('#f043bc', '9,5', "ÉMOTIONNEL"),
+        ('#aa46e3', '9,25', "CHEF D'OEUVRE"),
+        ('#704fdb', '9', 'EXCELLENT'),
+        ('#3068e3', '8,75', 'TRÈS BON'),
+        ('#449fdb', '8,5', 'STANDARD'),
+        ('#34d6d9', '8,25', 'UNIQUE'),
+        ('#34d994', '8', 'BANGER'),
+        ('#34d94d', '7,75', 'BON'),
+        ('#73d934', '7,5', 'ADDICTIF'),
+        ('#b3d934', '7', 'AGRÉABLE'),
+        ('#d9c334', '6,5', 'BIEN'),
+        ('#d97c34', '6', 'LIMITE'),
+    ],
+    "Classique": [
+        ('#DC6384', '', 'S'),
+        ('#e06666', '', 'A'),
+        ('#e69138', '', 'B'),
+        ('#ffd966', '', 'C'),
+        ('#93c47d', '', 'D'),
+    ],
+    "Autre": [
+        ('#DC6384', '', '10'),
+        ('#e06666', '', '9'),
+        ('#e69138', '', '8'),
+        ('#ffd966', '', '7'),
+        ('#93c47d', '', '6'),
+        ('#6aa84f', '', '5'),
+        ('#76a5af', '', '4'),
+        ('#3d85c6', '', '3'),
+        ('#8e7cc3', '', '2'),
+        ('#0d8c77', '', '1'),
+    ],
+}
+
+# Modèles qui affichent la cote de chaque palier :
+MODELES_AVEC_COTES = ("K-POP", "K-POP 2.0")
+
+
+def description_palier(modele, palier):
+    """Retourne la couleur, la cote et le nom d'un palier. Un palier inconnu (par exemple celui de la ligne des
+    boutons) n'a ni couleur, ni cote, ni nom.
+
+    Args:
+        modele (str): Le modèle de la Tier List.
+        palier (int): Le numéro du palier.
+
+    Returns:
+        tuple: La couleur, la cote et le nom du palier.
+
+    """
+    paliers = PALIERS_PAR_MODELE.get(modele, [])
+    if 0 <= palier < len(paliers):
+        return paliers[palier]
+    return '', '', ''
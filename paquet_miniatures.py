@@ -0,0 +1,196 @@
+"""
+\file paquet_miniatures.py
+\brief Compilation des miniatures d'une catégorie en un seul paquet de pixels bruts (RVBA) projeté en mémoire, avec un
+       index des décalages en fonction de l'artiste et de la chanson
+\author Maksym Valigunda
+\version 1.0
+
+Utilisation : python paquet_miniatures.py [Catégorie_2023 Catégorie_Aespa ...] [--taille 63]
+Sans catégorie, toutes les catégories du dossier courant sont compilées.
+"""
+
+from cache_miniatures import CacheMiniatures, empreinte_fichier
+from index_images import IndexImages
+from liste_chansons import lecture_artistes
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+
+# Nom du paquet dans le dossier d'une catégorie (un paquet par taille de case) :
+NOM_PAQUET = 'Miniatures_{taille}.paquet'
+
+# En-tête du paquet : signature, version du format et taille de l'index (JSON) qui suit :
+SIGNATURE_PAQUET = b'TLPAQUET'
+VERSION_PAQUET = 1
+EN_TETE_PAQUET = struct.Struct('<8sII')
+
+# Les pixels de chaque miniature commencent sur un multiple de cet alignement :
+ALIGNEMENT_PAQUET = 64
+
+# Les pixels sont gardés en RVBA (4 octets par pixel), le seul mode que PIL peut lire directement dans le paquet
+# sans copie :
+MODE_PAQUET = 'RGBA'
+
+
+def chemin_paquet(dossier, taille):
+    return os.path.join(dossier, NOM_PAQUET.format(taille=taille))
+
+
+def aligner(decalage):
+    return -(-decalage // ALIGNEMENT_PAQUET) * ALIGNEMENT_PAQUET
+
+
+def compiler_paquet(dossier, n_pixels_par_case, source=None):
+    """Compile les miniatures de toutes les chansons d'une catégorie en un seul paquet. Les pixels d'une image présente
+    plusieurs fois (même contenu) ne sont écrits qu'une fois. Le paquet est écrit dans un fichier temporaire renommé
+    ensuite, de sorte qu'un paquet partiellement écrit ne soit jamais lu.
+
+    Args:
+        dossier (str): Le dossier de la catégorie.
+        n_pixels_par_case (int): La taille d'une case (et des miniatures) en pixels.
+        source: Ce qui fournit les miniatures (une méthode obtenir(chemin, taille)); par défaut, le cache sur disque.
+
+    Returns:
+        tuple: Le chemin du paquet et le nombre de chansons qu'il contient.
+
+    """
+    source = source if source is not None else CacheMiniatures()
+    taille = (n_pixels_par_case, n_pixels_par_case)
+    index_images = IndexImages(dossier)
+
+    # Index : chaque chanson est associée au fichier de son image (nom, date de modification et taille, qui permettent
+    # de vérifier que l'image n'a pas changé), à l'empreinte de son contenu et au décalage de ses pixels :
+    entrees = []
+    pixels = {}
+    for artiste, chansons in lecture_artistes(dossier):
+        for chanson in chansons:
+            chemin = index_images.chemin(artiste, chanson)
+            if chemin is None:
+                continue
+            statistiques = os.stat(chemin)
+            empreinte = empreinte_fichier(chemin)
+            if empreinte not in pixels:
+                pixels[empreinte] = source.obtenir(chemin, taille).convert(MODE_PAQUET).tobytes()
+            entrees.append({'artiste': artiste, 'chanson': chanson, 'fichier': os.path.basename(chemin),
+                            'date_modification': statistiques.st_mtime_ns, 'taille_fichier': statistiques.st_size,
+                            'empreinte': empreinte})
+
+    # Les décalages dépendent de la taille de l'index, qui dépend elle-même des décalages : l'index est d'abord écrit
+    # avec des décalages relatifs au début des pixels.
+    decalages = {}
+    decalage = 0
+    for empreinte, donnees in pixels.items():
+        decalages[empreinte] = decalage
+        decalage = aligner(decalage + len(donnees))
+    index = {'largeur': taille[0], 'hauteur': taille[1], 'mode': MODE_PAQUET, 'decalages': decalages,
+             'entrees': entrees}
+    index_encode = json.dumps(index, ensure_ascii=False).encode('utf-8')
+    debut_pixels = aligner(EN_TETE_PAQUET.size + len(index_encode))
+
+    chemin = chemin_paquet(dossier, n_pixels_par_case)
+    descripteur, chemin_temporaire = tempfile.mkstemp(suffix='.tmp', dir=dossier)
+    try:
+        with os.fdopen(descripteur, 'wb') as fichier:
+            fichier.write(EN_TETE_PAQUET.pack(SIGNATURE_PAQUET, VERSION_PAQUET, len(index_encode)))
+            fichier.write(index_encode)
+            for empreinte, donnees in pixels.items():
+                fichier.seek(debut_pixels + decalages[empreinte])
+                fichier.write(donnees)
+            fichier.truncate(debut_pixels + decalage)
+        os.replace(chemin_temporaire, chemin)
+    except BaseException:
+        os.remove(chemin_temporaire)
+        raise
+    return chemin, len(entrees)
+
+
+class PaquetMiniatures:
+    """Paquet des miniatures d'une catégorie, projeté en mémoire (mmap) : l'ouverture ne lit que l'index, et chaque
+    miniature est une image de PIL qui lit directement ses pixels dans la projection, sans copie ni décodage. Le
+    système ne charge que les pages des miniatures effectivement lues.
+
+    Attributes:
+        chemin (str): Le chemin du paquet.
+        date_modification (int): La date de modification du paquet à son ouverture, en nanosecondes.
+        taille (tuple): La largeur et la hauteur des miniatures, en pixels.
+        entrees (dict): Les entrées de l'index (fichier, date de modification, taille et empreinte de l'image) en
+            fonction de l'artiste et de la chanson.
+        decalages (dict): Le décalage des pixels dans le paquet en fonction de l'empreinte de l'image.
+        memoire (mmap): La projection du paquet en mémoire.
+
+    """
+    def __init__(self, chemin):
+        """
+        Raises:
+            FileNotFoundError: Si le paquet n'existe pas.
+            ValueError: Si le fichier n'est pas un paquet de miniatures valide.
+
+        """
+        self.chemin = chemin
+        with open(chemin, 'rb') as fichier:
+            self.date_modification = os.fstat(fichier.fileno()).st_mtime_ns
+            signature, version, taille_index = EN_TETE_PAQUET.unpack(fichier.read(EN_TETE_PAQUET.size))
+            if signature != SIGNATURE_PAQUET or version != VERSION_PAQUET:
+                raise ValueError(f"{chemin} n'est pas un paquet de miniatures (version {VERSION_PAQUET})")
+            try:
+                index = json.loads(fichier.read(taille_index).decode('utf-8'))
+            except (UnicodeDecodeError, json.JSONDecodeError) as erreur:
+                raise ValueError(f"Index du paquet {chemin} invalide : {erreur}") from erreur
+            self.memoire = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_READ)
+        self.taille = (index['largeur'], index['hauteur'])
+        debut_pixels = aligner(EN_TETE_PAQUET.size + taille_index)
+        self.decalages = {empreinte: debut_pixels + decalage for empreinte, decalage in index['decalages'].items()}
+        taille_pixels = self.taille[0] * self.taille[1] * len(MODE_PAQUET)
+        if any(decalage + taille_pixels > len(self.memoire) for decalage in self.decalages.values()):
+            raise ValueError(f"Paquet {chemin} tronqué")
+        self.entrees = {(entree['artiste'], entree['chanson']): entree for entree in index['entrees']}
+
+    def miniature(self, empreinte):
+        """Retourne la miniature d'une image du paquet, qui lit ses pixels directement dans la projection.
+
+        Args:
+            empreinte (str): L'empreinte du contenu de l'image.
+
+        Returns:
+            Image: La miniature (en lecture seule), ou None si l'image n'est pas dans le paquet.
+
+        """
+        decalage = self.decalages.get(empreinte)
+        if decalage is None:
+            return None
+        from PIL import Image
+        taille_pixels = self.taille[0] * self.taille[1] * len(MODE_PAQUET)
+        tranche = memoryview(self.memoire)[decalage:decalage + taille_pixels]
+        return Image.frombuffer(MODE_PAQUET, self.taille, tranche, 'raw', MODE_PAQUET, 0, 1)
+
+    def fermer(self):
+        try:
+            self.memoire.close()
+        except BufferError:
+            # Une miniature lit encore ses pixels dans la projection : elle sera libérée avec la dernière miniature.
+            pass
+
+
+def main(arguments=None):
+    from categories import decouvrir_categories
+
+    parser = argparse.ArgumentParser(description="Compile les miniatures de chaque catégorie en un paquet.")
+    parser.add_argument('categories', nargs='*', help="dossiers des catégories (par défaut : toutes)")
+    parser.add_argument('--taille', type=int, default=63, help="taille d'une case en pixels")
+    options = parser.parse_args(arguments)
+
+    for categorie in options.categories or decouvrir_categories():
+        debut = time.perf_counter()
+        chemin, nombre = compiler_paquet(categorie, options.taille)
+        print(f"{categorie} : {chemin} ({nombre} chansons, {os.path.getsize(chemin) / 2 ** 20:.1f} Mo, "
+              f"{time.perf_counter() - debut:.2f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
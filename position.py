@@ -22,7 +22,17 @@ class Position:
         ligne (int): La ligne associée à la position.
         colonne (int): La colonne associée à la position
 
+    Une position est égale au tuple (ligne, colonne) correspondant et a le même hash que lui; une position et un tuple
+    peuvent donc servir indifféremment de clé dans un même dictionnaire (les sauvegardes contiennent des tuples).
+
     """
+    # Pas de dictionnaire d'attributs : une position est plus compacte et plus rapide à créer.
+    __slots__ = ('ligne', 'colonne')
+
+    # Décalages (ligne, colonne) des voisins diagonaux et des sauts, dans l'ordre des méthodes correspondantes :
+    DECALAGES_DIAGONALES = ((1, -1), (1, 1), (-1, -1), (-1, 1))
+    DECALAGES_SAUTS = ((2, -2), (2, 2), (-2, -2), (-2, 2))
+
     def __init__(self, ligne, colonne):
         """Constructeur de la classe Position. Initialise les deux attributs de la classe.
 
@@ -63,8 +73,7 @@ class Position:
             list: La liste des quatre positions.
 
         """
-        return [self.positions_diagonales_bas()[0], self.positions_diagonales_bas()[1],
-                self.positions_diagonales_haut()[0], self.positions_diagonales_haut()[1]]
+        return [Position(self.ligne + ligne, self.colonne + colonne) for ligne, colonne in self.DECALAGES_DIAGONALES]
 
     def quatre_positions_sauts(self):
         """Retourne une liste contenant les quatre "sauts" diagonaux à partir de la position actuelle. Les positions
@@ -74,17 +83,65 @@ class Position:
             list: La liste des quatre positions.
 
         """
-        return [self.positions_diagonales_bas()[0].positions_diagonales_bas()[0],
-                self.positions_diagonales_bas()[1].positions_diagonales_bas()[1],
-                self.positions_diagonales_haut()[0].positions_diagonales_haut()[0],
-                self.positions_diagonales_haut()[1].positions_diagonales_haut()[1]]
+        return [Position(self.ligne + ligne, self.colonne + colonne) for ligne, colonne in self.DECALAGES_SAUTS]
+
+    @staticmethod
+    def positions_voisines(positions, decalages):
+        """Retourne, pour chacune des positions données, la liste de ses voisines selon les décalages donnés. Les
+        positions peuvent être des instances de Position ou des tuples (ligne, colonne).
+
+        Args:
+            positions (iterable): Les positions de départ.
+            decalages (iterable): Les décalages (ligne, colonne) à appliquer à chaque position.
+
+        Returns:
+            list: Une liste de listes de positions, dans l'ordre des positions de départ.
+
+        """
+        decalages = tuple(decalages)
+        resultat = []
+        for position in positions:
+            ligne, colonne = position
+            resultat.append([Position(ligne + decalage_ligne, colonne + decalage_colonne)
+                             for decalage_ligne, decalage_colonne in decalages])
+        return resultat
+
+    @classmethod
+    def lot_quatre_positions_diagonales(cls, positions):
+        """Retourne les quatre positions diagonales de chacune des positions données (voir quatre_positions_diagonales).
+
+        Returns:
+            list: Une liste de listes de quatre positions.
+
+        """
+        return cls.positions_voisines(positions, cls.DECALAGES_DIAGONALES)
+
+    @classmethod
+    def lot_quatre_positions_sauts(cls, positions):
+        """Retourne les quatre sauts diagonaux de chacune des positions données (voir quatre_positions_sauts).
+
+        Returns:
+            list: Une liste de listes de quatre positions.
+
+        """
+        return cls.positions_voisines(positions, cls.DECALAGES_SAUTS)
 
     def __eq__(self, other):
         """Méthode spéciale indiquant à Python comment vérifier si deux positions sont égales. On compare simplement
-        la ligne et la colonne de l'objet actuel et de l'autre objet.
+        la ligne et la colonne de l'objet actuel et de l'autre objet. Une position peut aussi être comparée à un tuple
+        (ligne, colonne).
 
         """
-        return self.ligne == other.ligne and self.colonne == other.colonne
+        if isinstance(other, Position):
+            return self.ligne == other.ligne and self.colonne == other.colonne
+        if isinstance(other, tuple):
+            return (self.ligne, self.colonne) == other
+        return NotImplemented
+
+    def __iter__(self):
+        """Méthode spéciale permettant de décomposer une position comme un tuple : ligne, colonne = position."""
+        yield self.ligne
+        yield self.colonne
 
     def __repr__(self):
         """Méthode spéciale indiquant à Python comment représenter une instance de Position par une chaîne de
@@ -99,8 +156,11 @@ class Position:
         Les étudiants(es) curieux(ses) peuvent consulter wikipédia pour en savoir plus:
             https://fr.wikipedia.org/wiki/Fonction_de_hachage
 
+        Le hash est celui du tuple (ligne, colonne), ce qui évite de construire une chaîne de caractères à chaque
+        recherche dans un dictionnaire.
+
         """
-        return hash(str(self))
+        return hash((self.ligne, self.colonne))
 
 
 if __name__ == '__main__':
@@ -124,4 +184,15 @@ if __name__ == '__main__':
                                                         Position(1, 1), Position(1, 5)]
     assert position_test_2.quatre_positions_sauts() == [Position(9, -2), Position(9, 2),
                                                         Position(5, -2), Position(5, 2)]
+    # Tests unitaires >>> comparaison et hash avec les tuples
+    assert Position(3, 3) == (3, 3) and (3, 3) == Position(3, 3)
+    assert Position(3, 3) != (3, 4) and Position(3, 3) != 'abc'
+    assert hash(Position(7, 0)) == hash((7, 0))
+    assert {(7, 0): 'a'}[Position(7, 0)] == 'a'
+    assert tuple(position_test_1) == (3, 3)
+    # Tests unitaires >>> méthodes par lot
+    assert Position.lot_quatre_positions_diagonales([position_test_1, (7, 0)]) == [
+        position_test_1.quatre_positions_diagonales(), position_test_2.quatre_positions_diagonales()]
+    assert Position.lot_quatre_positions_sauts([position_test_1, (7, 0)]) == [
+        position_test_1.quatre_positions_sauts(), position_test_2.quatre_positions_sauts()]
     print('Test unitaires passés avec succès!')
@@ -0,0 +1,85 @@
+"""
+\file prechargement.py
+\brief Implémentation du préchargement en arrière-plan des miniatures des prochaines chansons à classer
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import instrumenter
+
+# Nombre de chansons préparées à l'avance et nombre de fils d'exécution :
+PROFONDEUR_PRECHARGEMENT = 6
+NOMBRE_TRAVAILLEURS = 2
+
+
+class PrechargeurMiniatures:
+    """Groupe de fils d'exécution qui décodent et redimensionnent à l'avance les images des prochaines chansons à
+    classer. Le fil de Tk n'a alors plus qu'à convertir une miniature déjà prête en PhotoImage, ce qui doit
+    obligatoirement se faire dans le fil principal.
+
+    Une miniature préparée n'est pas comptée dans le budget de mémoire des images partagées tant que sa tâche est
+    gardée : les tâches qui ne seront plus attendues doivent être oubliées (voir oublier).
+
+    Attributes:
+        cache (ImagesPartagees): Les images partagées, qui obtiennent les miniatures (en mémoire, dans un paquet ou
+            dans le cache sur disque).
+        executeur (ThreadPoolExecutor): Le groupe de fils d'exécution.
+        taches (dict): Les tâches en cours ou terminées, en fonction du chemin de l'image et de la taille.
+
+    """
+    def __init__(self, cache, nombre_travailleurs=NOMBRE_TRAVAILLEURS):
+        self.cache = cache
+        self.executeur = ThreadPoolExecutor(max_workers=nombre_travailleurs, thread_name_prefix='prechargement')
+        self.taches = {}
+
+    def prevoir(self, chemins, taille):
+        """Lance en arrière-plan la préparation des miniatures qui ne sont pas déjà prêtes ou en préparation.
+
+        Args:
+            chemins (list): Les chemins des images à préparer.
+            taille (tuple): La largeur et la hauteur des miniatures, en pixels.
+
+        """
+        for chemin in chemins:
+            cle = (chemin, taille)
+            if cle not in self.taches:
+                self.taches[cle] = self.executeur.submit(self.cache.preparer, chemin, taille)
+
+    @instrumenter
+    def obtenir(self, chemin, taille):
+        """Retourne l'empreinte et la miniature d'une image. Si elle a été prévue, la tâche correspondante est attendue
+        (elle est habituellement déjà terminée); sinon, la miniature est chargée directement.
+
+        Args:
+            chemin (str): Le chemin de l'image.
+            taille (tuple): La largeur et la hauteur de la miniature, en pixels.
+
+        Returns:
+            tuple: L'empreinte de l'image et la miniature.
+
+        Raises:
+            FileNotFoundError: Si l'image n'existe pas.
+
+        """
+        tache = self.taches.pop((chemin, taille), None)
+        if tache is None:
+            return self.cache.preparer(chemin, taille)
+        return tache.result()
+
+    def oublier(self, cles=None):
+        """Annule les préparations qui n'ont pas commencé et oublie des tâches (par exemple celles d'un onglet fermé);
+        les miniatures déjà préparées sont ainsi libérées.
+
+        Args:
+            cles (iterable): Les clés (chemin de l'image et taille) des tâches à oublier (toutes par défaut).
+
+        """
+        for cle in list(self.taches) if cles is None else cles:
+            tache = self.taches.pop(cle, None)
+            if tache is not None:
+                tache.cancel()
+
+    def fermer(self):
+        self.oublier()
+        self.executeur.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,169 @@
+"""
+\file rendu.py
+\brief Implémentation du rendu hors écran (avec PIL) d'une Tier List complète, sans Tk ni capture d'écran
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from PIL import Image, ImageDraw, ImageFont
+from paliers import MODELES_AVEC_COTES, description_palier
+from cache_miniatures import CacheMiniatures
+
+# Nom de l'image exportée dans le dossier d'une catégorie :
+NOM_IMAGE_EXPORTEE = 'TierListCompletée.png'
+
+# Polices essayées dans l'ordre (la police par défaut de PIL est utilisée si aucune n'est installée) :
+POLICES = {
+    False: ('arial.ttf', 'Arial.ttf', 'DejaVuSans.ttf', 'LiberationSans-Regular.ttf'),
+    True: ('arialbd.ttf', 'Arial Bold.ttf', 'DejaVuSans-Bold.ttf', 'LiberationSans-Bold.ttf'),
+}
+
+
+class RenduTierList:
+    """Compose l'image d'une Tier List à partir de son modèle : couleurs, cotes et noms des paliers, miniatures et
+    titres des chansons. Le rendu reproduit le tableau du canvas (sans la ligne des boutons), mais ne dépend ni de la
+    fenêtre, ni de la barre de défilement : tout le tableau est rendu, à n'importe quelle taille de case.
+
+    Attributes:
+        modele (str): Le modèle de la Tier List.
+        tier_list (ModeleTierList): Les paliers, leurs lignes et les chansons placées.
+        index_images (IndexImages): L'index des images de la catégorie.
+        cache_miniatures (CacheMiniatures): Le cache des images redimensionnées (ouvert à la première miniature s'il
+            n'est pas donné).
+        n_pixels_par_case (int): La taille d'une case en pixels.
+        taille (int): La taille de la police des titres (en points, comme dans le canvas).
+        polices (dict): Les polices en fonction de leur taille et de leur graisse.
+        titres_raccourcis (dict): Les titres raccourcis déjà calculés.
+
+    """
+    def __init__(self, modele, tier_list, index_images, cache_miniatures=None, n_pixels_par_case=63):
+        self.modele = modele
+        self.tier_list = tier_list
+        self.index_images = index_images
+        self.cache_miniatures = cache_miniatures
+        self.n_pixels_par_case = n_pixels_par_case
+        self.taille = self.n_pixels_par_case // 10 + 1
+        self.polices = {}
+        self.titres_raccourcis = {}
+
+    @property
+    def largeur(self):
+        return self.tier_list.nombre_colonnes * self.n_pixels_par_case
+
+    @property
+    def hauteur(self):
+        # Le tableau s'arrête au-dessus de la ligne des boutons :
+        return self.tier_list.ligne_boutton * self.n_pixels_par_case
+
+    def image(self):
+        """Compose l'image complète de la Tier List.
+
+        Returns:
+            Image: L'image du tableau.
+
+        """
+        image = Image.new('RGB', (self.largeur, self.hauteur), 'white')
+        dessin = ImageDraw.Draw(image)
+        for palier in range(self.tier_list.nombre_paliers):
+            self.dessiner_palier(image, dessin, palier, decalage=0)
+        return image
+
+    def enregistrer(self, chemin):
+        """Compose l'image de la Tier List et l'enregistre au format PNG."""
+        self.image().save(chemin, format='PNG')
+
+    def dessiner_palier(self, image, dessin, palier, decalage):
+        """Dessine toutes les lignes d'un palier (voir dessiner_ligne)."""
+        for j in range(len(self.tier_list.lignes_par_palier[palier])):
+            self.dessiner_ligne(image, dessin, palier, j, decalage)
+
+    def dessiner_ligne(self, image, dessin, palier, j, decalage):
+        """Dessine une ligne d'un palier (cases et chansons, ainsi que la cote et le nom du palier sur sa première
+        ligne). Le décalage vertical, en pixels, permet de dessiner la ligne dans une image qui ne contient qu'une
+        partie du tableau.
+
+        Args:
+            image (Image): L'image dans laquelle dessiner.
+            dessin (ImageDraw): L'objet de dessin de l'image.
+            palier (int): Le numéro du palier.
+            j (int): Le rang de la ligne dans le palier.
+            decalage (int): La position verticale du haut de l'image dans le tableau.
+
+        """
+        n = self.n_pixels_par_case
+        couleur, points, nom = description_palier(self.modele, palier)
+        debut_ligne = self.tier_list.lignes_par_palier[palier][j] * n - decalage
+        # Palier et ligne (bordure noire d'un pixel, comme dans le canvas); PIL dessine aussi le dernier pixel, le bas
+        # du rectangle s'arrête donc au-dessus de la ligne suivante :
+        dessin.rectangle((0, debut_ligne, 2 * n, debut_ligne + n - 1), fill=couleur or None, outline='black')
+        dessin.rectangle((2 * n, debut_ligne, n * self.tier_list.nombre_colonnes, debut_ligne + n - 1),
+                         fill='#434343', outline='black')
+        if j > 0:
+            # Ligne qui sépare les lignes du palier est masquée :
+            dessin.line((1, debut_ligne, 2 * n - 1, debut_ligne), fill=couleur)
+        else:
+            if self.modele in MODELES_AVEC_COTES:
+                dessin.text((7 * n / 63, debut_ligne + 5 * n / 63), points, fill='white',
+                            font=self.police(self.taille + 1, gras=True))
+            dessin.text((n, debut_ligne + n / 2), nom, fill='black', font=self.police(self.taille + 3), anchor='mm')
+
+        # Chansons de la ligne (même disposition que dans le modèle) :
+        limite = self.tier_list.limite_colonnes
+        for chanson in self.tier_list.chansons_par_palier[palier][j * limite:(j + 1) * limite]:
+            self.dessiner_chanson(image, dessin, chanson, decalage)
+
+    def dessiner_chanson(self, image, dessin, chanson_placee, decalage):
+        n = self.n_pixels_par_case
+        position = chanson_placee.position
+        x = position.colonne * n
+        y = position.ligne * n - decalage
+        miniature = self.miniature(chanson_placee)
+        image.paste(miniature, (x, y), miniature if miniature.mode == 'RGBA' else None)
+
+        # Titre raccourci sur fond jaune :
+        police = self.police(self.taille, gras=True)
+        titre = self.raccourcissement_chanson(chanson_placee.chanson)
+        longueur = police.getlength(titre) + 5
+        centre_x = x + n / 2
+        dessin.rectangle((centre_x - longueur / 2, y + 0.77 * n, centre_x + longueur / 2, y + 0.95 * n), fill='yellow')
+        dessin.text((centre_x, y + 0.85 * n), titre, fill='black', font=police, anchor='mm')
+
+    def miniature(self, chanson_placee):
+        taille = (self.n_pixels_par_case, self.n_pixels_par_case)
+        chemin = self.index_images.chemin(chanson_placee.artiste, chanson_placee.chanson)
+        if chemin is None:
+            # Image introuvable; une case vide est affichée :
+            return Image.new('RGB', taille, '#434343')
+        if self.cache_miniatures is None:
+            self.cache_miniatures = CacheMiniatures()
+        return self.cache_miniatures.obtenir(chemin, taille)
+
+    def police(self, taille, gras=False):
+        # Une taille en points de Tk correspond à 4/3 pixel par point (96 ppp) :
+        cle = (taille, gras)
+        if cle not in self.polices:
+            pixels = max(1, round(taille * 4 / 3))
+            for nom in POLICES[gras]:
+                try:
+                    self.polices[cle] = ImageFont.truetype(nom, pixels)
+                    break
+                except OSError:
+                    continue
+            else:
+                self.polices[cle] = ImageFont.load_default(pixels)
+        return self.polices[cle]
+
+    def raccourcissement_chanson(self, chanson):
+        if chanson not in self.titres_raccourcis:
+            # Recherche dichotomique du plus long début du titre qui tient dans une case :
+            police = self.police(self.taille, gras=True)
+            minimum = 0
+            maximum = len(chanson)
+            while minimum < maximum:
+                milieu = (minimum + maximum + 1) // 2
+                if police.getlength(chanson[:milieu]) + 5 > self.n_pixels_par_case:
+                    maximum = milieu - 1
+                else:
+                    minimum = milieu
+            self.titres_raccourcis[chanson] = chanson[:minimum]
+        return self.titres_raccourcis[chanson]
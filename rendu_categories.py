@@ -0,0 +1,85 @@
+"""
+\file rendu_categories.py
+\brief Programme en ligne de commande (sans Tk) qui rend en parallèle l'image de la dernière sauvegarde de chaque
+       catégorie
+\author Maksym Valigunda
+\version 1.0
+
+Utilisation : python rendu_categories.py [Catégorie_2023 Catégorie_Aespa ...] [--processus N] [--taille 63]
+              [--affiche]
+Sans catégorie, toutes les catégories du dossier courant sont rendues.
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sauvegarde import lire_sauvegarde_categorie, modele_depuis_sauvegarde
+from index_images import IndexImages
+from rendu import RenduTierList, NOM_IMAGE_EXPORTEE
+from affiche import RenduAffiche, NOM_AFFICHE, N_PIXELS_AFFICHE
+from categories import decouvrir_categories
+import argparse
+import os
+import sys
+import time
+
+
+def rendu_categorie(categorie, n_pixels_par_case, affiche):
+    """Rend l'image de la dernière sauvegarde d'une catégorie (exécuté dans un processus du groupe).
+
+    Args:
+        categorie (str): Le dossier de la catégorie.
+        n_pixels_par_case (int): La taille d'une case en pixels.
+        affiche (bool): Vrai pour rendre l'affiche à partir des images originales.
+
+    Returns:
+        tuple: Le chemin de l'image et les durées (en secondes) de la lecture et du rendu.
+
+    """
+    debut = time.perf_counter()
+    contenu = lire_sauvegarde_categorie(categorie)
+    tier_list = modele_depuis_sauvegarde(contenu)
+    index_images = IndexImages(categorie)
+    index_images.resolution_artistes(tier_list.chansons(), contenu['artistes_utilises'])
+    lecture = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    if affiche:
+        chemin = os.path.join(categorie, NOM_AFFICHE)
+        RenduAffiche(contenu['modele'], tier_list, index_images, n_pixels_par_case).enregistrer(chemin)
+    else:
+        chemin = os.path.join(categorie, NOM_IMAGE_EXPORTEE)
+        RenduTierList(contenu['modele'], tier_list, index_images,
+                      n_pixels_par_case=n_pixels_par_case).enregistrer(chemin)
+    return chemin, lecture, time.perf_counter() - debut
+
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Rend l'image de la dernière sauvegarde de chaque catégorie.")
+    parser.add_argument('categories', nargs='*', help="dossiers des catégories (par défaut : toutes)")
+    parser.add_argument('--processus', type=int, default=None, help="nombre de processus (par défaut : un par coeur)")
+    parser.add_argument('--taille', type=int, default=None, help="taille d'une case en pixels")
+    parser.add_argument('--affiche', action='store_true', help="affiche haute résolution à partir des originaux")
+    options = parser.parse_args(arguments)
+
+    categories = options.categories or decouvrir_categories()
+    taille = options.taille or (N_PIXELS_AFFICHE if options.affiche else 63)
+    echecs = 0
+    debut = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=options.processus) as executeur:
+        taches = {executeur.submit(rendu_categorie, categorie, taille, options.affiche): categorie
+                  for categorie in categories}
+        for tache in as_completed(taches):
+            categorie = taches[tache]
+            try:
+                chemin, lecture, rendu = tache.result()
+            except Exception as erreur:
+                # Une catégorie en échec (sauvegarde invalide, processus interrompu...) n'arrête pas les autres :
+                echecs += 1
+                print(f"{categorie} : ÉCHEC ({erreur})", file=sys.stderr)
+            else:
+                print(f"{categorie} : {chemin} (lecture {lecture:.2f} s, rendu {rendu:.2f} s)")
+    print(f"{len(categories) - echecs}/{len(categories)} catégories rendues en {time.perf_counter() - debut:.2f} s")
+    return 1 if echecs else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
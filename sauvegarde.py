@@ -0,0 +1,251 @@
+"""
+\file sauvegarde.py
+\brief Implémentation du format de sauvegarde (JSON versionné) d'une Tier List et de l'importation des anciennes
+       sauvegardes texte
+\author Maksym Valigunda
+\version 1.0
+"""
+
+from modele_tier_list import ModeleTierList
+from liste_chansons import lecture_fichier_texte
+import ast
+import json
+import os
+import tempfile
+
+# Noms des fichiers de sauvegarde dans le dossier d'une catégorie :
+NOM_SAUVEGARDE = 'Dernière_sauvegarde.json'
+NOM_ANCIENNE_SAUVEGARDE = 'Dernière_sauvegarde.txt'
+
+# Version du format; toute modification incompatible du format doit l'incrémenter :
+VERSION_SAUVEGARDE = 1
+
+
+def creer_sauvegarde(modele, tier_list, dictionnaire_artistes_chansons, liste_artistes, artistes_utilises):
+    """Crée le contenu d'une sauvegarde à partir de l'état d'une Tier List.
+
+    Le format est le suivant (les paliers et leurs lignes sont des listes indexées par le numéro du palier, le dernier
+    étant le palier d'arrivée; chaque chanson est un couple [artiste, chanson]) :
+        {"version": 1, "modele": "K-POP", "nombre_paliers": 9, "nombre_colonnes": 20,
+         "artistes_chansons": {"Aespa": ["Drama", ...]}, "liste_artistes": [...], "artistes_utilises": [...],
+         "lignes_par_palier": [[0], [1, 2], ...], "paliers": [[["Aespa", "Spicy"], ...], ...]}
+
+    Args:
+        modele (str): Le modèle de la Tier List.
+        tier_list (ModeleTierList): Les paliers, leurs lignes et les chansons placées.
+        dictionnaire_artistes_chansons (dict): Les chansons restant à classer de chaque artiste.
+        liste_artistes (list): Les artistes restant à classer.
+        artistes_utilises (list): Les artistes dont au moins une chanson a été appelée.
+
+    Returns:
+        dict: Le contenu de la sauvegarde.
+
+    """
+    paliers = range(tier_list.nombre_paliers + 1)
+    return {
+        'version': VERSION_SAUVEGARDE,
+        'modele': modele,
+        'nombre_paliers': tier_list.nombre_paliers,
+        'nombre_colonnes': tier_list.nombre_colonnes,
+        'artistes_chansons': dictionnaire_artistes_chansons,
+        'liste_artistes': list(liste_artistes),
+        'artistes_utilises': list(artistes_utilises),
+        'lignes_par_palier': [tier_list.lignes_par_palier[palier] for palier in paliers],
+        'paliers': [[[chanson.artiste, chanson.chanson] for chanson in tier_list.chansons_par_palier[palier]]
+                    for palier in paliers],
+    }
+
+
+def modele_depuis_sauvegarde(sauvegarde):
+    """Reconstruit le modèle d'une Tier List à partir du contenu d'une sauvegarde validée.
+
+    Returns:
+        ModeleTierList: Le modèle reconstruit.
+
+    """
+    return ModeleTierList.depuis_dictionnaires(
+        sauvegarde['nombre_paliers'], sauvegarde['nombre_colonnes'],
+        {palier: [tuple(couple) for couple in chansons] for palier, chansons in enumerate(sauvegarde['paliers'])},
+        dict(enumerate(sauvegarde['lignes_par_palier'])))
+
+
+def ecrire_sauvegarde(chemin, sauvegarde):
+    """Écrit une sauvegarde de façon atomique : le contenu est d'abord écrit dans un fichier temporaire du même dossier,
+    puis ce fichier remplace l'ancienne sauvegarde. Une interruption pendant l'écriture laisse donc l'ancienne
+    sauvegarde intacte.
+
+    Args:
+        chemin (str): Le chemin du fichier de sauvegarde.
+        sauvegarde (dict): Le contenu de la sauvegarde.
+
+    """
+    valider(sauvegarde)
+    dossier = os.path.dirname(chemin) or '.'
+    descripteur, chemin_temporaire = tempfile.mkstemp(prefix='.sauvegarde_', suffix='.tmp', dir=dossier)
+    try:
+        with os.fdopen(descripteur, 'w', encoding='utf-8') as fichier:
+            # json.dump encode le contenu par morceaux plutôt que de construire une seule grande chaîne :
+            json.dump(sauvegarde, fichier, ensure_ascii=False, separators=(',', ':'))
+            fichier.flush()
+            os.fsync(fichier.fileno())
+        os.replace(chemin_temporaire, chemin)
+    except BaseException:
+        try:
+            os.remove(chemin_temporaire)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def lire_sauvegarde(chemin):
+    """Lit et valide une sauvegarde en une seule analyse du fichier.
+
+    Returns:
+        dict: Le contenu de la sauvegarde.
+
+    Raises:
+        FileNotFoundError: Si la sauvegarde n'existe pas.
+        ValueError: Si le fichier n'est pas une sauvegarde valide.
+
+    """
+    with open(chemin, 'r', encoding='utf-8') as fichier:
+        try:
+            sauvegarde = json.load(fichier)
+        except json.JSONDecodeError as erreur:
+            raise ValueError(f"Sauvegarde illisible : {erreur}") from erreur
+    valider(sauvegarde)
+    return sauvegarde
+
+
+def lire_sauvegarde_categorie(dossier):
+    """Lit la dernière sauvegarde d'une catégorie : la sauvegarde JSON a priorité, une ancienne sauvegarde texte est
+    importée à défaut (le fichier des artistes n'est alors relu que pour retrouver l'artiste des chansons).
+
+    Args:
+        dossier (str): Le dossier de la catégorie.
+
+    Returns:
+        dict: Le contenu de la sauvegarde.
+
+    Raises:
+        FileNotFoundError: Si la catégorie n'a aucune sauvegarde.
+        ValueError: Si la sauvegarde n'est pas valide.
+
+    """
+    chemin = os.path.join(dossier, NOM_SAUVEGARDE)
+    if os.path.exists(chemin):
+        return lire_sauvegarde(chemin)
+    chemin = os.path.join(dossier, NOM_ANCIENNE_SAUVEGARDE)
+    if not os.path.exists(chemin):
+        raise FileNotFoundError(chemin)
+    return importer_ancienne_sauvegarde(chemin, lecture_fichier_texte(dossier)[0])
+
+
+def valider(sauvegarde):
+    """Vérifie que le contenu d'une sauvegarde respecte le format attendu.
+
+    Raises:
+        ValueError: Si le contenu ne respecte pas le format.
+
+    """
+    def verifier(condition, message):
+        if not condition:
+            raise ValueError(f"Sauvegarde invalide : {message}")
+
+    verifier(isinstance(sauvegarde, dict), "le contenu n'est pas un objet")
+    verifier(sauvegarde.get('version') == VERSION_SAUVEGARDE,
+             f"version {sauvegarde.get('version')!r} non prise en charge")
+    verifier(isinstance(sauvegarde.get('modele'), str), "modèle manquant")
+    for cle in ('nombre_paliers', 'nombre_colonnes'):
+        verifier(isinstance(sauvegarde.get(cle), int) and sauvegarde[cle] > 0, f"{cle} invalide")
+    verifier(sauvegarde['nombre_colonnes'] > 2, "nombre_colonnes invalide")
+    verifier(isinstance(sauvegarde.get('artistes_chansons'), dict) and
+             all(isinstance(chansons, list) for chansons in sauvegarde['artistes_chansons'].values()),
+             "artistes_chansons invalide")
+    for cle in ('liste_artistes', 'artistes_utilises'):
+        verifier(isinstance(sauvegarde.get(cle), list), f"{cle} invalide")
+
+    nombre_paliers = sauvegarde['nombre_paliers']
+    lignes_par_palier = sauvegarde.get('lignes_par_palier')
+    paliers = sauvegarde.get('paliers')
+    verifier(isinstance(lignes_par_palier, list) and len(lignes_par_palier) == nombre_paliers + 1,
+             "lignes_par_palier ne correspond pas au nombre de paliers")
+    verifier(isinstance(paliers, list) and len(paliers) == nombre_paliers + 1,
+             "paliers ne correspond pas au nombre de paliers")
+    ligne_attendue = 0
+    for lignes in lignes_par_palier:
+        # Les lignes des paliers doivent se suivre, sans trou ni chevauchement :
+        verifier(isinstance(lignes, list) and lignes == list(range(ligne_attendue, ligne_attendue + len(lignes))) and
+                 len(lignes) > 0, "lignes_par_palier non consécutives")
+        ligne_attendue += len(lignes)
+    for chansons in paliers:
+        verifier(isinstance(chansons, list), "palier invalide")
+        for couple in chansons:
+            verifier(isinstance(couple, list) and len(couple) == 2 and isinstance(couple[1], str) and
+                     (couple[0] is None or isinstance(couple[0], str)), "chanson invalide")
+    verifier(len(paliers[nombre_paliers]) <= 1, "plus d'une chanson dans le palier d'arrivée")
+
+
+def importer_ancienne_sauvegarde(chemin, dictionnaire_complet=None):
+    """Convertit une ancienne sauvegarde texte (une ligne "Description : valeur" par attribut) dans le nouveau format.
+    Les anciennes sauvegardes ne conservent que le titre des chansons placées : l'artiste est retrouvé dans le
+    dictionnaire complet des artistes et de leurs chansons (en suivant l'ordre des artistes utilisés) et reste None
+    s'il est introuvable.
+
+    Args:
+        chemin (str): Le chemin de l'ancienne sauvegarde.
+        dictionnaire_complet (dict): Toutes les chansons de chaque artiste de la catégorie.
+
+    Returns:
+        dict: Le contenu de la sauvegarde dans le nouveau format.
+
+    Raises:
+        FileNotFoundError: Si la sauvegarde n'existe pas.
+        ValueError: Si le fichier n'est pas une ancienne sauvegarde valide.
+
+    """
+    with open(chemin, 'rb') as fichier:
+        contenu = fichier.read()
+    try:
+        texte = contenu.decode('utf-8')
+    except UnicodeDecodeError:
+        # Les anciennes sauvegardes étaient écrites avec l'encodage par défaut de Windows :
+        texte = contenu.decode('cp1252', errors='replace')
+
+    # Les valeurs sont lues dans l'ordre des lignes; la description avant " : " est ignorée :
+    valeurs = []
+    for ligne in texte.splitlines():
+        if ligne.strip() == '':
+            continue
+        description, separateur, valeur = ligne.partition(' : ')
+        if separateur == '':
+            raise ValueError(f"Ancienne sauvegarde invalide : ligne « {ligne[:40]} »")
+        valeurs.append(valeur)
+    if len(valeurs) != 12:
+        raise ValueError("Ancienne sauvegarde invalide : 12 lignes attendues")
+    try:
+        (artistes_chansons, liste_artistes, artistes_utilises, dictionnaire_chansons, _, lignes_par_palier, _, _,
+         nombre_colonnes, nombre_paliers, _) = [ast.literal_eval(valeur) for valeur in valeurs[:11]]
+    except (ValueError, SyntaxError) as erreur:
+        raise ValueError(f"Ancienne sauvegarde invalide : {erreur}") from erreur
+
+    artiste_par_chanson = {}
+    for artiste in artistes_utilises:
+        for chanson in (dictionnaire_complet or {}).get(artiste, []):
+            artiste_par_chanson.setdefault(chanson, artiste)
+
+    sauvegarde = {
+        'version': VERSION_SAUVEGARDE,
+        'modele': valeurs[11],
+        'nombre_paliers': int(nombre_paliers),
+        'nombre_colonnes': int(nombre_colonnes),
+        'artistes_chansons': artistes_chansons,
+        'liste_artistes': liste_artistes,
+        'artistes_utilises': artistes_utilises,
+        'lignes_par_palier': [list(lignes_par_palier[palier]) for palier in range(int(nombre_paliers) + 1)],
+        'paliers': [[[artiste_par_chanson.get(sequence[0]), sequence[0]]
+                     for sequence in dictionnaire_chansons.get(palier, [])]
+                    for palier in range(int(nombre_paliers) + 1)],
+    }
+    valider(sauvegarde)
+    return sauvegarde